@@ -1,27 +1,36 @@
 from typing import Optional, Generator
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from app.database.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_db, get_async_read_db
 from app.core.config import settings
-from app.crud.user import crud_user
+from app.crud.async_crud import async_crud_user
 from app.models.db.user import UserDB
 from app.schemas.user import TokenData
+from app.models.db.types import is_guid
+from app.models.enums import ApiKeyScope
+from app.services.api_keys import resolve_api_key
+from app.services.principal_cache import get_principal_cache
+from app.services.read_your_writes import get_primary_pins
+from app.services.token_denylist import get_token_denylist
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+# Без auto_error: запрос может прийти с API-ключом вместо JWT
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> UserDB:
-    """Получение текущего пользователя из JWT токена"""
-    credentials_exception = HTTPException(
+# Методы, для которых API-ключу достаточно области read
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _decode_token(token: str) -> TokenData:
+    """Проверка подписи и срока JWT"""
     try:
         payload = jwt.decode(
             token, 
@@ -33,19 +42,69 @@ def get_current_user(
         role: str = payload.get("role")
         
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
         
-        token_data = TokenData(
+        return TokenData(
             username=username,
             user_id=user_id,
-            role=role
+            role=role,
+            jti=payload.get("jti"),
+            issued_at=payload.get("iat"),
+            expires_at=payload.get("exp")
         )
-    except JWTError:
-        raise credentials_exception
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+async def get_token_claims(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[str] = Depends(api_key_header),
+    db: AsyncSession = Depends(get_async_db)
+) -> TokenData:
+    """
+    Пользователь по claims токена без обращения к БД: id и роль.
+    Для эндпоинтов, которым нужны только они; отозванные токены не принимаются.
+    Вместо JWT принимается API-ключ (X-API-Key): из кеша ключей или одним запросом
+    """
+    if api_key:
+        token_data = await resolve_api_key(db, api_key)
+        if token_data is None:
+            raise _credentials_exception()
+        return token_data
+    if not token:
+        raise _credentials_exception()
+    token_data = _decode_token(token)
+    if not token_data.user_id or not is_guid(token_data.user_id):
+        raise _credentials_exception()
+    if await get_token_denylist().is_revoked(token_data.user_id, token_data.jti, token_data.issued_at):
+        raise _credentials_exception()
+    return token_data
+
+async def load_user(db: AsyncSession, user_id: str, *, use_cache: bool) -> UserDB:
+    """
+    Пользователь по первичному ключу (claim user_id токена): из кеша
+    пользователей (use_cache) или из БД. Прочитанный из БД пользователь
+    сохраняется в кеш
+    """
+    cache = get_principal_cache() if settings.PRINCIPAL_CACHE_ENABLED else None
+    if cache is not None and use_cache:
+        user = cache.get(user_id)
+        if user is not None:
+            return user
     
-    user = crud_user.get_by_username(db, username=token_data.username)
+    version = cache.version() if cache is not None else None
+    user = await async_crud_user.get(db, id=user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if cache is not None:
+        cache.set(user, version=version)
+    return user
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenData = Depends(get_token_claims)
+) -> UserDB:
+    """Получение текущего пользователя из JWT токена (через кеш пользователей)"""
+    user = await load_user(db, token_data.user_id, use_cache=True)
     
     if not user.is_active:
         raise HTTPException(
@@ -55,7 +114,22 @@ def get_current_user(
     
     return user
 
-def get_current_active_user(
+async def get_current_user_fresh(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenData = Depends(get_token_claims)
+) -> UserDB:
+    """Текущий пользователь, прочитанный из БД мимо кеша (нужен актуальный баланс)"""
+    user = await load_user(db, token_data.user_id, use_cache=False)
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return user
+
+async def get_current_active_user(
     current_user: UserDB = Depends(get_current_user),
 ) -> UserDB:
     """Проверка что пользователь активен"""
@@ -66,7 +140,7 @@ def get_current_active_user(
         )
     return current_user
 
-def get_current_admin_user(
+async def get_current_admin_user(
     current_user: UserDB = Depends(get_current_user),
 ) -> UserDB:
     """Проверка что пользователь администратор"""
@@ -77,3 +151,46 @@ def get_current_admin_user(
             detail="Not enough permissions"
         )
     return current_user
+
+def require_scope(*, read: ApiKeyScope, write: ApiKeyScope):
+    """
+    Зависимость роутера: область, нужная API-ключу (read - для GET, write - для
+    остальных методов). JWT пользователя ограничений по областям не имеет
+    """
+    async def check_scope(request: Request, token_data: TokenData = Depends(get_token_claims)) -> None:
+        if token_data.scopes is None:
+            return
+        scope = read if request.method in _READ_METHODS else write
+        if scope.value not in token_data.scopes:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"API key has no '{scope.value}' scope"
+            )
+    
+    return check_scope
+
+async def get_session_claims(token_data: TokenData = Depends(get_token_claims)) -> TokenData:
+    """Только вход пользователя (JWT): API-ключом нельзя управлять API-ключами"""
+    if token_data.api_key_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API keys cannot manage API keys"
+        )
+    return token_data
+
+async def get_read_db(
+    token_data: TokenData = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db),
+    replica: AsyncSession = Depends(get_async_read_db)
+) -> AsyncSession:
+    """
+    Сессия для read-only эндпоинтов: реплика, а сразу после записи
+    пользователя - основная БД (соединение берет только используемая сессия)
+    """
+    if await get_primary_pins().is_pinned(token_data.user_id):
+        return db
+    return replica
+
+async def pin_to_primary(user_id: str) -> None:
+    """Отметить запись пользователя: его чтения временно идут на основную БД"""
+    await get_primary_pins().pin(user_id)
@@ -1,14 +1,30 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.endpoints import auth, balance, models, predict, history
+from app.api.deps import require_scope
+from app.api.v1.endpoints import api_keys, auth, balance, models, predict, history, metrics
+from app.models.enums import ApiKeyScope
 
 api_router = APIRouter()
 
+# Области API-ключей по роутерам (JWT пользователя - без ограничений)
+read_only = Depends(require_scope(read=ApiKeyScope.READ, write=ApiKeyScope.READ))
+
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
-api_router.include_router(balance.router, prefix="/balance", tags=["balance"])
-api_router.include_router(models.router, prefix="/models", tags=["ml-models"])
-api_router.include_router(predict.router, prefix="/predict", tags=["predictions"])
-api_router.include_router(history.router, prefix="/history", tags=["history"])
+api_router.include_router(api_keys.router, prefix="/api-keys", tags=["api-keys"])
+api_router.include_router(
+    balance.router, prefix="/balance", tags=["balance"],
+    dependencies=[Depends(require_scope(read=ApiKeyScope.READ, write=ApiKeyScope.BALANCE))]
+)
+api_router.include_router(models.router, prefix="/models", tags=["ml-models"], dependencies=[read_only])
+api_router.include_router(
+    predict.router, prefix="/predict", tags=["predictions"],
+    dependencies=[Depends(require_scope(read=ApiKeyScope.READ, write=ApiKeyScope.PREDICT))]
+)
+api_router.include_router(history.router, prefix="/history", tags=["history"], dependencies=[read_only])
+api_router.include_router(
+    metrics.router, prefix="/metrics", tags=["metrics"],
+    dependencies=[Depends(require_scope(read=ApiKeyScope.ADMIN, write=ApiKeyScope.ADMIN))]
+)
 
 @api_router.get("/health")
 async def health_check():
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.crud.api_key import ApiKeyCreate
+from app.crud.async_crud import async_crud_api_key
+from app.database.database import get_async_db
+from app.schemas.api_key import ApiKeyCreatedResponse, ApiKeyCreateRequest, ApiKeyResponse
+from app.schemas.user import TokenData
+from app.services.api_keys import KEY_PREFIX, generate_api_key, hash_api_key, revoke_api_key
+
+router = APIRouter()
+
+@router.post("/", response_model=ApiKeyCreatedResponse, status_code=status.HTTP_201_CREATED)
+async def create_api_key(
+    body: ApiKeyCreateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenData = Depends(deps.get_session_claims)
+) -> Any:
+    """
+    Новый API-ключ текущего пользователя (заголовок X-API-Key)
+    """
+    key = generate_api_key()
+    expires_at = None
+    if body.expires_in_days is not None:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=body.expires_in_days)
+    api_key = await async_crud_api_key.create(db, obj_in=ApiKeyCreate(
+        user_id=token_data.user_id,
+        name=body.name,
+        key_hash=hash_api_key(key),
+        prefix=key[:len(KEY_PREFIX) + 8],
+        scopes=sorted({scope.value for scope in body.scopes}),
+        expires_at=expires_at
+    ))
+    return ApiKeyCreatedResponse(**ApiKeyResponse.model_validate(api_key).model_dump(), key=key)
+
+@router.get("/", response_model=List[ApiKeyResponse])
+async def list_api_keys(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenData = Depends(deps.get_session_claims)
+) -> Any:
+    """
+    API-ключи текущего пользователя (без самих ключей)
+    """
+    return await async_crud_api_key.get_by_user(db, token_data.user_id)
+
+@router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_api_key(
+    key_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenData = Depends(deps.get_session_claims)
+) -> None:
+    """
+    Отзыв API-ключа
+    """
+    if not await revoke_api_key(db, key_id, user_id=token_data.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
@@ -1,29 +1,68 @@
+import uuid
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.config import settings
-from app.crud.user import crud_user
-from app.database.database import get_db
-from app.schemas.user import UserCreate, UserResponse, TokenResponse
+from app.crud.async_crud import async_crud_user
+from app.database.database import get_async_db
+from app.models.db.user import UserDB
+from app.schemas.user import RefreshRequest, UserCreate, UserResponse, TokenData, TokenResponse
+from app.services.password_hasher import PasswordHasherBusyError
+from app.services.refresh_tokens import (
+    InvalidRefreshTokenError, issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+)
+from app.services.token_denylist import get_token_denylist
 
 router = APIRouter()
 
+def _token_response(user: UserDB, refresh_token: str) -> TokenResponse:
+    """Access-токен пользователя и refresh-токен"""
+    # jti и iat нужны для отзыва токена (token_denylist)
+    now = datetime.utcnow()
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = jwt.encode(
+        {
+            "sub": user.username,
+            "user_id": str(user.id),  # ✅ Преобразуем UUID в строку!
+            "role": user.role.value if hasattr(user.role, 'value') else user.role,
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "exp": now + access_token_expires
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+    
+    return TokenResponse(
+        access_token=access_token,
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token
+    )
+
+def _hasher_busy(e: PasswordHasherBusyError) -> HTTPException:
+    # Очередь bcrypt заполнена: клиент повторит позже, а не будет ждать в очереди
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=UserResponse)
-def register(
+async def register(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
 ) -> Any:
     """
     Регистрация нового пользователя
     """
     # Проверка уникальности username
-    user = crud_user.get_by_username(db, username=user_in.username)
+    user = await async_crud_user.get_by_username(db, username=user_in.username)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,7 +70,7 @@ def register(
         )
     
     # Проверка уникальности email
-    user = crud_user.get_by_email(db, email=user_in.email)
+    user = await async_crud_user.get_by_email(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,23 +78,29 @@ def register(
         )
     
     # Создание пользователя
-    user = crud_user.create(db, obj_in=user_in)
+    try:
+        user = await async_crud_user.create(db, obj_in=user_in)
+    except PasswordHasherBusyError as e:
+        raise _hasher_busy(e)
     return user
 
 @router.post("/login", response_model=TokenResponse)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     Авторизация пользователя (получение JWT токена)
     """
-    # Аутентификация
-    user = crud_user.authenticate(
-        db, 
-        username=form_data.username, 
-        password=form_data.password
-    )
+    # Аутентификация (проверка bcrypt - в пуле процессов)
+    try:
+        user = await async_crud_user.authenticate(
+            db, 
+            username=form_data.username, 
+            password=form_data.password
+        )
+    except PasswordHasherBusyError as e:
+        raise _hasher_busy(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,26 +115,61 @@ def login(
             detail="Inactive user"
         )
     
-    # Создание токена - преобразуем UUID в строку!
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = jwt.encode(
-        {
-            "sub": user.username,
-            "user_id": str(user.id),  # ✅ Преобразуем UUID в строку!
-            "role": user.role.value if hasattr(user.role, 'value') else user.role,
-            "exp": datetime.utcnow() + access_token_expires
-        },
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
+    refresh_token = await issue_refresh_token(db, user.id)
+    return _token_response(user, refresh_token)
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+) -> Any:
+    """
+    Новый access-токен по refresh-токену без проверки пароля.
+    Refresh-токен одноразовый: в ответе - следующий токен того же семейства
+    """
+    try:
+        user_id, refresh_token = await rotate_refresh_token(db, body.refresh_token)
+    except InvalidRefreshTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return TokenResponse(
-        access_token=access_token,
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-    )
+    # Роль и активность - текущие (кеш пользователей сбрасывается при их изменении)
+    user = await deps.load_user(db, user_id, use_cache=True)
+    if not user.is_active:
+        await revoke_refresh_token(db, refresh_token)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return _token_response(user, refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: Optional[RefreshRequest] = None,
+    db: AsyncSession = Depends(get_async_db),
+    token_data: TokenData = Depends(deps.get_token_claims)
+) -> None:
+    """
+    Отзыв текущего токена до истечения его срока и, если передан, семейства refresh-токена
+    """
+    if not token_data.jti:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token cannot be revoked"
+        )
+    await get_token_denylist().revoke_token(token_data.jti, token_data.expires_at)
+    if body is not None:
+        try:
+            await revoke_refresh_token(db, body.refresh_token)
+        except InvalidRefreshTokenError:
+            pass
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
+async def get_current_user_info(
     current_user = Depends(deps.get_current_active_user)
 ) -> Any:
     """
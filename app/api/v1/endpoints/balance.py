@@ -1,23 +1,23 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.crud.user import crud_user
-from app.crud.transaction import crud_transaction
-from app.database.database import get_db
+from app.crud.async_crud import async_crud_transaction, async_crud_user
+from app.database.database import get_async_db
 from app.models.db.user import UserDB
-from app.schemas.balance import BalanceResponse, DepositRequest, DepositResponse
+from app.schemas.balance import AuditedBalanceResponse, BalanceResponse, DepositRequest, DepositResponse
+from app.services.ledger import get_ledger_balance
 
 router = APIRouter()
 
 @router.get("/", response_model=BalanceResponse)
-def get_balance(
-    db: Session = Depends(get_db),
-    current_user: UserDB = Depends(deps.get_current_active_user)
+async def get_balance(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserDB = Depends(deps.get_current_user_fresh)
 ) -> Any:
     """
-    Получение текущего баланса пользователя
+    Получение текущего баланса пользователя (пользователь читается мимо кеша)
     """
     # Явное преобразование UUID в строку
     return BalanceResponse(
@@ -26,10 +26,30 @@ def get_balance(
         username=current_user.username
     )
 
+@router.get("/audit", response_model=AuditedBalanceResponse)
+async def get_audited_balance(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserDB = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Баланс по журналу транзакций (последний снимок + транзакции после него)
+    и его сверка с текущим балансом пользователя
+    """
+    ledger = await db.run_sync(get_ledger_balance, current_user.id)
+    return AuditedBalanceResponse(
+        user_id=str(current_user.id),
+        balance=float(ledger.account_balance or 0.0),
+        ledger_balance=ledger.ledger_balance,
+        discrepancy=ledger.discrepancy,
+        is_consistent=ledger.is_consistent,
+        snapshot_at=ledger.snapshot_at,
+        transactions_since_snapshot=ledger.transactions_since_snapshot
+    )
+
 @router.post("/deposit", response_model=DepositResponse)
-def deposit(
+async def deposit(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserDB = Depends(deps.get_current_active_user),
     deposit_in: DepositRequest
 ) -> Any:
@@ -37,7 +57,7 @@ def deposit(
     Пополнение баланса пользователя
     """
     # Обновление баланса пользователя
-    user = crud_user.update_balance(
+    user = await async_crud_user.update_balance(
         db, 
         user_id=current_user.id, 
         amount=deposit_in.amount
@@ -50,12 +70,13 @@ def deposit(
         )
     
     # Создание транзакции пополнения
-    transaction = crud_transaction.create_deposit(
+    transaction = await async_crud_transaction.create_deposit(
         db,
         user_id=current_user.id,
         amount=deposit_in.amount,
         description=deposit_in.description
     )
+    await deps.pin_to_primary(current_user.id)
     
     # Явное преобразование UUID в строку
     return DepositResponse(
@@ -1,59 +1,84 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.crud.prediction import crud_prediction
-from app.crud.transaction import crud_transaction
-from app.crud.ml_model import crud_ml_model
-from app.database.database import get_db
+from app.crud.async_crud import async_crud_prediction, async_crud_transaction
+from app.crud.pagination import Cursor, decode_cursor, encode_cursor
 from app.models.db.user import UserDB
 from app.schemas.prediction import PredictionHistoryItem
 from app.schemas.transaction import TransactionResponse
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _set_next_cursor(response: Response, items: List[Any], limit: int) -> None:
+    """Курсор следующей страницы - в заголовке, тело ответа остается списком"""
+    if len(items) == limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
 @router.get("/predictions", response_model=List[PredictionHistoryItem])
-def get_prediction_history(
-    db: Session = Depends(get_db),
+async def get_prediction_history(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: UserDB = Depends(deps.get_current_active_user),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Курсор из заголовка {NEXT_CURSOR_HEADER} (вместо skip)")
 ) -> Any:
     """
     Получение истории предсказаний пользователя
     """
-    tasks = crud_prediction.get_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+    tasks = await async_crud_prediction.get_history_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=_parse_cursor(cursor)
+    )
+    _set_next_cursor(response, tasks, limit)
     
-    result = []
-    for task in tasks:
-        model = crud_ml_model.get(db, id=task.model_id)
-        # Явное преобразование UUID в строку!
-        result.append({
+    # Явное преобразование UUID в строку!
+    return [
+        {
             "id": str(task.id),
             "model_id": str(task.model_id),
-            "model_name": model.name if model else None,
+            "model_name": task.model_name,
             "status": task.status,
-            "valid_data_count": len(task.valid_data),
-            "invalid_data_count": len(task.invalid_data),
+            "valid_data_count": task.valid_count,
+            "invalid_data_count": task.invalid_count,
             "cost": task.total_cost,
             "created_at": task.created_at,
             "completed_at": task.completed_at
-        })
-    
-    return result
+        }
+        for task in tasks
+    ]
 
 @router.get("/transactions", response_model=List[TransactionResponse])
-def get_transaction_history(
-    db: Session = Depends(get_db),
+async def get_transaction_history(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: UserDB = Depends(deps.get_current_active_user),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Курсор из заголовка {NEXT_CURSOR_HEADER} (вместо skip)")
 ) -> Any:
     """
     Получение истории транзакций пользователя
     """
-    transactions = crud_transaction.get_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+    transactions = await async_crud_transaction.get_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=_parse_cursor(cursor)
+    )
+    _set_next_cursor(response, transactions, limit)
     # Явное преобразование UUID в строку для транзакций
     result = []
     for t in transactions:
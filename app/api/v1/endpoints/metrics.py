@@ -0,0 +1,26 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.config import settings
+from app.models.db.user import UserDB
+from app.services.admission import get_admission_controller
+from app.services.cache import get_result_cache
+from app.services.model_registry import get_model_registry
+from app.services.password_hasher import get_password_hasher
+
+router = APIRouter()
+
+@router.get("/")
+def get_metrics(
+    current_user: UserDB = Depends(deps.get_current_admin_user)
+) -> Any:
+    """
+    Метрики процесса: допуск запросов, кеш результатов, реестр моделей, хеширование паролей
+    """
+    return {
+        "admission": get_admission_controller().metrics(),
+        "result_cache": get_result_cache().stats() if settings.RESULT_CACHE_ENABLED else None,
+        "model_registry": get_model_registry().stats(),
+        "password_hasher": get_password_hasher().metrics()
+    }
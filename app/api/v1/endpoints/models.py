@@ -1,25 +1,25 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.crud.ml_model import crud_ml_model
-from app.database.database import get_db
+from app.crud.async_crud import async_crud_ml_model
 from app.schemas.model import MLModelResponse
+from app.schemas.user import TokenData
 
 router = APIRouter()
 
 @router.get("/", response_model=List[MLModelResponse])
-def get_models(
-    db: Session = Depends(get_db),
+async def get_models(
+    db: AsyncSession = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
-    current_user = Depends(deps.get_current_active_user)
+    token_data: TokenData = Depends(deps.get_token_claims)
 ) -> Any:
     """
     Получение списка всех активных ML моделей
     """
-    models = crud_ml_model.get_active_models(db, skip=skip, limit=limit)
+    models = await async_crud_ml_model.get_active_models(db, skip=skip, limit=limit)
     
     # Явное преобразование UUID в строку
     result = []
@@ -37,15 +37,15 @@ def get_models(
     return result
 
 @router.get("/{model_id}", response_model=MLModelResponse)
-def get_model(
+async def get_model(
     model_id: str,
-    db: Session = Depends(get_db),
-    current_user = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_read_db),
+    token_data: TokenData = Depends(deps.get_token_claims)
 ) -> Any:
     """
     Получение информации о конкретной ML модели
     """
-    model = crud_ml_model.get(db, id=model_id)
+    model = await async_crud_ml_model.get(db, id=model_id)
     if not model:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
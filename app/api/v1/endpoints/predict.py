@@ -1,32 +1,79 @@
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import logging
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.crud.user import crud_user
-from app.crud.ml_model import crud_ml_model
-from app.crud.prediction import crud_prediction
-from app.crud.transaction import crud_transaction
-from app.database.database import get_db
+from app.core.config import settings
+from app.crud.async_crud import async_crud_ml_model, async_crud_prediction
+from app.database.database import get_async_db
 from app.models.db.user import UserDB
-from app.models.enums import TaskStatus
+from app.models.enums import TaskStatus, UserRole
 from app.schemas.prediction import PredictionRequest, PredictionResponse, PredictionTaskCreate
-from app.models.prediction import SimpleDataValidator
+from app.schemas.user import TokenData
+from app.models.prediction import ColumnarDataValidator
+from app.services.admission import AdmissionRejectedError, get_admission_controller
+from app.services.broker import TaskBroker, get_broker
+from app.services.bulk_prediction import (
+    LineTooLongError,
+    RequestStreamingResponse,
+    chunk_error_line,
+    chunk_result_line,
+    iter_ndjson_chunks
+)
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.prediction_processor import InsufficientBalanceError, execute_prediction_async
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Валидатор без состояния - один на процесс
+validator = ColumnarDataValidator(required_fields=["feature1", "feature2"])
+
+@contextmanager
+def _admit(model_id: str) -> Iterator[None]:
+    controller = get_admission_controller()
+    try:
+        controller.acquire(model_id)
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        yield
+    finally:
+        controller.release(model_id)
+
+async def admit_prediction(request: PredictionRequest) -> AsyncIterator[None]:
+    """Допуск запроса (первая зависимость: до авторизации и обращений к БД)"""
+    with _admit(request.model_id):
+        yield
+
+async def admit_bulk_prediction(model_id: str = Query(...)) -> AsyncIterator[None]:
+    """Допуск пакетного запроса на все время потоковой обработки"""
+    with _admit(model_id):
+        yield
+
 @router.post("/", response_model=PredictionResponse)
-def create_prediction(
+async def create_prediction(
     *,
-    db: Session = Depends(get_db),
+    admission: None = Depends(admit_prediction),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserDB = Depends(deps.get_current_active_user),
+    broker: TaskBroker = Depends(get_broker),
     request: PredictionRequest
 ) -> Any:
     """
     Создание задачи на предсказание
     """
     # Проверка существования модели
-    model = crud_ml_model.get(db, id=request.model_id)
+    model = await async_crud_ml_model.get(db, id=request.model_id)
     if not model:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,61 +86,64 @@ def create_prediction(
             detail="Model is not active"
         )
     
-    # Простая валидация (можно заменить на более сложную)
-    validator = SimpleDataValidator(required_fields=["feature1", "feature2"])
-    valid_data, invalid_data = validator.validate(request.data)
+    # Валидация (колоночная, маски NumPy)
+    validation = validator.validate_columns(request.data)
     
     # Расчет стоимости
-    cost = model.calculate_cost(len(valid_data))
+    cost = model.calculate_cost(validation.valid_count)
     
-    # Проверка баланса
+    # Быстрая предварительная проверка баланса (окончательная - условным UPDATE)
     if current_user.balance < cost:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Insufficient balance. Required: {cost}, available: {current_user.balance}"
         )
     
-    # Создание задачи
-    task_in = PredictionTaskCreate(
-        user_id=str(current_user.id),
-        model_id=request.model_id,
-        input_data=request.data
-    )
-    
-    task = crud_prediction.create_with_validation(
-        db,
-        obj_in=task_in,
-        valid_data=valid_data,
-        invalid_data=invalid_data
-    )
-    
-    # Если есть валидные данные - запускаем обработку
-    if valid_data:
-        # Начинаем обработку
-        task = crud_prediction.start_processing(db, db_obj=task)
-        
-        # Имитация предсказания
-        result = [f"prediction_{i}" for i in range(len(valid_data))]
-        
-        # Списание средств
-        crud_user.update_balance(db, current_user.id, -cost)
-        
-        # Создание транзакции
-        crud_transaction.create_withdrawal(
-            db,
-            user_id=current_user.id,
-            amount=cost,
-            description=f"ML Prediction using {model.name}",
-            task_id=task.id
+    if settings.PREDICTION_MODE == "queue":
+        # Задача остается в PENDING, обработкой займется воркер
+        task_in = PredictionTaskCreate(
+            user_id=str(current_user.id),
+            model_id=request.model_id,
+            input_data=request.data
         )
-        
-        # Завершение задачи
-        task = crud_prediction.complete(
+        task = await async_crud_prediction.create_with_validation(
             db,
-            db_obj=task,
-            result=result,
-            total_cost=cost
+            obj_in=task_in,
+            validation=validation
         )
+        if validation.valid_count:
+            try:
+                await run_in_threadpool(broker.publish, task.id)
+            except Exception:
+                task = await async_crud_prediction.fail(db, db_obj=task, error_message="Queue is unavailable")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Prediction queue is unavailable"
+                )
+    else:
+        # Задача, списание и результат - одной транзакцией
+        try:
+            task = await execute_prediction_async(
+                db,
+                user_id=current_user.id,
+                model=model,
+                input_data=request.data,
+                validation=validation
+            )
+        except InsufficientBalanceError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except InferenceQueueFullError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": str(max(1, round(settings.INFERENCE_QUEUE_TIMEOUT_SECONDS)))}
+            )
+    
+    # Задача записана: следующие чтения пользователя - с основной БД
+    await deps.pin_to_primary(current_user.id)
     
     # Формирование ответа - ЯВНОЕ ПРЕОБРАЗОВАНИЕ UUID В СТРОКУ!
     return PredictionResponse(
@@ -101,8 +151,8 @@ def create_prediction(
         status=task.status,
         model_id=str(model.id),  # ✅ Преобразуем UUID в строку!
         model_name=model.name,
-        valid_data_count=len(task.valid_data),
-        invalid_data_count=len(task.invalid_data),
+        valid_data_count=task.valid_count,
+        invalid_data_count=task.invalid_count,
         result=task.result if task.status == TaskStatus.COMPLETED else None,
         cost=task.total_cost,
         error_message=task.error_message,
@@ -110,42 +160,106 @@ def create_prediction(
         completed_at=task.completed_at
     )
 
+@router.post("/bulk")
+async def create_bulk_prediction(
+    request: Request,
+    model_id: str = Query(..., description="ID модели для предсказания"),
+    admission: None = Depends(admit_bulk_prediction),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserDB = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Пакетное предсказание по NDJSON (одна строка - один объект с признаками).
+    Строки обрабатываются порциями по BULK_CHUNK_SIZE, результат каждой порции
+    отдается строкой NDJSON сразу после ее обработки.
+    """
+    model = await async_crud_ml_model.get(db, id=model_id)
+    if not model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model not found"
+        )
+    
+    if not model.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Model is not active"
+        )
+    
+    user_id = current_user.id
+    
+    async def process_chunk(chunk: int, rows) -> bytes:
+        # Каждая порция - отдельная атомарная транзакция со своим списанием
+        task = await execute_prediction_async(
+            db,
+            user_id=user_id,
+            model=model,
+            input_data=rows,
+            validation=validator.validate_columns(rows)
+        )
+        await deps.pin_to_primary(user_id)
+        return chunk_result_line(chunk, task)
+    
+    async def results():
+        chunk = 0
+        rows_iter = iter_ndjson_chunks(
+            request.stream(), settings.BULK_CHUNK_SIZE, settings.BULK_MAX_LINE_BYTES
+        )
+        try:
+            async for rows in rows_iter:
+                try:
+                    yield await process_chunk(chunk, rows)
+                except InsufficientBalanceError as e:
+                    yield chunk_error_line(chunk, str(e))
+                    return
+                except Exception as e:
+                    logger.exception("Ошибка обработки порции %s", chunk)
+                    await db.rollback()
+                    yield chunk_error_line(chunk, f"Chunk processing failed: {e}")
+                    return
+                chunk += 1
+        except LineTooLongError as e:
+            yield chunk_error_line(chunk, str(e))
+        except ClientDisconnect:
+            logger.info("Клиент отключился во время пакетного предсказания")
+    
+    return RequestStreamingResponse(results(), media_type="application/x-ndjson")
+
 @router.get("/{task_id}", response_model=PredictionResponse)
-def get_prediction(
+async def get_prediction(
     task_id: str,
-    db: Session = Depends(get_db),
-    current_user: UserDB = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_read_db),
+    token_data: TokenData = Depends(deps.get_token_claims)
 ) -> Any:
     """
     Получение результата предсказания по ID задачи
+    (владелец и роль - из claims токена, без чтения пользователя)
     """
-    task = crud_prediction.get(db, id=task_id)
+    # Задача и имя модели - одним запросом
+    found = await async_crud_prediction.get_with_model_name(db, id=task_id)
     
-    if not task:
+    if not found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prediction task not found"
         )
+    task, model_name = found
     
     # Проверка доступа
-    if task.user_id != current_user.id and current_user.role != 'ADMIN':
+    if task.user_id != token_data.user_id and token_data.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    # Получение имени модели
-    model = crud_ml_model.get(db, id=task.model_id)
-    model_name = model.name if model else None
-    
     # Явное преобразование UUID в строку
     return PredictionResponse(
         task_id=str(task.id),  # ✅ Преобразуем UUID в строку!
         status=task.status,
         model_id=str(task.model_id),  # ✅ Преобразуем UUID в строку!
         model_name=model_name,
-        valid_data_count=len(task.valid_data),
-        invalid_data_count=len(task.invalid_data),
+        valid_data_count=task.valid_count,
+        invalid_data_count=task.invalid_count,
         result=task.result,
         cost=task.total_cost,
         error_message=task.error_message,
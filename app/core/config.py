@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -23,24 +23,108 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_PORT: int = 5432
     
+    # Реплика для read-only эндпоинтов (те же БД и учетные данные); без
+    # POSTGRES_REPLICA_HOST чтение идет с основной БД
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[int] = None
+    # После записи пользователь столько секунд читает с основной БД (больше задержки реплики)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    
     # Настройки пула соединений
     POOL_SIZE: int = 5
     MAX_OVERFLOW: int = 10
+    # Сколько запрос ждет свободное соединение (асинхронные эндпоинты ограничены пулом, а не потоками)
+    POOL_TIMEOUT: int = 30
+    # Подготовленные на сервере запросы asyncpg: сколько держать на одно соединение
+    PREPARED_STATEMENT_CACHE_SIZE: int = 500
     
     # RabbitMQ
     RABBITMQ_DEFAULT_USER: str
     RABBITMQ_DEFAULT_PASS: str
     RABBITMQ_HOST: str = "localhost"
     RABBITMQ_PORT: int = 5672
+    RABBITMQ_PREDICTION_QUEUE: str = "prediction_tasks"
+    
+    # Режим выполнения предсказаний: sync - в запросе, queue - через воркер
+    PREDICTION_MODE: str = "sync"
+    # Задачи в PROCESSING дольше этого времени считаются зависшими и переотправляются
+    PREDICTION_PROCESSING_TIMEOUT_SECONDS: int = 600
+    PREDICTION_REAPER_INTERVAL_SECONDS: int = 60
+    
+    # Микробатчинг инференса между параллельными запросами
+    BATCHING_ENABLED: bool = False
+    BATCH_MAX_SIZE: int = 256
+    BATCH_MAX_WAIT_MS: float = 5.0
+    
+    # Артефакты моделей (<model_id>.pkl) и бюджет памяти реестра загруженных моделей
+    MODEL_ARTIFACTS_DIR: str = "/app/model_artifacts"
+    MODEL_MEMORY_BUDGET_MB: int = 1024
+    
+    # Инференс в пуле процессов (признаки передаются через shared memory)
+    INFERENCE_EXECUTOR_ENABLED: bool = False
+    INFERENCE_WORKERS: int = 2
+    # Число процессов для отдельных моделей, JSON: {"<model_id>": 4}
+    INFERENCE_WORKERS_PER_MODEL: Dict[str, int] = {}
+    INFERENCE_MAX_PENDING: int = 64
+    INFERENCE_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    
+    # bcrypt паролей в пуле процессов: стоимость новых хешей (хеши с другой
+    # стоимостью пересчитываются при входе), процессов и операций в очереди (сверх - 503)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # Контроль допуска /predict: запросов в работе на процесс (не больше POOL_SIZE + MAX_OVERFLOW)
+    # и на одну модель; сверх лимита - 503/429 с Retry-After
+    ADMISSION_MAX_IN_FLIGHT: int = 15
+    ADMISSION_MAX_IN_FLIGHT_PER_MODEL: int = 8
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    
+    # Снимки баланса по журналу транзакций (python -m app.jobs.balance_snapshots).
+    # Транзакции моложе LAG в снимок не попадают: они могли еще не закоммититься
+    LEDGER_SNAPSHOT_LAG_SECONDS: int = 60
+    LEDGER_SNAPSHOT_BATCH_SIZE: int = 500
+    
+    # Помесячные секции prediction_tasks и transactions (python -m app.jobs.partitions):
+    # секции создаются на PARTITION_MONTHS_AHEAD месяцев вперед, секции старше
+    # PARTITION_RETENTION_MONTHS отсоединяются и выгружаются в PARTITION_ARCHIVE_DIR
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 12
+    PARTITION_ARCHIVE_DIR: str = "/app/archive"
+    
+    # Потоковый NDJSON эндпоинт: строк в одной порции (задаче)
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_LINE_BYTES: int = 1_048_576
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh-токен (POST /auth/refresh): срок продлевается при каждой ротации
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    
+    # API-ключи (заголовок X-API-Key): HMAC-ключ для хешей (по умолчанию SECRET_KEY)
+    # и кеш найденных ключей в процессе
+    API_KEY_HMAC_SECRET: Optional[str] = None
+    API_KEY_CACHE_MAX_ENTRIES: int = 10_000
+    API_KEY_CACHE_TTL_SECONDS: int = 60
     
     # Redis (кеширование)
     REDIS_URL: Optional[str] = None
     
+    # Кеш результатов предсказаний (Redis при заданном REDIS_URL, иначе in-process LRU)
+    RESULT_CACHE_ENABLED: bool = False
+    RESULT_CACHE_MAX_ENTRIES: int = 100_000
+    RESULT_CACHE_TTL_SECONDS: int = 3600
+    # Доля цены за строку, результат которой взят из кеша: 1 - полная цена, 0 - бесплатно
+    RESULT_CACHE_HIT_PRICE: float = 1.0
+    
+    # Кеш авторизованных пользователей в get_current_user (сбрасывается при
+    # изменении баланса, роли, активности; при REDIS_URL - во всех процессах)
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    
     # Логирование
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "/app/logs/app.log"
@@ -53,6 +137,23 @@ class Settings(BaseSettings):
         """Формирует URL для подключения к БД из компонентов"""
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    def get_async_database_url(self) -> str:
+        """URL БД для асинхронного движка (драйвер asyncpg)"""
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            f"?prepared_statement_cache_size={self.PREPARED_STATEMENT_CACHE_SIZE}"
+        )
+    
+    def get_async_read_database_url(self) -> Optional[str]:
+        """URL реплики для асинхронного движка (None - реплика не настроена)"""
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{port}/{self.POSTGRES_DB}"
+            f"?prepared_statement_cache_size={self.PREPARED_STATEMENT_CACHE_SIZE}"
+        )
+    
     def get_rabbitmq_url(self) -> str:
         """Формирует URL для подключения к RabbitMQ из компонентов"""
         return f"amqp://{self.RABBITMQ_DEFAULT_USER}:{self.RABBITMQ_DEFAULT_PASS}@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/"
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.db.api_key import ApiKeyDB
+from app.models.db.types import is_guid
+from app.models.db.user import UserDB
+from pydantic import BaseModel
+
+class ApiKeyCreate(BaseModel):
+    user_id: str
+    name: str
+    key_hash: str
+    prefix: str
+    scopes: List[str]
+    expires_at: Optional[datetime] = None
+
+# Действующий ключ активного пользователя - один запрос по уникальному индексу key_hash
+_ACTIVE_BY_HASH = (
+    select(ApiKeyDB.id, ApiKeyDB.user_id, ApiKeyDB.scopes, ApiKeyDB.expires_at, UserDB.role)
+    .join(UserDB, UserDB.id == ApiKeyDB.user_id)
+    .where(
+        ApiKeyDB.key_hash == bindparam("key_hash"),
+        ApiKeyDB.revoked_at.is_(None),
+        or_(ApiKeyDB.expires_at.is_(None), ApiKeyDB.expires_at > bindparam("now")),
+        UserDB.is_active.is_(True)
+    )
+    .limit(1)
+)
+
+class CRUDApiKey(CRUDBase[ApiKeyDB, ApiKeyCreate, ApiKeyCreate]):
+
+    def create(self, db: Session, *, obj_in: ApiKeyCreate) -> ApiKeyDB:
+        # expires_at остается datetime (jsonable_encoder в CRUDBase превратил бы его в строку)
+        db_obj = ApiKeyDB(**obj_in.model_dump())
+        db.add(db_obj)
+        db.commit()
+        return db_obj
+
+    def get_active_by_hash(self, db: Session, key_hash: str, *, now: datetime) -> Optional[Row]:
+        """(id, user_id, scopes, expires_at, role) действующего ключа или None"""
+        return db.execute(_ACTIVE_BY_HASH, {"key_hash": key_hash, "now": now}).first()
+
+    def get_by_user(self, db: Session, user_id: str) -> List[ApiKeyDB]:
+        return list(db.scalars(
+            select(ApiKeyDB).where(ApiKeyDB.user_id == user_id).order_by(ApiKeyDB.created_at.desc())
+        ))
+
+    def revoke(self, db: Session, key_id: str, *, user_id: str, now: datetime) -> Optional[str]:
+        """
+        Отозвать ключ пользователя
+        :return: хеш отозванного ключа (для сброса кеша) или None, если ключа нет или он уже отозван
+        """
+        if not is_guid(key_id):
+            return None
+        stmt = (
+            update(ApiKeyDB)
+            .where(ApiKeyDB.id == key_id, ApiKeyDB.user_id == user_id, ApiKeyDB.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .returning(ApiKeyDB.key_hash)
+        )
+        key_hash = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        return key_hash
+
+crud_api_key = CRUDApiKey(ApiKeyDB)
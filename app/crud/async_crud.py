@@ -0,0 +1,66 @@
+"""
+Асинхронные версии crud_* для AsyncSession. Запросы те же, что в синхронных
+помощниках: метод выполняется через AsyncSession.run_sync, а ввод-вывод
+драйвера (asyncpg) ожидается в цикле событий, не занимая поток.
+"""
+
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.api_key import crud_api_key
+from app.crud.ml_model import crud_ml_model
+from app.crud.prediction import crud_prediction
+from app.crud.refresh_token import crud_refresh_token
+from app.crud.transaction import crud_transaction
+from app.crud.user import UserCreate, crud_user
+from app.models.db.user import UserDB
+from app.services.password_hasher import get_password_hasher
+
+
+class AsyncCRUD:
+    """Обертка над синхронным CRUD: await async_crud.method(db, ...)"""
+
+    def __init__(self, crud: Any):
+        self._crud = crud
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        method = getattr(self._crud, name)
+
+        async def call(db: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+            return await db.run_sync(method, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+
+class AsyncCRUDUser(AsyncCRUD):
+    """
+    Хеширование и проверка пароля (bcrypt) - в пуле процессов password_hasher,
+    а не в цикле событий. При заполненной очереди - PasswordHasherBusyError
+    """
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> UserDB:
+        password_hash = await get_password_hasher().hash(obj_in.password)
+        return await db.run_sync(crud_user.create_with_hash, obj_in=obj_in, password_hash=password_hash)
+
+    async def authenticate(self, db: AsyncSession, username: str, password: str) -> Optional[UserDB]:
+        user = await self.get_by_username(db, username=username)
+        if not user:
+            return None
+        valid, new_hash = await get_password_hasher().verify(password, user.password_hash)
+        if not valid:
+            return None
+        if new_hash:
+            # Хеш со старой стоимостью bcrypt заменяется при входе
+            await db.run_sync(crud_user.update_password_hash, user.id, new_hash)
+        return user
+
+
+async_crud_user = AsyncCRUDUser(crud_user)
+async_crud_ml_model = AsyncCRUD(crud_ml_model)
+async_crud_prediction = AsyncCRUD(crud_prediction)
+async_crud_transaction = AsyncCRUD(crud_transaction)
+async_crud_refresh_token = AsyncCRUD(crud_refresh_token)
+async_crud_api_key = AsyncCRUD(crud_api_key)
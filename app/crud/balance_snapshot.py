@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.db.balance_snapshot import BalanceSnapshotDB
+from pydantic import BaseModel
+
+class BalanceSnapshotCreate(BaseModel):
+    user_id: str
+    balance: float
+    last_transaction_at: datetime
+    last_transaction_id: str
+    transaction_count: int
+
+class CRUDBalanceSnapshot(CRUDBase[BalanceSnapshotDB, BalanceSnapshotCreate, BalanceSnapshotCreate]):
+    
+    def get_latest(self, db: Session, user_id: str) -> Optional[BalanceSnapshotDB]:
+        """Последний снимок баланса пользователя (по водяному знаку)"""
+        return (
+            db.query(BalanceSnapshotDB)
+            .filter(BalanceSnapshotDB.user_id == user_id)
+            .order_by(
+                BalanceSnapshotDB.last_transaction_at.desc(),
+                BalanceSnapshotDB.last_transaction_id.desc()
+            )
+            .first()
+        )
+
+crud_balance_snapshot = CRUDBalanceSnapshot(BalanceSnapshotDB)
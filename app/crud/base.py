@@ -1,8 +1,10 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import bindparam, inspect, insert, select, update
 from sqlalchemy.orm import Session
 from app.models.db.base import Base
+from app.models.db.types import is_guid
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -11,9 +13,15 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        # Запрос по id строится один раз: ключ кеша компиляции у готового
+        # запроса запоминается, на вызов остается только параметр
+        self._get_by_id = select(model).where(model.id == bindparam("id")).limit(1)
     
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        # Не UUID - такой записи нет (PostgreSQL не сравнивает UUID с произвольной строкой)
+        if not is_guid(id):
+            return None
+        return db.scalars(self._get_by_id, {"id": id}).first()
     
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
@@ -25,7 +33,6 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
     def update(
@@ -35,21 +42,76 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
         
-        for field in obj_data:
+        # Имена полей берутся из маппера, а не сериализацией всего объекта
+        for field in inspect(self.model).column_attrs.keys():
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
+    def create_many(
+        self, db: Session, *, objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]]
+    ) -> List[ModelType]:
+        """Создать объекты одним многострочным INSERT ... RETURNING и одним commit"""
+        rows = [self._to_row(obj_in) for obj_in in objs_in]
+        if not rows:
+            return []
+        db_objs = list(db.scalars(insert(self.model).returning(self.model), rows))
+        db.commit()
+        return db_objs
+    
+    def update_many(
+        self, db: Session, *, objs_in: Sequence[Dict[str, Any]]
+    ) -> None:
+        """Обновить объекты по первичному ключу (executemany) одним commit; в каждом словаре есть id"""
+        if not objs_in:
+            return
+        db.execute(update(self.model), list(objs_in))
+        db.commit()
+    
+    def upsert_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Sequence[str] = ("id",)
+    ) -> List[ModelType]:
+        """
+        Вставить или обновить объекты одним INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+        :param index_elements: колонки уникального индекса, по которому ищется конфликт
+        """
+        rows = [self._to_row(obj_in) for obj_in in objs_in]
+        if not rows:
+            return []
+        
+        if db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        
+        stmt = dialect_insert(self.model).values(rows)
+        updated_columns = {key for row in rows for key in row} - set(index_elements)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={key: stmt.excluded[key] for key in updated_columns}
+        )
+        db_objs = list(db.scalars(
+            stmt.returning(self.model),
+            execution_options={"populate_existing": True}
+        ))
+        db.commit()
+        return db_objs
+    
+    def _to_row(self, obj_in: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+        return obj_in if isinstance(obj_in, dict) else jsonable_encoder(obj_in)
+    
     def remove(self, db: Session, *, id: Any) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
@@ -0,0 +1,63 @@
+"""
+Курсорная (keyset) пагинация по (created_at, id): следующая страница
+читается по индексу с места, где закончилась предыдущая, без OFFSET.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import Integer, bindparam, tuple_
+from sqlalchemy.sql import Select
+
+Cursor = Tuple[datetime, str]
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Непрозрачный курсор для клиента"""
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Разбор курсора
+    :raises ValueError: если курсор поврежден
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        created_at, id = datetime.fromisoformat(created_at), str(uuid.UUID(id))
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    return created_at, id
+
+
+def keyset_pages(stmt: Select, model: Any) -> Tuple[Select, Select]:
+    """
+    Запросы страниц stmt, упорядоченных по (created_at, id) новыми первыми:
+    первая страница (OFFSET :skip) и страница после курсора. Строятся один
+    раз при импорте, значения передаются параметрами (page_params)
+    """
+    cursor_created_at = bindparam("cursor_created_at")
+    stmt = (
+        stmt
+        .order_by(model.created_at.desc(), model.id.desc())
+        .limit(bindparam("limit", type_=Integer))
+    )
+    first_page = stmt.offset(bindparam("skip", type_=Integer))
+    after_cursor = stmt.where(
+        tuple_(model.created_at, model.id) < tuple_(cursor_created_at, bindparam("cursor_id")),
+        # Простое условие по ключу секционирования отсекает более новые секции
+        model.created_at <= cursor_created_at
+    )
+    return first_page, after_cursor
+
+
+def page_params(*, skip: int, limit: int, cursor: Optional[Cursor]) -> Dict[str, Any]:
+    """Параметры для запросов keyset_pages"""
+    if cursor is None:
+        return {"skip": skip, "limit": limit}
+    return {"cursor_created_at": cursor[0], "cursor_id": cursor[1], "limit": limit}
@@ -1,8 +1,14 @@
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.pagination import Cursor, keyset_pages, page_params
+from app.models.db.ml_model import MLModelDB
 from app.models.db.prediction import PredictionTaskDB
+from app.models.db.types import is_guid
 from app.models.enums import TaskStatus
+from app.models.prediction import ValidationResult
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -17,19 +23,64 @@ class PredictionTaskUpdate(BaseModel):
     error_message: Optional[str] = None
     total_cost: Optional[float] = None
 
+# Страницы задач пользователя: запросы построены один раз, на вызов - только параметры
+_USER_TASKS = keyset_pages(
+    select(PredictionTaskDB).where(PredictionTaskDB.user_id == bindparam("user_id")),
+    PredictionTaskDB
+)
+_USER_HISTORY = keyset_pages(
+    select(
+        PredictionTaskDB.id,
+        PredictionTaskDB.model_id,
+        MLModelDB.name.label("model_name"),
+        PredictionTaskDB.status,
+        PredictionTaskDB.valid_count,
+        PredictionTaskDB.invalid_count,
+        PredictionTaskDB.total_cost,
+        PredictionTaskDB.created_at,
+        PredictionTaskDB.completed_at
+    )
+    .outerjoin(MLModelDB, MLModelDB.id == PredictionTaskDB.model_id)
+    .where(PredictionTaskDB.user_id == bindparam("user_id")),
+    PredictionTaskDB
+)
+
 class CRUDPredictionTask(CRUDBase[PredictionTaskDB, PredictionTaskCreate, PredictionTaskUpdate]):
     
     def get_by_user(
-        self, db: Session, user_id: str, *, skip: int = 0, limit: int = 100
+        self, db: Session, user_id: str, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[Cursor] = None
     ) -> List[PredictionTaskDB]:
-        """Получить задачи пользователя"""
+        """Получить задачи пользователя (новые первыми; после cursor - без OFFSET)"""
+        first_page, after_cursor = _USER_TASKS
+        stmt = first_page if cursor is None else after_cursor
+        params = {"user_id": user_id, **page_params(skip=skip, limit=limit, cursor=cursor)}
+        return list(db.scalars(stmt, params))
+    
+    def get_history_by_user(
+        self, db: Session, user_id: str, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[Cursor] = None
+    ) -> List[Row]:
+        """
+        Страница истории одним запросом: только нужные колонки задачи
+        (без input_data и result) и имя модели через LEFT JOIN
+        """
+        first_page, after_cursor = _USER_HISTORY
+        stmt = first_page if cursor is None else after_cursor
+        params = {"user_id": user_id, **page_params(skip=skip, limit=limit, cursor=cursor)}
+        return db.execute(stmt, params).all()
+    
+    def get_with_model_name(
+        self, db: Session, id: str
+    ) -> Optional[Tuple[PredictionTaskDB, Optional[str]]]:
+        """Задача и имя ее модели одним запросом"""
+        if not is_guid(id):
+            return None
         return (
-            db.query(self.model)
-            .filter(PredictionTaskDB.user_id == user_id)
-            .order_by(PredictionTaskDB.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+            db.query(PredictionTaskDB, MLModelDB.name)
+            .outerjoin(MLModelDB, MLModelDB.id == PredictionTaskDB.model_id)
+            .filter(PredictionTaskDB.id == id)
+            .first()
         )
     
     def get_by_status(
@@ -50,22 +101,21 @@ class CRUDPredictionTask(CRUDBase[PredictionTaskDB, PredictionTaskCreate, Predic
         db: Session,
         *,
         obj_in: PredictionTaskCreate,
-        valid_data: List[Dict[str, Any]],
-        invalid_data: List[Dict[str, Any]]
+        validation: ValidationResult
     ) -> PredictionTaskDB:
         """Создать задачу с результатами валидации"""
         db_obj = PredictionTaskDB(
             user_id=obj_in.user_id,
             model_id=obj_in.model_id,
             input_data=obj_in.input_data,
-            valid_data=valid_data,
-            invalid_data=invalid_data,
-            status=TaskStatus.PENDING if valid_data else TaskStatus.VALIDATION_ERROR
+            valid_count=validation.valid_count,
+            invalid_count=validation.invalid_count,
+            invalid_rows=validation.invalid_rows(),
+            status=TaskStatus.PENDING if validation.valid_count else TaskStatus.VALIDATION_ERROR
         )
         
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
     def start_processing(self, db: Session, *, db_obj: PredictionTaskDB) -> PredictionTaskDB:
@@ -73,9 +123,45 @@ class CRUDPredictionTask(CRUDBase[PredictionTaskDB, PredictionTaskCreate, Predic
         db_obj.status = TaskStatus.PROCESSING
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
+    def claim_for_processing(self, db: Session, *, task_id: str) -> bool:
+        """
+        Атомарный захват задачи воркером: PENDING -> PROCESSING одним UPDATE.
+        :return: True, если задачу захватил этот вызов
+        """
+        stmt = (
+            update(PredictionTaskDB)
+            .where(PredictionTaskDB.id == task_id, PredictionTaskDB.status == TaskStatus.PENDING)
+            .values(status=TaskStatus.PROCESSING)
+            .returning(PredictionTaskDB.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        return claimed is not None
+    
+    def requeue_stale(self, db: Session, *, older_than: datetime) -> List[str]:
+        """
+        Возврат в PENDING задач, зависших в PROCESSING (воркер упал).
+        Списание и COMPLETED фиксируются одним commit, поэтому такие задачи
+        еще не оплачены и их можно безопасно обработать заново.
+        :return: ID возвращенных задач
+        """
+        stmt = (
+            update(PredictionTaskDB)
+            .where(
+                PredictionTaskDB.status == TaskStatus.PROCESSING,
+                PredictionTaskDB.updated_at < older_than
+            )
+            .values(status=TaskStatus.PENDING)
+            .returning(PredictionTaskDB.id)
+            .execution_options(synchronize_session=False)
+        )
+        task_ids = list(db.execute(stmt).scalars())
+        db.commit()
+        return task_ids
+    
     def complete(
         self,
         db: Session,
@@ -92,7 +178,6 @@ class CRUDPredictionTask(CRUDBase[PredictionTaskDB, PredictionTaskCreate, Predic
         
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
     def fail(
@@ -109,7 +194,6 @@ class CRUDPredictionTask(CRUDBase[PredictionTaskDB, PredictionTaskCreate, Predic
         
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
     def update_status(
@@ -139,7 +223,6 @@ class CRUDPredictionTask(CRUDBase[PredictionTaskDB, PredictionTaskCreate, Predic
         
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
 
 crud_prediction = CRUDPredictionTask(PredictionTaskDB)
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import bindparam, delete, or_, update
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.db.refresh_token import RefreshTokenFamilyDB
+from app.models.db.types import is_guid
+from pydantic import BaseModel
+
+class RefreshTokenFamilyCreate(BaseModel):
+    user_id: str
+    token_hash: str
+    expires_at: datetime
+
+# Ротация - один UPDATE по первичному ключу: принимается только текущий
+# токен живого семейства, запрос построен один раз
+_ROTATE = (
+    update(RefreshTokenFamilyDB)
+    .where(
+        RefreshTokenFamilyDB.id == bindparam("family_id"),
+        RefreshTokenFamilyDB.token_hash == bindparam("token_hash"),
+        RefreshTokenFamilyDB.revoked_at.is_(None),
+        RefreshTokenFamilyDB.expires_at > bindparam("now")
+    )
+    .values(
+        token_hash=bindparam("new_hash"),
+        generation=RefreshTokenFamilyDB.generation + 1,
+        expires_at=bindparam("expires_at")
+    )
+    .returning(RefreshTokenFamilyDB.user_id)
+)
+
+class CRUDRefreshTokenFamily(CRUDBase[RefreshTokenFamilyDB, RefreshTokenFamilyCreate, RefreshTokenFamilyCreate]):
+
+    def start(self, db: Session, *, family_id: str, obj_in: RefreshTokenFamilyCreate) -> RefreshTokenFamilyDB:
+        """Новое семейство (вход по паролю); id задается заранее - он входит в токен"""
+        db_obj = RefreshTokenFamilyDB(id=family_id, **obj_in.model_dump())
+        db.add(db_obj)
+        db.commit()
+        return db_obj
+
+    def rotate(
+        self, db: Session, family_id: str, token_hash: str, *,
+        new_hash: str, now: datetime, expires_at: datetime
+    ) -> Optional[str]:
+        """
+        Заменить текущий токен семейства новым
+        :return: id пользователя или None, если токен не текущий, семейство отозвано или истекло
+        """
+        if not is_guid(family_id):
+            return None
+        user_id = db.execute(_ROTATE, {
+            "family_id": family_id, "token_hash": token_hash, "now": now,
+            "new_hash": new_hash, "expires_at": expires_at
+        }).scalar_one_or_none()
+        db.commit()
+        return user_id
+
+    def revoke(self, db: Session, family_id: str, *, now: datetime, unless_hash: Optional[str] = None) -> bool:
+        """
+        Отозвать семейство. С unless_hash - только если текущий токен другой
+        (предъявлен уже замененный токен: его могли украсть)
+        :return: было ли семейство отозвано этим вызовом
+        """
+        if not is_guid(family_id):
+            return False
+        stmt = (
+            update(RefreshTokenFamilyDB)
+            .where(RefreshTokenFamilyDB.id == family_id, RefreshTokenFamilyDB.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        if unless_hash is not None:
+            stmt = stmt.where(RefreshTokenFamilyDB.token_hash != unless_hash)
+        revoked = db.execute(stmt).rowcount > 0
+        db.commit()
+        return revoked
+
+    def delete_stale(self, db: Session, *, now: datetime) -> int:
+        """Удалить истекшие и отозванные семейства"""
+        stmt = delete(RefreshTokenFamilyDB).where(
+            or_(RefreshTokenFamilyDB.expires_at <= now, RefreshTokenFamilyDB.revoked_at.is_not(None))
+        )
+        deleted = db.execute(stmt).rowcount
+        db.commit()
+        return deleted
+
+crud_refresh_token = CRUDRefreshTokenFamily(RefreshTokenFamilyDB)
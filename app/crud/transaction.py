@@ -1,6 +1,9 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, case, func, select, tuple_
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.pagination import Cursor, keyset_pages, page_params
 from app.models.db.transaction import TransactionDB
 from app.models.enums import TransactionType
 from pydantic import BaseModel
@@ -12,19 +15,29 @@ class TransactionCreate(BaseModel):
     description: Optional[str] = None
     task_id: Optional[str] = None
 
+# Сумма транзакции со знаком: списания уменьшают баланс, пополнения и возвраты - увеличивают
+SIGNED_AMOUNT = case(
+    (TransactionDB.transaction_type == TransactionType.WITHDRAWAL, -TransactionDB.amount),
+    else_=TransactionDB.amount
+)
+
+# Страницы транзакций пользователя: запросы построены один раз, на вызов - только параметры
+_USER_TRANSACTIONS = keyset_pages(
+    select(TransactionDB).where(TransactionDB.user_id == bindparam("user_id")),
+    TransactionDB
+)
+
 class CRUDTransaction(CRUDBase[TransactionDB, TransactionCreate, TransactionCreate]):
     
     def get_by_user(
-        self, db: Session, user_id: str, *, skip: int = 0, limit: int = 100
+        self, db: Session, user_id: str, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[Cursor] = None
     ) -> List[TransactionDB]:
-        return (
-            db.query(self.model)
-            .filter(TransactionDB.user_id == user_id)
-            .order_by(TransactionDB.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        """Получить транзакции пользователя (новые первыми; после cursor - без OFFSET)"""
+        first_page, after_cursor = _USER_TRANSACTIONS
+        stmt = first_page if cursor is None else after_cursor
+        params = {"user_id": user_id, **page_params(skip=skip, limit=limit, cursor=cursor)}
+        return list(db.scalars(stmt, params))
     
     def get_by_type(
         self, db: Session, user_id: str, transaction_type: TransactionType
@@ -52,7 +65,6 @@ class CRUDTransaction(CRUDBase[TransactionDB, TransactionCreate, TransactionCrea
         )
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
     def create_withdrawal(
@@ -69,29 +81,56 @@ class CRUDTransaction(CRUDBase[TransactionDB, TransactionCreate, TransactionCrea
         )
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
-    def get_user_balance(self, db: Session, user_id: str) -> float:
-        """Рассчитать баланс пользователя по транзакциям"""
-        deposits = (
-            db.query(db.func.sum(TransactionDB.amount))
-            .filter(
-                TransactionDB.user_id == user_id,
-                TransactionDB.transaction_type == TransactionType.DEPOSIT
-            )
-            .scalar() or 0.0
+    def add_withdrawal(
+        self, db: Session, *, user_id: str, amount: float,
+        description: str = "", task_id: Optional[str] = None
+    ) -> TransactionDB:
+        """Добавление списания в текущую транзакцию (без commit)"""
+        db_obj = TransactionDB(
+            user_id=user_id,
+            transaction_type=TransactionType.WITHDRAWAL,
+            amount=amount,
+            description=description or "Списание средств",
+            task_id=task_id
         )
+        db.add(db_obj)
+        return db_obj
+    
+    def get_balance_delta(
+        self, db: Session, user_id: str, *, after: Optional[Cursor] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[float, int, Optional[Cursor]]:
+        """
+        Сумма транзакций пользователя (пополнения и возвраты - плюс, списания - минус)
+        строго после водяного знака after и до until (по индексу user_id, created_at, id)
+        :return: сумма, число транзакций и водяной знак последней из них
+        """
+        conditions = [TransactionDB.user_id == user_id]
+        if after is not None:
+            conditions.append(tuple_(TransactionDB.created_at, TransactionDB.id) > tuple_(*after))
+            conditions.append(TransactionDB.created_at >= after[0])
+        if until is not None:
+            conditions.append(TransactionDB.created_at < until)
         
-        withdrawals = (
-            db.query(db.func.sum(TransactionDB.amount))
-            .filter(
-                TransactionDB.user_id == user_id,
-                TransactionDB.transaction_type == TransactionType.WITHDRAWAL
-            )
-            .scalar() or 0.0
-        )
+        total, count = db.query(
+            func.coalesce(func.sum(SIGNED_AMOUNT), 0.0),
+            func.count(TransactionDB.id)
+        ).filter(*conditions).one()
+        if not count:
+            return 0.0, 0, None
         
-        return deposits - withdrawals
+        last = (
+            db.query(TransactionDB.created_at, TransactionDB.id)
+            .filter(*conditions)
+            .order_by(TransactionDB.created_at.desc(), TransactionDB.id.desc())
+            .first()
+        )
+        return float(total), count, (last.created_at, last.id)
+    
+    def get_user_balance(self, db: Session, user_id: str) -> float:
+        """Рассчитать баланс пользователя по всем транзакциям (полный пересчет, см. services.ledger)"""
+        return self.get_balance_delta(db, user_id)[0]
 
 crud_transaction = CRUDTransaction(TransactionDB)
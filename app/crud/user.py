@@ -1,11 +1,11 @@
 from typing import Optional
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models.db.user import UserDB
+from app.services.password_hasher import get_password_hasher
+from app.services.principal_cache import mark_principal_changed
 from pydantic import BaseModel
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class UserCreate(BaseModel):
     username: str
@@ -20,44 +20,77 @@ class UserUpdate(BaseModel):
     balance: Optional[float] = None
     is_active: Optional[bool] = None
 
+# Поиск по имени - на каждом запросе с токеном: запрос построен один раз
+_BY_USERNAME = select(UserDB).where(UserDB.username == bindparam("username")).limit(1)
+
 class CRUDUser(CRUDBase[UserDB, UserCreate, UserUpdate]):
     
     def get_by_username(self, db: Session, username: str) -> Optional[UserDB]:
-        return db.query(UserDB).filter(UserDB.username == username).first()
+        return db.scalars(_BY_USERNAME, {"username": username}).first()
     
     def get_by_email(self, db: Session, email: str) -> Optional[UserDB]:
         return db.query(UserDB).filter(UserDB.email == email).first()
     
     def create(self, db: Session, *, obj_in: UserCreate) -> UserDB:
-        hashed_password = pwd_context.hash(obj_in.password)
+        return self.create_with_hash(db, obj_in=obj_in, password_hash=get_password_hasher().hash_sync(obj_in.password))
+    
+    def create_with_hash(self, db: Session, *, obj_in: UserCreate, password_hash: str) -> UserDB:
+        """Создать пользователя с уже посчитанным хешем пароля"""
         db_obj = UserDB(
             username=obj_in.username,
             email=obj_in.email,
-            password_hash=hashed_password,
+            password_hash=password_hash,
             balance=0.0,  # Явно указываем начальный баланс
             is_active=True,
             role='USER'  # Добавляем роль по умолчанию
         )
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
     
     def authenticate(self, db: Session, username: str, password: str) -> Optional[UserDB]:
         user = self.get_by_username(db, username=username)
         if not user:
             return None
-        if not pwd_context.verify(password, user.password_hash):
+        valid, new_hash = get_password_hasher().verify_sync(password, user.password_hash)
+        if not valid:
             return None
+        if new_hash:
+            self.update_password_hash(db, user.id, new_hash)
         return user
     
+    def update_password_hash(self, db: Session, user_id: str, password_hash: str) -> None:
+        """Сохранить хеш, пересчитанный при входе (изменилась стоимость bcrypt)"""
+        db.execute(update(UserDB).where(UserDB.id == user_id).values(password_hash=password_hash))
+        db.commit()
+    
     def update_balance(self, db: Session, user_id: str, amount: float) -> Optional[UserDB]:
-        user = self.get(db, user_id)
-        if user:
-            user.balance += amount
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+        """Изменить баланс одним UPDATE ... RETURNING (без чтения перед записью и после нее)"""
+        mark_principal_changed(db, user_id)
+        stmt = (
+            update(UserDB)
+            .where(UserDB.id == user_id)
+            .values(balance=UserDB.balance + amount)
+            .returning(UserDB)
+        )
+        user = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+        db.commit()
         return user
+    
+    def debit_balance(self, db: Session, user_id: str, amount: float) -> Optional[float]:
+        """
+        Условное списание одним запросом (UPDATE ... WHERE balance >= amount RETURNING).
+        Не делает commit - вызывается внутри транзакции вызывающего кода.
+        :return: новый баланс или None, если средств недостаточно
+        """
+        mark_principal_changed(db, user_id)
+        stmt = (
+            update(UserDB)
+            .where(UserDB.id == user_id, UserDB.balance >= amount)
+            .values(balance=UserDB.balance - amount)
+            .returning(UserDB.balance)
+            .execution_options(synchronize_session="fetch")
+        )
+        return db.execute(stmt).scalar_one_or_none()
 
 crud_user = CRUDUser(UserDB)
@@ -1,7 +1,8 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from app.core.config import settings
 
 # Получаем URL из метода settings
@@ -10,11 +11,13 @@ engine = create_engine(
     pool_pre_ping=True,
     pool_size=settings.POOL_SIZE,
     max_overflow=settings.MAX_OVERFLOW,
+    pool_timeout=settings.POOL_TIMEOUT,
     echo=settings.DEBUG
 )
 
 # Создаем SessionLocal
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: ответ строится из объектов после commit без повторных SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 def get_db() -> Generator[Session, None, None]:
     """Зависимость для получения сессии БД"""
@@ -24,6 +27,42 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+# Асинхронный движок (asyncpg) для эндпоинтов API: ожидание БД не занимает поток,
+# число параллельных запросов к БД ограничено пулом (POOL_SIZE + MAX_OVERFLOW)
+async_engine = create_async_engine(
+    settings.get_async_database_url(),
+    pool_pre_ping=True,
+    pool_size=settings.POOL_SIZE,
+    max_overflow=settings.MAX_OVERFLOW,
+    pool_timeout=settings.POOL_TIMEOUT,
+    echo=settings.DEBUG
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Реплика для чтения: отдельный пул; без настроек реплики - тот же движок
+_read_url = settings.get_async_read_database_url()
+async_read_engine = create_async_engine(
+    _read_url,
+    pool_pre_ping=True,
+    pool_size=settings.POOL_SIZE,
+    max_overflow=settings.MAX_OVERFLOW,
+    pool_timeout=settings.POOL_TIMEOUT,
+    echo=settings.DEBUG
+) if _read_url else async_engine
+
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Зависимость для получения асинхронной сессии БД"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Сессия на реплике (read-only эндпоинты используют deps.get_read_db)"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
 def init_db() -> None:
     """Создание таблиц в базе данных"""
     from app.models.db.base import Base
@@ -9,15 +9,15 @@ from app.models.db.user import UserDB
 from app.models.db.ml_model import MLModelDB
 from app.models.db.transaction import TransactionDB
 from app.models.enums import UserRole, ModelType, TransactionType
-from passlib.context import CryptContext
+from app.services.password_hasher import get_password_hasher, shutdown_password_hasher
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def init_demo_data(db: Session) -> None:
     """Создание демо-пользователей и моделей"""
+    hasher = get_password_hasher()
     
     # 1. Создаем демо-пользователя с правильным ENUM значением
     demo_user = db.query(UserDB).filter(UserDB.username == "demo_user").first()
@@ -25,7 +25,7 @@ def init_demo_data(db: Session) -> None:
         demo_user = UserDB(
             username="demo_user",
             email="demo@example.com",
-            password_hash=pwd_context.hash("demo123"),
+            password_hash=hasher.hash_sync("demo123"),
             role=UserRole.USER,  # ✅ Правильное ENUM значение
             balance=100.0,
             is_active=True
@@ -50,7 +50,7 @@ def init_demo_data(db: Session) -> None:
         admin = UserDB(
             username="admin",
             email="admin@example.com",
-            password_hash=pwd_context.hash("admin123"),
+            password_hash=hasher.hash_sync("admin123"),
             role=UserRole.ADMIN,  # ✅ Правильное ENUM значение
             balance=1000.0,
             is_active=True
@@ -122,6 +122,7 @@ def main() -> None:
         raise
     finally:
         db.close()
+        shutdown_password_hasher()
     
     logger.info("🎉 Инициализация базы данных завершена успешно!")
 
@@ -0,0 +1,148 @@
+"""
+Помесячное секционирование по created_at (PostgreSQL): объявление в моделях,
+создание секций заранее, отсоединение и выгрузка старых секций в архив.
+Секция таблицы t за январь 2024 - t_y2024m01, границы [2024-01-01, 2024-02-01).
+"""
+
+import gzip
+import os
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import PrimaryKeyConstraint, Table, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.config import settings
+
+PARTITIONED_TABLES = ("prediction_tasks", "transactions")
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+
+def monthly_partitioning(column: str = "created_at") -> Dict[str, Any]:
+    """Аргументы таблицы (__table_args__) для помесячного секционирования по column"""
+    return {"postgresql_partition_by": f"RANGE ({column})", "info": {"partition_key": column}}
+
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _primary_key_with_partition_key(constraint, compiler, **kw):
+    # PostgreSQL требует ключ секционирования в первичном ключе секционированной таблицы.
+    # В маппере ключ остается (id): объекты идентифицируются и обновляются по id
+    ddl = compiler.visit_primary_key_constraint(constraint, **kw)
+    partition_key = constraint.table.info.get("partition_key")
+    if not ddl or not partition_key or partition_key in constraint.columns.keys():
+        return ddl
+    return ddl.replace(")", f", {compiler.preparer.quote(partition_key)})", 1)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Месяц секции по имени (None - не секция таблицы table)"""
+    match = _PARTITION_NAME.match(name)
+    if match is None or match.group("table") != table:
+        return None
+    return date(int(match.group("year")), int(match.group("month")), 1)
+
+
+def ensure_partitions(conn: Connection, table: str, *, start: date, months: int) -> List[str]:
+    """
+    Создание секций на months месяцев начиная с месяца start (существующие пропускаются)
+    :return: имена секций
+    """
+    names = []
+    lower = month_start(start)
+    for _ in range(months):
+        upper = add_months(lower, 1)
+        name = partition_name(table, lower)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        names.append(name)
+        lower = upper
+    return names
+
+
+def list_partition_tables(conn: Connection, table: str) -> List[Tuple[str, bool, bool]]:
+    """
+    Таблицы-секции table, в том числе уже отсоединенные, но еще не выгруженные
+    :return: (имя, присоединена, отсоединение не завершено) в порядке месяцев
+    """
+    rows = conn.execute(text(
+        """
+        SELECT c.relname,
+               i.inhrelid IS NOT NULL AS attached,
+               COALESCE(i.inhdetachpending, false) AS detach_pending
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = current_schema()
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+        WHERE c.relkind = 'r' AND c.relname LIKE :prefix
+        ORDER BY c.relname
+        """
+    ), {"prefix": f"{table}\\_y%"})
+    return [
+        (row.relname, row.attached, row.detach_pending)
+        for row in rows if partition_month(table, row.relname) is not None
+    ]
+
+
+def partitions_to_archive(table: str, names: List[str], *, today: date, retention_months: int) -> List[str]:
+    """Секции, целиком старше retention_months месяцев от текущего месяца"""
+    cutoff = add_months(month_start(today), -retention_months)
+    archive = []
+    for name in names:
+        month = partition_month(table, name)
+        if month is not None and month < cutoff:
+            archive.append(name)
+    return archive
+
+
+def detach_partition(conn: Connection, table: str, name: str, *, pending: bool = False) -> None:
+    """
+    Отсоединение секции без блокировки записи в таблицу (conn - в режиме AUTOCOMMIT).
+    Прерванное отсоединение CONCURRENTLY завершается через FINALIZE
+    """
+    mode = "FINALIZE" if pending else "CONCURRENTLY"
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} {mode}"))
+
+
+def export_partition(dbapi_connection: Any, name: str, archive_dir: str) -> str:
+    """
+    Выгрузка таблицы в <archive_dir>/<name>.csv.gz через COPY (psycopg2)
+    :return: путь к архиву
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+        finally:
+            cursor.close()
+    # Архив появляется под своим именем только целиком
+    os.replace(tmp_path, path)
+    return path
+
+
+@event.listens_for(Table, "after_create")
+def _create_initial_partitions(table: Table, connection: Connection, **kw) -> None:
+    # Секционированная таблица без секций не принимает строки: при create_all
+    # сразу создаются секции текущего и следующих месяцев
+    if connection.dialect.name != "postgresql" or "partition_key" not in table.info:
+        return
+    ensure_partitions(connection, table.name, start=date.today(), months=settings.PARTITION_MONTHS_AHEAD + 1)
@@ -0,0 +1,3 @@
+"""
+Периодические задачи обслуживания (запускаются по расписанию: cron, k8s CronJob)
+"""
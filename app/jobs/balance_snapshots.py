@@ -0,0 +1,34 @@
+"""
+Снимки баланса пользователей и сверка с журналом транзакций.
+Запуск: python -m app.jobs.balance_snapshots (например, раз в час по cron)
+"""
+
+import logging
+import sys
+
+from app.core.config import settings
+from app.services.ledger import snapshot_all
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """Главная функция задачи: код выхода 1, если есть расхождения"""
+    from app.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = snapshot_all(db)
+    finally:
+        db.close()
+
+    logger.info(
+        "Снимки баланса: пользователей %s, новых снимков %s, расхождений %s",
+        stats["users"], stats["snapshots"], stats["discrepancies"]
+    )
+    return 1 if stats["discrepancies"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Обслуживание помесячных секций prediction_tasks и transactions: создание
+секций на следующие месяцы, отсоединение старых секций и выгрузка в
+<PARTITION_ARCHIVE_DIR>/<секция>.csv.gz. Выгруженная секция удаляется.
+Запуск: python -m app.jobs.partitions (например, раз в сутки по cron)
+"""
+
+import logging
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.database.partitions import (
+    PARTITIONED_TABLES,
+    detach_partition,
+    ensure_partitions,
+    export_partition,
+    list_partition_tables,
+    partitions_to_archive
+)
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+def archive_table(engine: Engine, table: str, *, today: date) -> List[str]:
+    """
+    Отсоединение, выгрузка и удаление секций table старше PARTITION_RETENTION_MONTHS
+    :return: пути к архивам
+    """
+    # DETACH CONCURRENTLY не выполняется внутри транзакции
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        partitions = list_partition_tables(conn, table)
+        states = {name: (attached, pending) for name, attached, pending in partitions}
+        names = partitions_to_archive(
+            table, [name for name, _, _ in partitions],
+            today=today, retention_months=settings.PARTITION_RETENTION_MONTHS
+        )
+
+        paths = []
+        for name in names:
+            attached, pending = states[name]
+            if attached:
+                # Отсоединенная секция не видна запросам к table; при сбое выгрузки
+                # она остается таблицей и будет выгружена при следующем запуске
+                detach_partition(conn, table, name, pending=pending)
+                logger.info("Секция %s отсоединена", name)
+
+            raw = engine.raw_connection()
+            try:
+                path = export_partition(raw.driver_connection, name, settings.PARTITION_ARCHIVE_DIR)
+                raw.commit()
+            finally:
+                raw.close()
+
+            conn.execute(text(f"DROP TABLE {name}"))
+            logger.info("Секция %s выгружена в %s и удалена", name, path)
+            paths.append(path)
+        return paths
+
+
+def run(engine: Engine, *, today: date) -> Dict[str, int]:
+    """Секции вперед и архивирование для всех секционированных таблиц"""
+    stats = {"ensured": 0, "archived": 0}
+    for table in PARTITIONED_TABLES:
+        with engine.begin() as conn:
+            stats["ensured"] += len(ensure_partitions(
+                conn, table, start=today, months=settings.PARTITION_MONTHS_AHEAD + 1
+            ))
+        stats["archived"] += len(archive_table(engine, table, today=today))
+    return stats
+
+
+def main() -> None:
+    """Главная функция задачи"""
+    from app.database.database import engine
+
+    stats = run(engine, today=date.today())
+    logger.info("Секции: есть впереди %s, выгружено в архив %s", stats["ensured"], stats["archived"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Удаление истекших и отозванных семейств refresh-токенов.
+Запуск: python -m app.jobs.refresh_tokens (например, раз в сутки по cron)
+"""
+
+import logging
+import sys
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.crud.refresh_token import crud_refresh_token
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """Главная функция задачи"""
+    from app.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        deleted = crud_refresh_token.delete_stale(db, now=datetime.now(timezone.utc))
+    finally:
+        db.close()
+
+    logger.info("Удалено семейств refresh-токенов: %s", deleted)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
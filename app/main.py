@@ -1,11 +1,17 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn  # ИСПРАВЛЕНО: было uvicron
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.database.database import engine, init_db
+from app.database.database import async_engine, async_read_engine, engine, init_db
 from app.models.db.base import Base
+from app.services.batching import close_batchers
+from app.services.inference_executor import shutdown_inference_executor
+from app.services.password_hasher import shutdown_password_hasher
+from app.services.principal_cache import listen_for_invalidations
 
 # Создаем таблицы (если еще не созданы)
 Base.metadata.create_all(bind=engine)
@@ -34,6 +40,32 @@ if settings.BACKEND_CORS_ORIGINS:
 # Подключаем роутеры
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+_background_tasks = set()
+
+@app.on_event("startup")
+async def start_principal_invalidations():
+    # Сброс кеша пользователей, разосланный другими процессами (при REDIS_URL)
+    task = asyncio.create_task(listen_for_invalidations())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in list(_background_tasks):
+        task.cancel()
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    shutdown_inference_executor()
+    shutdown_password_hasher()
+    close_batchers()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
 @app.get("/")
 async def root():
     return {
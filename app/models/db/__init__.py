@@ -2,10 +2,16 @@ from app.models.db.user import UserDB
 from app.models.db.ml_model import MLModelDB
 from app.models.db.transaction import TransactionDB
 from app.models.db.prediction import PredictionTaskDB
+from app.models.db.balance_snapshot import BalanceSnapshotDB
+from app.models.db.refresh_token import RefreshTokenFamilyDB
+from app.models.db.api_key import ApiKeyDB
 
 __all__ = [
     'UserDB',
     'MLModelDB',
     'TransactionDB',
-    'PredictionTaskDB'
+    'PredictionTaskDB',
+    'BalanceSnapshotDB',
+    'RefreshTokenFamilyDB',
+    'ApiKeyDB'
 ]
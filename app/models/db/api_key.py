@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy.sql import func
+from app.models.db.base import Base
+from app.models.db.types import GUID, JSONDocument, new_id
+
+class ApiKeyDB(Base):
+    """API-ключ пользователя для машинных клиентов (сам ключ не хранится)"""
+    __tablename__ = "api_keys"
+    # Серверные значения (created_at/updated_at) возвращаются из INSERT/UPDATE через RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    
+    id = Column(GUID, primary_key=True, default=new_id)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    # HMAC-SHA256 (hex) ключа: ключ ищется по уникальному индексу
+    key_hash = Column(String(64), nullable=False, unique=True)
+    # Начало ключа - чтобы пользователь узнал ключ в списке
+    prefix = Column(String(12), nullable=False)
+    # Разрешенные области (ApiKeyScope)
+    scopes = Column(JSONDocument, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ApiKeyDB(id={self.id}, user_id={self.user_id}, prefix={self.prefix})>"
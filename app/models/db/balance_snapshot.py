@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.sql import func
+from app.models.db.base import Base
+from app.models.db.types import GUID, Money, new_id
+
+class BalanceSnapshotDB(Base):
+    """Снимок баланса пользователя по журналу транзакций"""
+    __tablename__ = "balance_snapshots"
+    # Серверные значения (created_at/updated_at) возвращаются из INSERT/UPDATE через RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    # Последний снимок пользователя - с наибольшим водяным знаком
+    __table_args__ = (
+        Index("idx_balance_snapshots_user_watermark", "user_id", "last_transaction_at", "last_transaction_id"),
+    )
+    
+    id = Column(GUID, primary_key=True, default=new_id)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Баланс по всем транзакциям до водяного знака включительно
+    balance = Column(Money, nullable=False)
+    # Водяной знак: (created_at, id) последней учтенной транзакции
+    last_transaction_at = Column(DateTime(timezone=True), nullable=False)
+    last_transaction_id = Column(GUID, nullable=False)
+    # Сколько всего транзакций учтено в снимке
+    transaction_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<BalanceSnapshotDB(user_id={self.user_id}, balance={self.balance})>"
@@ -1,18 +1,20 @@
-from sqlalchemy import Column, String, Float, Boolean, DateTime, Enum, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text
 from sqlalchemy.sql import func
-import uuid
 from app.models.db.base import Base
+from app.models.db.types import GUID, Money, new_id
 from app.models.enums import ModelType
 
 class MLModelDB(Base):
     """Модель ML модели для базы данных"""
     __tablename__ = "ml_models"
+    # Серверные значения (created_at/updated_at) возвращаются из INSERT/UPDATE через RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=new_id)
     name = Column(String(100), nullable=False, index=True)
     description = Column(Text)
     model_type = Column(Enum(ModelType), nullable=False)
-    cost_per_prediction = Column(Float, default=0.0, nullable=False)
+    cost_per_prediction = Column(Money, default=0.0, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,23 +1,36 @@
-from sqlalchemy import Column, String, Float, DateTime, Enum, ForeignKey, Text, JSON
+from typing import Any, Dict, List
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Index, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-import uuid
+from app.database.partitions import monthly_partitioning
 from app.models.db.base import Base
+from app.models.db.types import GUID, JSONDocument, Money, new_id
 from app.models.enums import TaskStatus
 
 class PredictionTaskDB(Base):
     """Модель задачи предсказания для базы данных"""
     __tablename__ = "prediction_tasks"
+    # Серверные значения (created_at/updated_at) возвращаются из INSERT/UPDATE через RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    # Keyset-пагинация истории: WHERE user_id = ? AND (created_at, id) < (?, ?)
+    __table_args__ = (
+        Index("idx_prediction_tasks_user_created", "user_id", "created_at", "id"),
+        # Помесячные секции по created_at (PostgreSQL)
+        monthly_partitioning("created_at"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    model_id = Column(String(36), ForeignKey("ml_models.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(GUID, primary_key=True, default=new_id)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    model_id = Column(GUID, ForeignKey("ml_models.id", ondelete="CASCADE"), nullable=False, index=True)
     status = Column(Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False, index=True)
-    input_data = Column(JSON, nullable=False)
-    valid_data = Column(JSON)
-    invalid_data = Column(JSON)
-    result = Column(JSON)
-    total_cost = Column(Float)
+    input_data = Column(JSONDocument, nullable=False)
+    # Результат валидации хранится компактно: счетчики и [индекс, код ошибки]
+    # для невалидных строк; сами строки есть только в input_data
+    valid_count = Column(Integer, default=0, nullable=False)
+    invalid_count = Column(Integer, default=0, nullable=False)
+    invalid_rows = Column(JSONDocument)
+    result = Column(JSONDocument)
+    total_cost = Column(Money)
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -26,5 +39,20 @@ class PredictionTaskDB(Base):
     user = relationship("UserDB", backref="prediction_tasks")
     model = relationship("MLModelDB", backref="prediction_tasks")
     
+    @property
+    def valid_data(self) -> List[Dict[str, Any]]:
+        """Валидные строки, восстановленные из input_data"""
+        invalid = self._invalid_indices()
+        return [row for i, row in enumerate(self.input_data or []) if i not in invalid]
+    
+    @property
+    def invalid_data(self) -> List[Dict[str, Any]]:
+        """Невалидные строки, восстановленные из input_data"""
+        data = self.input_data or []
+        return [data[i] for i in sorted(self._invalid_indices())]
+    
+    def _invalid_indices(self) -> set:
+        return {index for index, _ in (self.invalid_rows or [])}
+    
     def __repr__(self):
         return f"<PredictionTaskDB(id={self.id}, status={self.status})>"
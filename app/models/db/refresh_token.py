@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+from app.models.db.base import Base
+from app.models.db.types import GUID, new_id
+
+class RefreshTokenFamilyDB(Base):
+    """
+    Семейство refresh-токенов одного входа: одна строка на семейство,
+    при ротации заменяется хеш текущего токена
+    """
+    __tablename__ = "refresh_token_families"
+    
+    # id семейства входит в сам токен: поиск - по первичному ключу
+    id = Column(GUID, primary_key=True, default=new_id)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # SHA-256 (hex) секрета текущего токена; предыдущие токены семейства не принимаются
+    token_hash = Column(String(64), nullable=False)
+    # Сколько раз семейство ротировалось
+    generation = Column(Integer, default=0, nullable=False)
+    # Срок продлевается при каждой ротации
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<RefreshTokenFamilyDB(id={self.id}, user_id={self.user_id}, generation={self.generation})>"
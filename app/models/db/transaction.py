@@ -1,23 +1,32 @@
-from sqlalchemy import Column, String, Float, DateTime, Enum, ForeignKey, Text
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-import uuid
+from app.database.partitions import monthly_partitioning
 from app.models.db.base import Base
+from app.models.db.types import GUID, Money, new_id
 from app.models.enums import TransactionType
 
 class TransactionDB(Base):
     """Модель транзакции для базы данных"""
     __tablename__ = "transactions"
+    # Серверные значения (created_at/updated_at) возвращаются из INSERT/UPDATE через RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    # Keyset-пагинация истории: WHERE user_id = ? AND (created_at, id) < (?, ?)
+    __table_args__ = (
+        Index("idx_transactions_user_created", "user_id", "created_at", "id"),
+        # Помесячные секции по created_at (PostgreSQL)
+        monthly_partitioning("created_at"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(GUID, primary_key=True, default=new_id)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # ✅ Отдельное поле для типа транзакции!
     transaction_type = Column(Enum(TransactionType), nullable=False)
     
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     description = Column(Text, nullable=True)  # Описание, не тип!
-    task_id = Column(String(36), nullable=True)
+    task_id = Column(GUID, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     user = relationship("UserDB", backref="transactions")
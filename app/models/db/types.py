@@ -0,0 +1,61 @@
+"""
+Типы колонок: в PostgreSQL - нативные UUID, JSONB и NUMERIC, в остальных
+СУБД (SQLite в тестах) - прежние String(36), JSON и вещественные числа.
+В Python значения те же, что раньше: строки, списки/словари и float.
+"""
+
+import uuid
+from typing import Any
+
+from sqlalchemy import JSON, Numeric, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+
+class GUID(TypeDecorator):
+    """UUID (16 байт) в PostgreSQL, String(36) в остальных СУБД; в Python - строка"""
+
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(String(36))
+
+
+class JSONDocument(TypeDecorator):
+    """JSONB в PostgreSQL (разобранное двоичное представление), JSON в остальных СУБД"""
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.JSONB())
+        return dialect.type_descriptor(JSON())
+
+
+class Money(TypeDecorator):
+    """Денежная сумма: NUMERIC(10, 2) в БД, float в Python"""
+
+    impl = Numeric(10, 2, asdecimal=False)
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        # SQLite с типом NUMERIC возвращает целые суммы как int
+        return None if value is None else float(value)
+
+
+def new_id() -> str:
+    """Значение по умолчанию для первичных ключей GUID"""
+    return str(uuid.uuid4())
+
+
+def is_guid(value: Any) -> bool:
+    """Строка - UUID (иначе в PostgreSQL запрос по колонке GUID завершится ошибкой)"""
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
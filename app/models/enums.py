@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 class UserRole(Enum):
     USER = "USER"
@@ -20,3 +20,19 @@ class ModelType(Enum):
     CLASSIFICATION = "CLASSIFICATION"
     REGRESSION = "REGRESSION"
     # CLUSTERING = "CLUSTERING"  # Раскомментировать когда понадобится
+
+class ApiKeyScope(Enum):
+    """Области API-ключа: чтение (GET), предсказания, пополнение баланса, метрики администратора"""
+    READ = "read"
+    PREDICT = "predict"
+    BALANCE = "balance"
+    ADMIN = "admin"
+
+class ValidationErrorCode(IntEnum):
+    """Код первой ошибки валидации строки (0 - строка валидна)"""
+    OK = 0
+    NOT_AN_OBJECT = 1
+    MISSING_FIELD = 2
+    NULL_VALUE = 3
+    WRONG_TYPE = 4
+    OUT_OF_RANGE = 5
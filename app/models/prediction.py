@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from itertools import compress, repeat
 from typing import List, Optional, Dict, Any
+import operator
 import uuid
 
+import numpy as np
+
 from app.models.user import AuditableEntity
-from app.models.enums import TaskStatus
+from app.models.enums import TaskStatus, ValidationErrorCode
 
 
 class DataValidator(ABC):
@@ -36,6 +40,220 @@ class SimpleDataValidator(DataValidator):
         return True
 
 
+class FieldSpec:
+    """Правило проверки одного поля строки"""
+
+    def __init__(
+            self,
+            name: str,
+            dtype: Optional[type] = None,
+            min_value: Optional[float] = None,
+            max_value: Optional[float] = None,
+            nullable: bool = True
+    ):
+        """
+        :param name: имя поля
+        :param dtype: ожидаемый тип (float/int - числовые, str, bool), None - любой
+        :param min_value: нижняя граница для числовых полей
+        :param max_value: верхняя граница для числовых полей
+        :param nullable: допускается ли None (и NaN для числовых полей)
+        """
+        self.name = name
+        self.dtype = dtype
+        self.min_value = min_value
+        self.max_value = max_value
+        self.nullable = nullable
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.dtype in (int, float)
+
+
+class ValidationResult:
+    """Результат колоночной валидации: маска валидных строк и коды ошибок"""
+
+    def __init__(self, error_codes: np.ndarray):
+        self._error_codes = error_codes
+        self._valid_mask = error_codes == ValidationErrorCode.OK
+
+    @property
+    def valid_mask(self) -> np.ndarray:
+        return self._valid_mask
+
+    @property
+    def error_codes(self) -> np.ndarray:
+        return self._error_codes
+
+    @property
+    def valid_count(self) -> int:
+        return int(np.count_nonzero(self._valid_mask))
+
+    @property
+    def invalid_count(self) -> int:
+        return len(self._valid_mask) - self.valid_count
+
+    def valid_indices(self) -> np.ndarray:
+        return np.flatnonzero(self._valid_mask)
+
+    def invalid_indices(self) -> np.ndarray:
+        return np.flatnonzero(~self._valid_mask)
+
+    def valid_rows(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Валидные строки (без копирования самих словарей)"""
+        return list(compress(data, self._valid_mask))
+
+    def invalid_rows(self) -> List[List[int]]:
+        """Компактное описание невалидных строк: [[индекс, код ошибки], ...]"""
+        indices = self.invalid_indices()
+        return np.column_stack((indices, self._error_codes[indices])).tolist()
+
+    def split(self, data: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Разделение исходных строк на валидные и невалидные"""
+        return (
+            list(compress(data, self._valid_mask)),
+            list(compress(data, ~self._valid_mask))
+        )
+
+
+_NOT_AN_OBJECT: Dict[str, Any] = {}
+
+
+class ColumnarDataValidator(DataValidator):
+    """
+    Колоночный валидатор: вместо списков строк возвращает коды ошибок
+    (ValidationResult), проверки null, типов и диапазонов выполняются масками NumPy.
+    Присутствие полей проверяется через dict.__contains__: он же отсекает
+    строки, которые не являются объектами (TypeError), поэтому в типичном
+    случае отдельного прохода с isinstance нет.
+
+    Для строки сохраняется код первой найденной ошибки: сначала проверяется
+    тип строки и присутствие полей, затем значения полей по порядку правил.
+    """
+
+    def __init__(
+            self,
+            required_fields: Optional[List[str]] = None,
+            fields: Optional[List[FieldSpec]] = None
+    ):
+        """
+        :param required_fields: обязательные поля без ограничений на значение
+        :param fields: подробные правила для полей
+        """
+        self._fields = [FieldSpec(name) for name in (required_fields or [])]
+        self._fields.extend(fields or [])
+        self._required = list(dict.fromkeys(spec.name for spec in self._fields))
+        # Поля, для которых нужны значения, а не только присутствие
+        self._checked_fields = [
+            spec for spec in self._fields
+            if spec.dtype is not None or not spec.nullable
+        ]
+
+    def validate(self, data: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        return self.validate_columns(data).split(data)
+
+    def validate_columns(self, data: List[Dict[str, Any]]) -> ValidationResult:
+        """Валидация без копирования строк"""
+        n = len(data)
+        codes = np.zeros(n, dtype=np.uint8)
+        if n == 0:
+            return ValidationResult(codes)
+
+        rows = data
+        try:
+            present = self._present(rows, n)
+        except TypeError:
+            # dict.__contains__ не применим к строкам, которые не являются объектами
+            is_object = np.fromiter(map(isinstance, data, repeat(dict)), dtype=bool, count=n)
+            codes[~is_object] = ValidationErrorCode.NOT_AN_OBJECT
+            rows = [row if isinstance(row, dict) else _NOT_AN_OBJECT for row in data]
+            present = self._present(rows, n)
+        _set_code(codes, ~present, ValidationErrorCode.MISSING_FIELD)
+
+        for spec in self._checked_fields:
+            column = list(map(dict.get, rows, repeat(spec.name, n)))
+            self._check_column(spec, column, codes)
+
+        return ValidationResult(codes)
+
+    def _present(self, rows: List[Dict[str, Any]], n: int) -> np.ndarray:
+        """Маска строк, в которых есть все обязательные поля"""
+        present = np.ones(n, dtype=bool)
+        for name in self._required:
+            present &= np.fromiter(map(dict.__contains__, rows, repeat(name, n)), dtype=bool, count=n)
+        return present
+
+    def _check_column(self, spec: FieldSpec, column: List[Any], codes: np.ndarray) -> None:
+        """Проверка значений одной колонки (отсутствующие поля уже отмечены)"""
+        n = len(column)
+        null = np.fromiter(map(operator.is_, column, repeat(None, n)), dtype=bool, count=n)
+        if spec.dtype is None:
+            if not spec.nullable:
+                _set_code(codes, null, ValidationErrorCode.NULL_VALUE)
+            return
+
+        types = list(map(type, column))
+        if spec.is_numeric:
+            # JSON дает только int/float; bool - отдельный тип и числом не считается
+            typed = np.fromiter(map(operator.is_, types, repeat(int, n)), dtype=bool, count=n)
+            if spec.dtype is float:
+                typed |= np.fromiter(map(operator.is_, types, repeat(float, n)), dtype=bool, count=n)
+
+            # int больше диапазона float64 (например, 10**400) заведомо вне диапазона
+            overflow = np.zeros(n, dtype=bool)
+            try:
+                values = _to_float64(column, typed)
+            except OverflowError:
+                overflow = typed & np.fromiter(map(_overflows, column), dtype=bool, count=n)
+                typed &= ~overflow
+                values = _to_float64(column, typed)
+
+            nan = np.isnan(values)
+            if nan.any():
+                null |= nan
+                typed &= ~nan
+
+            if not spec.nullable:
+                _set_code(codes, null, ValidationErrorCode.NULL_VALUE)
+            _set_code(codes, ~null & ~typed & ~overflow, ValidationErrorCode.WRONG_TYPE)
+
+            out_of_range = overflow.copy()
+            if spec.min_value is not None:
+                out_of_range |= values < spec.min_value
+            if spec.max_value is not None:
+                out_of_range |= values > spec.max_value
+            _set_code(codes, (typed | overflow) & out_of_range, ValidationErrorCode.OUT_OF_RANGE)
+            return
+
+        typed = np.fromiter(map(operator.is_, types, repeat(spec.dtype, n)), dtype=bool, count=n)
+        if not spec.nullable:
+            _set_code(codes, null, ValidationErrorCode.NULL_VALUE)
+        _set_code(codes, ~null & ~typed, ValidationErrorCode.WRONG_TYPE)
+
+
+def _to_float64(column: List[Any], typed: np.ndarray) -> np.ndarray:
+    """Значения числовой колонки (нетипизированные строки - 0)"""
+    if typed.all():
+        return np.array(column, dtype=np.float64)
+    values = np.zeros(len(column), dtype=np.float64)
+    values[typed] = np.fromiter(compress(column, typed), dtype=np.float64, count=int(typed.sum()))
+    return values
+
+
+def _overflows(value: Any) -> bool:
+    try:
+        float(value)
+    except OverflowError:
+        return True
+    except (TypeError, ValueError):
+        return False
+    return False
+
+
+def _set_code(codes: np.ndarray, mask: np.ndarray, code: ValidationErrorCode) -> None:
+    """Записать код ошибки строкам, у которых еще нет более грубой ошибки"""
+    codes[mask & (codes == ValidationErrorCode.OK)] = code
+
+
 class PredictionTask(AuditableEntity):
     def __init__(
             self,
@@ -106,6 +324,11 @@ class PredictionTask(AuditableEntity):
         self._invalid_data = invalid_data
         self.update_timestamp()
 
+    def mark_validation_error(self) -> None:
+        self._status = TaskStatus.VALIDATION_ERROR
+        self._completed_at = datetime.now()
+        self.update_timestamp()
+
     def start_processing(self) -> None:
         self._status = TaskStatus.PROCESSING
         self.update_timestamp()
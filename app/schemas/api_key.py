@@ -0,0 +1,24 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from app.models.enums import ApiKeyScope
+from datetime import datetime
+
+class ApiKeyCreateRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    scopes: List[ApiKeyScope] = Field(default_factory=lambda: [ApiKeyScope.READ], min_length=1)
+    expires_in_days: Optional[int] = Field(None, gt=0, description="Срок действия (без него - бессрочный)")
+
+class ApiKeyResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: str
+    name: str
+    prefix: str
+    scopes: List[ApiKeyScope]
+    expires_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+    created_at: datetime
+
+class ApiKeyCreatedResponse(ApiKeyResponse):
+    # Ключ показывается один раз: в БД хранится только его хеш
+    key: str
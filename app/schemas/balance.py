@@ -18,3 +18,12 @@ class DepositResponse(BaseModel):
     new_balance: float
     description: str
     created_at: datetime
+
+class AuditedBalanceResponse(BaseModel):
+    user_id: str
+    balance: float
+    ledger_balance: float
+    discrepancy: float
+    is_consistent: bool
+    snapshot_at: Optional[datetime] = None
+    transactions_since_snapshot: int
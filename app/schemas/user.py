@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from app.models.enums import UserRole
 from datetime import datetime
@@ -19,11 +19,21 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Optional[str] = None
     user_id: Optional[str] = None
     role: Optional[UserRole] = None
+    jti: Optional[str] = None
+    issued_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    # Только для API-ключей: id ключа и его области (у JWT - None, без ограничений)
+    api_key_id: Optional[str] = None
+    scopes: Optional[List[str]] = None
 
 class UserUpdate(BaseModel):
     username: Optional[str] = None
@@ -0,0 +1,110 @@
+"""
+Контроль допуска запросов на предсказание: ограничение числа запросов
+в работе глобально и на модель. Сверх лимита запрос сразу отклоняется
+(429/503 с Retry-After), а не ждет соединения из пула БД.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import status
+
+from app.core.config import settings
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Запрос не допущен: превышен лимит запросов в работе"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Счетчики запросов в работе с лимитами"""
+
+    def __init__(self, max_in_flight: int, max_in_flight_per_model: int, retry_after: int = 1):
+        """
+        :param max_in_flight: запросов в работе на процесс (все модели)
+        :param max_in_flight_per_model: запросов в работе к одной модели
+        :param retry_after: значение заголовка Retry-After, секунд
+        """
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_model = max_in_flight_per_model
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._per_model: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"admitted": 0, "rejected_global": 0, "rejected_model": 0}
+
+    def acquire(self, model_id: str) -> None:
+        """
+        Допуск запроса к модели
+        :raises AdmissionRejectedError: 503 при глобальной перегрузке, 429 при перегрузке модели
+        """
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._stats["rejected_global"] += 1
+                raise AdmissionRejectedError(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Service is overloaded, retry later",
+                    self.retry_after
+                )
+            model_in_flight = self._per_model.get(model_id, 0)
+            if model_in_flight >= self.max_in_flight_per_model:
+                self._stats["rejected_model"] += 1
+                raise AdmissionRejectedError(
+                    status.HTTP_429_TOO_MANY_REQUESTS,
+                    f"Too many concurrent requests for model {model_id}",
+                    self.retry_after
+                )
+            self._in_flight += 1
+            self._per_model[model_id] = model_in_flight + 1
+            self._stats["admitted"] += 1
+
+    def release(self, model_id: str) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            remaining = self._per_model[model_id] - 1
+            if remaining:
+                self._per_model[model_id] = remaining
+            else:
+                del self._per_model[model_id]
+
+    @contextmanager
+    def admit(self, model_id: str) -> Iterator[None]:
+        self.acquire(model_id)
+        try:
+            yield
+        finally:
+            self.release(model_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": self._in_flight,
+                "in_flight_per_model": dict(self._per_model),
+                "max_in_flight": self.max_in_flight,
+                "max_in_flight_per_model": self.max_in_flight_per_model
+            }
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Контроллер допуска процесса (создается при первом обращении)"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                settings.ADMISSION_MAX_IN_FLIGHT,
+                settings.ADMISSION_MAX_IN_FLIGHT_PER_MODEL,
+                settings.ADMISSION_RETRY_AFTER_SECONDS
+            )
+        return _controller
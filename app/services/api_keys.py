@@ -0,0 +1,151 @@
+"""
+API-ключи машинных клиентов (заголовок X-API-Key) вместо входа по паролю и JWT.
+В БД хранится HMAC-SHA256 ключа (API_KEY_HMAC_SECRET, по умолчанию SECRET_KEY)
+под уникальным индексом: ключ находится одним запросом по индексу, без bcrypt.
+Сравнение ключа сводится к поиску по HMAC, который без секрета не подобрать,
+поэтому время поиска ничего не говорит о самом ключе.
+Найденный ключ кешируется в процессе на API_KEY_CACHE_TTL_SECONDS. Запись
+кеша проверяется по token_denylist как токен, выданный в момент чтения ключа:
+отзыв ключа, смена роли или деактивация владельца заставляют перечитать ключ.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.async_crud import async_crud_api_key
+from app.schemas.user import TokenData
+from app.services.token_denylist import get_token_denylist
+
+KEY_PREFIX = "mlk_"
+
+
+def generate_api_key() -> str:
+    return KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def hash_api_key(key: str) -> str:
+    secret = settings.API_KEY_HMAC_SECRET or settings.SECRET_KEY
+    return hmac.new(secret.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+
+def api_key_jti(key_id: str) -> str:
+    """Идентификатор ключа в token_denylist"""
+    return f"api-key:{key_id}"
+
+
+class ApiKeyCache:
+    """In-process кеш найденных ключей по хешу с вытеснением по LRU и TTL"""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        # хеш ключа -> (срок жизни записи, claims ключа)
+        self._entries: "OrderedDict[str, Tuple[float, TokenData]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key_hash: str) -> Optional[TokenData]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key_hash]
+                return None
+            self._entries.move_to_end(key_hash)
+            return entry[1]
+
+    def set(self, key_hash: str, claims: TokenData) -> None:
+        with self._lock:
+            self._entries[key_hash] = (self._clock() + self._ttl, claims)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, key_hash: str) -> None:
+        with self._lock:
+            self._entries.pop(key_hash, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+async def resolve_api_key(db: AsyncSession, key: str) -> Optional[TokenData]:
+    """
+    Claims действующего ключа: из кеша или одним запросом к БД
+    :return: TokenData с user_id, ролью владельца, api_key_id и scopes или None
+    """
+    key_hash = hash_api_key(key)
+    cache = get_api_key_cache()
+    claims = cache.get(key_hash)
+    if claims is not None:
+        expired = claims.expires_at is not None and claims.expires_at <= time.time()
+        if not expired and not await get_token_denylist().is_revoked(claims.user_id, claims.jti, claims.issued_at):
+            return claims
+        cache.evict(key_hash)
+
+    # Момент чтения - до запроса: отзыв, закоммиченный после него, запись не пропустит
+    loaded_at = time.time()
+    row = await async_crud_api_key.get_active_by_hash(db, key_hash, now=datetime.now(timezone.utc))
+    if row is None:
+        return None
+    expires_at = row.expires_at
+    if expires_at is not None and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    claims = TokenData(
+        user_id=str(row.user_id),
+        role=row.role,
+        jti=api_key_jti(str(row.id)),
+        issued_at=loaded_at,
+        expires_at=expires_at.timestamp() if expires_at is not None else None,
+        api_key_id=str(row.id),
+        scopes=list(row.scopes)
+    )
+    cache.set(key_hash, claims)
+    return claims
+
+
+async def revoke_api_key(db: AsyncSession, key_id: str, *, user_id: str) -> bool:
+    """
+    Отозвать ключ пользователя. Кеш других процессов сбрасывается через
+    token_denylist (без REDIS_URL - не позже API_KEY_CACHE_TTL_SECONDS)
+    :return: False, если ключа нет или он уже отозван
+    """
+    key_hash = await async_crud_api_key.revoke(db, key_id, user_id=user_id, now=datetime.now(timezone.utc))
+    if key_hash is None:
+        return False
+    get_api_key_cache().evict(key_hash)
+    # Другие процессы увидят отзыв при проверке своих записей кеша
+    await get_token_denylist().revoke_token(api_key_jti(key_id), time.time() + settings.API_KEY_CACHE_TTL_SECONDS)
+    return True
+
+
+_cache: Optional[ApiKeyCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_api_key_cache() -> ApiKeyCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ApiKeyCache(
+                max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS
+            )
+        return _cache
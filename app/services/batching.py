@@ -0,0 +1,175 @@
+"""
+Микробатчинг инференса: строки из параллельных запросов к одной модели
+собираются в один батч и обрабатываются одним векторизованным вызовом.
+Границы запросов внутри батча сохраняются, поэтому результат запроса
+зависит только от его собственных строк.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.db.ml_model import MLModelDB
+
+# Вызов модели по батчу: список строк каждого запроса -> список предсказаний каждого запроса
+InferenceFn = Callable[[MLModelDB, List[List[Dict[str, Any]]]], List[List[Any]]]
+
+
+class _ModelQueue:
+    """Очередь ожидающих запросов одной модели"""
+
+    def __init__(self):
+        self.items: List[Tuple[MLModelDB, List[Dict[str, Any]], Future]] = []
+        self.rows = 0
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+
+class MicroBatcher:
+    """Сборщик батчей по model_id (max_batch_size строк или max_wait_ms ожидания)"""
+
+    def __init__(self, infer_fn: InferenceFn, max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        self._infer_fn = infer_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000.0
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"requests": 0, "rows": 0, "batches": 0}
+
+    def submit(self, model: MLModelDB, rows: List[Dict[str, Any]]) -> Future:
+        """
+        Постановка строк в батч модели
+        :return: Future со списком предсказаний для переданных строк
+        """
+        future: Future = Future()
+        if not rows:
+            future.set_result([])
+            return future
+
+        model_queue = self._get_queue(str(model.id))
+        with model_queue.condition:
+            model_queue.items.append((model, rows, future))
+            model_queue.rows += len(rows)
+            model_queue.condition.notify()
+        return future
+
+    def predict(self, model: MLModelDB, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Блокирующий вариант submit"""
+        return self.submit(model, rows).result()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """Остановка фоновых потоков (оставшиеся батчи дорабатываются)"""
+        with self._lock:
+            self._closed = True
+            queues = list(self._queues.values())
+        for model_queue in queues:
+            with model_queue.condition:
+                model_queue.condition.notify_all()
+            if model_queue.thread is not None:
+                model_queue.thread.join()
+
+    def _get_queue(self, model_id: str) -> _ModelQueue:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Batcher is closed")
+            model_queue = self._queues.get(model_id)
+            if model_queue is None:
+                model_queue = _ModelQueue()
+                model_queue.thread = threading.Thread(
+                    target=self._run,
+                    args=(model_queue,),
+                    name=f"batcher-{model_id}",
+                    daemon=True
+                )
+                self._queues[model_id] = model_queue
+                model_queue.thread.start()
+            return model_queue
+
+    def _run(self, model_queue: _ModelQueue) -> None:
+        while True:
+            batch = self._collect(model_queue)
+            if batch is None:
+                return
+            self._execute(batch)
+
+    def _collect(self, model_queue: _ModelQueue) -> Optional[List[Tuple[MLModelDB, List[Dict[str, Any]], Future]]]:
+        """Ожидание заполнения батча или истечения max_wait"""
+        with model_queue.condition:
+            while not model_queue.items:
+                if self._closed:
+                    return None
+                model_queue.condition.wait()
+
+            deadline = time.monotonic() + self._max_wait
+            while model_queue.rows < self._max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                model_queue.condition.wait(remaining)
+
+            # Запрос целиком попадает в один батч, даже если он больше max_batch_size
+            batch = []
+            batch_rows = 0
+            while model_queue.items:
+                rows = model_queue.items[0][1]
+                if batch and batch_rows + len(rows) > self._max_batch_size:
+                    break
+                batch.append(model_queue.items.pop(0))
+                batch_rows += len(rows)
+            model_queue.rows -= batch_rows
+            return batch
+
+    def _execute(self, batch: List[Tuple[MLModelDB, List[Dict[str, Any]], Future]]) -> None:
+        model = batch[0][0]
+        requests = [rows for _, rows, _ in batch]
+
+        with self._lock:
+            self._stats["requests"] += len(batch)
+            self._stats["rows"] += sum(map(len, requests))
+            self._stats["batches"] += 1
+
+        try:
+            results = self._infer_fn(model, requests)
+            if list(map(len, results)) != list(map(len, requests)):
+                raise RuntimeError("Model returned a wrong number of predictions")
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), predictions in zip(batch, results):
+            future.set_result(predictions)
+
+
+_batchers: Dict[InferenceFn, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(infer_fn: InferenceFn) -> MicroBatcher:
+    """Батчер процесса для функции инференса (создается при первом обращении)"""
+    with _batchers_lock:
+        batcher = _batchers.get(infer_fn)
+        if batcher is None:
+            batcher = MicroBatcher(
+                infer_fn,
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS
+            )
+            _batchers[infer_fn] = batcher
+        return batcher
+
+
+def close_batchers() -> None:
+    """Остановка всех батчеров процесса"""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+        _batchers.clear()
+    for batcher in batchers:
+        batcher.close()
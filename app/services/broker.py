@@ -0,0 +1,147 @@
+"""
+Брокер задач на предсказание (RabbitMQ и in-process заглушка для тестов)
+"""
+
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[[str], None]
+
+
+class TaskBroker(ABC):
+    """Абстрактный брокер: публикует ID задач и доставляет их воркеру"""
+
+    @abstractmethod
+    def publish(self, task_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def consume(self, handler: TaskHandler) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RabbitMQBroker(TaskBroker):
+    """Брокер поверх RabbitMQ (durable очередь, persistent сообщения)"""
+
+    def __init__(self, url: str, queue_name: str):
+        self._url = url
+        self._queue_name = queue_name
+        self._connection = None
+        self._channel = None
+        # BlockingConnection не потокобезопасен, а эндпоинты работают в threadpool
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        import pika
+
+        self._connection = pika.BlockingConnection(pika.URLParameters(self._url))
+        self._channel = self._connection.channel()
+        self._channel.queue_declare(queue=self._queue_name, durable=True)
+
+    def _ensure_channel(self) -> None:
+        if self._connection is None or self._connection.is_closed:
+            self._connect()
+
+    def publish(self, task_id: str) -> None:
+        import pika
+
+        with self._lock:
+            try:
+                self._ensure_channel()
+                self._basic_publish(task_id, pika)
+            except pika.exceptions.AMQPConnectionError:
+                # Соединение могло быть закрыто брокером - переподключаемся один раз
+                self._connect()
+                self._basic_publish(task_id, pika)
+
+    def _basic_publish(self, task_id: str, pika) -> None:
+        self._channel.basic_publish(
+            exchange="",
+            routing_key=self._queue_name,
+            body=task_id.encode(),
+            properties=pika.BasicProperties(delivery_mode=2)
+        )
+
+    def consume(self, handler: TaskHandler) -> None:
+        """Блокирующее потребление очереди (используется воркером)"""
+        self._ensure_channel()
+        self._channel.basic_qos(prefetch_count=1)
+
+        def on_message(channel, method, properties, body):
+            task_id = body.decode()
+            try:
+                handler(task_id)
+            except Exception:
+                # Ошибки выполнения задачи обработчик сам переводит в FAILED;
+                # сюда доходят инфраструктурные ошибки (например, недоступна БД) -
+                # сообщение возвращается в очередь, а не теряется
+                logger.exception("Ошибка обработки задачи %s, возврат в очередь", task_id)
+                channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+                return
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+
+        self._channel.basic_consume(queue=self._queue_name, on_message_callback=on_message)
+        self._channel.start_consuming()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._connection.is_open:
+                self._connection.close()
+            self._connection = None
+            self._channel = None
+
+
+class InMemoryBroker(TaskBroker):
+    """In-process брокер для тестов и локального запуска без RabbitMQ"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        # Сообщения, обработчик которых упал (в RabbitMQ они вернулись бы в очередь)
+        self.failed: List[str] = []
+
+    def publish(self, task_id: str) -> None:
+        self._queue.put(task_id)
+
+    def consume(self, handler: TaskHandler, block: bool = False) -> None:
+        """
+        Обработка сообщений из очереди
+        :param handler: обработчик ID задачи
+        :param block: ждать новые сообщения (иначе - выйти, когда очередь пуста)
+        """
+        while True:
+            try:
+                task_id = self._queue.get(block=block)
+            except queue.Empty:
+                return
+            try:
+                handler(task_id)
+            except Exception:
+                logger.exception("Ошибка обработки задачи %s", task_id)
+                self.failed.append(task_id)
+            finally:
+                self._queue.task_done()
+
+    def pending(self) -> int:
+        """Количество неразобранных сообщений"""
+        return self._queue.qsize()
+
+
+_broker: Optional[TaskBroker] = None
+
+
+def get_broker() -> TaskBroker:
+    """Зависимость: брокер задач (создается один раз на процесс)"""
+    global _broker
+    if _broker is None:
+        _broker = RabbitMQBroker(settings.get_rabbitmq_url(), settings.RABBITMQ_PREDICTION_QUEUE)
+    return _broker
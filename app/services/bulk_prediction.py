@@ -0,0 +1,109 @@
+"""
+Потоковая обработка NDJSON: строки читаются из тела запроса порциями
+фиксированного размера, каждая порция - отдельная задача со своим списанием.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.models.db.prediction import PredictionTaskDB
+
+
+class LineTooLongError(ValueError):
+    """Строка NDJSON превышает допустимый размер"""
+
+    def __init__(self, max_line_bytes: int):
+        super().__init__(f"NDJSON line exceeds {max_line_bytes} bytes")
+        self.max_line_bytes = max_line_bytes
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse, тело которого читает тело запроса.
+    Стандартный StreamingResponse параллельно слушает receive() в ожидании
+    disconnect и забирает себе сообщения http.request, поэтому чтение
+    request.stream() из генератора ответа зависает. Здесь receive читает
+    только генератор (отключение клиента он получает как ClientDisconnect).
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_ndjson_chunks(
+    stream: AsyncIterator[bytes],
+    chunk_size: int,
+    max_line_bytes: int
+) -> AsyncIterator[List[Optional[Dict[str, Any]]]]:
+    """
+    Разбор NDJSON из потока байтов порциями по chunk_size строк.
+    Строка, которая не является JSON-объектом, передается как None
+    и отклоняется валидатором как невалидная.
+    :raises LineTooLongError: если строка длиннее max_line_bytes
+    """
+    tail = b""
+    rows: List[Optional[Dict[str, Any]]] = []
+
+    async for data in stream:
+        # Переводы строк ищутся только в новых данных, хвост не пересканируется
+        lines = data.split(b"\n")
+        if len(lines) == 1:
+            tail += data
+            if len(tail) > max_line_bytes:
+                raise LineTooLongError(max_line_bytes)
+            continue
+
+        lines[0] = tail + lines[0]
+        tail = lines.pop()
+        if len(tail) > max_line_bytes:
+            raise LineTooLongError(max_line_bytes)
+
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise LineTooLongError(max_line_bytes)
+            if line.strip():
+                rows.append(_parse_line(line))
+                if len(rows) >= chunk_size:
+                    yield rows
+                    rows = []
+
+    if tail.strip():
+        rows.append(_parse_line(tail))
+    if rows:
+        yield rows
+
+
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return None
+    return row if isinstance(row, dict) else None
+
+
+def chunk_result_line(chunk: int, task: PredictionTaskDB) -> bytes:
+    """Строка ответа NDJSON по обработанной порции"""
+    return _dump({
+        "chunk": chunk,
+        "task_id": str(task.id),
+        "status": task.status.value,
+        "valid_data_count": task.valid_count,
+        "invalid_data_count": task.invalid_count,
+        "result": task.result,
+        "cost": task.total_cost,
+        "error_message": task.error_message
+    })
+
+
+def chunk_error_line(chunk: int, error: str) -> bytes:
+    """Строка ответа NDJSON для порции, которая не была обработана"""
+    return _dump({"chunk": chunk, "status": "REJECTED", "error_message": error})
+
+
+def _dump(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode() + b"\n"
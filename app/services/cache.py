@@ -0,0 +1,189 @@
+"""
+Кеш результатов предсказаний перед инференсом.
+Ключ - (model_id, версия модели, sha256 канонического JSON строки):
+одинаковые строки, присланные повторно, не отправляются в модель.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.db.ml_model import MLModelDB
+
+logger = logging.getLogger(__name__)
+
+
+def model_version(model: MLModelDB) -> str:
+    """Версия модели для ключа кеша: любое изменение модели сбрасывает ее записи"""
+    return model.updated_at.isoformat() if model.updated_at else "0"
+
+
+def row_key(model_id: str, version: str, row: Dict[str, Any]) -> str:
+    """Ключ кеша для строки (порядок полей и пробелы в JSON не важны)"""
+    canonical = json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return f"pred:{model_id}:{version}:{digest}"
+
+
+class ResultCache(ABC):
+    """Абстрактный кеш предсказаний по ключам строк"""
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Поиск предсказаний
+        :return: найденные значения по ключам (промахов в словаре нет)
+        """
+        pass
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, Any]) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._stats_lock:
+            self._stats["hits"] += hits
+            self._stats["misses"] += misses
+
+
+class InMemoryResultCache(ResultCache):
+    """In-process кеш с вытеснением по LRU и TTL (используется и в тестах)"""
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        # ключ -> (срок жизни, значение); порядок - от давно использованных к недавним
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats["evictions"] = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = self._clock()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        expires_at = self._clock() + self._ttl
+        evicted = 0
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            with self._stats_lock:
+                self._stats["evictions"] += evicted
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        with self._lock:
+            stats["size"] = len(self._entries)
+        return stats
+
+
+class RedisResultCache(ResultCache):
+    """
+    Кеш в Redis, общий для всех процессов приложения и воркеров.
+    TTL задается на каждый ключ, LRU - политикой сервера (maxmemory-policy allkeys-lru).
+    Ошибки Redis не роняют предсказание: запрос считается промахом.
+    """
+
+    def __init__(self, client, ttl_seconds: float = 3600):
+        """
+        :param client: клиент redis.Redis (или совместимый по mget/pipeline)
+        :param ttl_seconds: время жизни записи
+        """
+        super().__init__()
+        self._client = client
+        self._ttl = int(ttl_seconds)
+        self._stats["errors"] = 0
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: float = 3600) -> "RedisResultCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url), ttl_seconds)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        try:
+            values = self._client.mget(keys)
+        except Exception:
+            logger.warning("Кеш результатов недоступен", exc_info=True)
+            self._count_error()
+            values = [None] * len(keys)
+
+        found = {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(key, json.dumps(value), ex=self._ttl)
+            pipe.execute()
+        except Exception:
+            logger.warning("Не удалось записать в кеш результатов", exc_info=True)
+            self._count_error()
+
+    def _count_error(self) -> None:
+        with self._stats_lock:
+            self._stats["errors"] += 1
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Кеш процесса: Redis, если задан REDIS_URL, иначе in-process"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            if settings.REDIS_URL:
+                _result_cache = RedisResultCache.from_url(settings.REDIS_URL, settings.RESULT_CACHE_TTL_SECONDS)
+            else:
+                _result_cache = InMemoryResultCache(
+                    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS
+                )
+        return _result_cache
@@ -0,0 +1,181 @@
+"""
+Инференс в пуле процессов: CPU-bound вычисления модели не держат GIL
+процесса API, поток запроса только ждет результат.
+Признаки передаются в процесс через shared memory (матрица float64),
+а не сериализацией списка словарей; результат возвращается так же.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.db.ml_model import MLModelDB
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFullError(RuntimeError):
+    """Очередь пула инференса модели заполнена"""
+
+    def __init__(self, model_id: str):
+        super().__init__(f"Inference queue for model {model_id} is full")
+        self.model_id = model_id
+
+
+def encode_rows(rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Числовая матрица признаков: колонки - числовые поля строк (по имени),
+    отсутствующие и нечисловые значения - NaN
+    """
+    columns = sorted({
+        name for row in rows for name, value in row.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    })
+    index = {name: i for i, name in enumerate(columns)}
+    matrix = np.full((len(rows), len(columns)), np.nan, dtype=np.float64)
+    for i, row in enumerate(rows):
+        for name, value in row.items():
+            j = index.get(name)
+            if j is not None and not isinstance(value, bool):
+                try:
+                    matrix[i, j] = value
+                except (TypeError, ValueError, OverflowError):
+                    pass
+    return matrix, columns
+
+
+def _score(model_id: str, version: str, columns: List[str], shape: Tuple[int, int], in_name: str, out_name: str) -> None:
+    """Вычисление в процессе пула: чтение признаков и запись предсказаний через shared memory"""
+    from datetime import datetime
+
+    from app.services.model_registry import get_model_registry
+
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        features = np.ndarray(shape, dtype=np.float64, buffer=shm_in.buf)
+        out = np.ndarray((shape[0],), dtype=np.float64, buffer=shm_out.buf)
+
+        model = MLModelDB(id=model_id, updated_at=datetime.fromisoformat(version) if version != "0" else None)
+        artifact = get_model_registry().get(model)
+        if artifact is None:
+            # Имитация модели (как в prediction_processor.predict_batch): сумма признаков
+            out[:] = np.round(np.nansum(features, axis=1), 6)
+        elif hasattr(artifact, "predict_matrix"):
+            out[:] = artifact.predict_matrix(features, columns)
+        else:
+            rows = [
+                {name: value for name, value in zip(columns, values) if not np.isnan(value)}
+                for values in features.tolist()
+            ]
+            out[:] = artifact.predict(rows)
+        del features, out
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+class InferenceExecutor:
+    """Пулы процессов по моделям с ограниченной очередью"""
+
+    def __init__(
+        self,
+        default_workers: int = 2,
+        workers_per_model: Optional[Dict[str, int]] = None,
+        max_pending: int = 64,
+        queue_timeout: float = 1.0
+    ):
+        """
+        :param default_workers: процессов на модель по умолчанию
+        :param workers_per_model: число процессов для отдельных моделей (model_id -> n)
+        :param max_pending: задач на модель в работе и в очереди пула
+        :param queue_timeout: сколько ждать места в очереди, секунд
+        """
+        self._default_workers = default_workers
+        self._workers_per_model = workers_per_model or {}
+        self._max_pending = max_pending
+        self._queue_timeout = queue_timeout
+        self._pools: Dict[str, Tuple[ProcessPoolExecutor, threading.BoundedSemaphore]] = {}
+        self._lock = threading.Lock()
+        self._mp_context = get_context("spawn")
+
+    def predict(self, model: MLModelDB, rows: List[Dict[str, Any]]) -> List[float]:
+        """
+        Предсказание в процессе пула модели
+        :raises InferenceQueueFullError: если очередь модели не освободилась за queue_timeout
+        """
+        if not rows:
+            return []
+        model_id = str(model.id)
+        pool, slots = self._get_pool(model_id)
+        if not slots.acquire(timeout=self._queue_timeout):
+            raise InferenceQueueFullError(model_id)
+
+        try:
+            features, columns = encode_rows(rows)
+            shm_in = shared_memory.SharedMemory(create=True, size=max(features.nbytes, 1))
+            shm_out = shared_memory.SharedMemory(create=True, size=len(rows) * 8)
+            try:
+                np.ndarray(features.shape, dtype=np.float64, buffer=shm_in.buf)[:] = features
+                version = model.updated_at.isoformat() if model.updated_at else "0"
+                pool.submit(
+                    _score, model_id, version, columns, features.shape, shm_in.name, shm_out.name
+                ).result()
+                return np.ndarray((len(rows),), dtype=np.float64, buffer=shm_out.buf).tolist()
+            finally:
+                shm_in.close()
+                shm_in.unlink()
+                shm_out.close()
+                shm_out.unlink()
+        finally:
+            slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool, _ in pools:
+            pool.shutdown(wait=True)
+
+    def _get_pool(self, model_id: str) -> Tuple[ProcessPoolExecutor, threading.BoundedSemaphore]:
+        with self._lock:
+            entry = self._pools.get(model_id)
+            if entry is None:
+                workers = self._workers_per_model.get(model_id, self._default_workers)
+                entry = (
+                    ProcessPoolExecutor(max_workers=workers, mp_context=self._mp_context),
+                    threading.BoundedSemaphore(self._max_pending)
+                )
+                self._pools[model_id] = entry
+            return entry
+
+
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Пул инференса процесса (создается при первом обращении)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = InferenceExecutor(
+                default_workers=settings.INFERENCE_WORKERS,
+                workers_per_model=settings.INFERENCE_WORKERS_PER_MODEL,
+                max_pending=settings.INFERENCE_MAX_PENDING,
+                queue_timeout=settings.INFERENCE_QUEUE_TIMEOUT_SECONDS
+            )
+        return _executor
+
+
+def shutdown_inference_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,123 @@
+"""
+Журнал транзакций: баланс по последнему снимку и приросту после него.
+Снимки пишет периодическая задача (app.jobs.balance_snapshots), поэтому
+проверка баланса читает только транзакции после водяного знака снимка,
+а не всю историю пользователя.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.balance_snapshot import crud_balance_snapshot
+from app.crud.transaction import crud_transaction
+from app.models.db.balance_snapshot import BalanceSnapshotDB
+from app.models.db.user import UserDB
+
+logger = logging.getLogger(__name__)
+
+# Баланс хранится во Float: расхождение меньше этого значения - погрешность округления
+BALANCE_TOLERANCE = 1e-6
+
+
+class LedgerBalance:
+    """Баланс по журналу и его сверка с балансом пользователя"""
+
+    def __init__(
+        self,
+        user_id: str,
+        ledger_balance: float,
+        account_balance: Optional[float],
+        snapshot_at: Optional[datetime],
+        transactions_since_snapshot: int
+    ):
+        self.user_id = user_id
+        self.ledger_balance = ledger_balance
+        self.account_balance = account_balance
+        self.snapshot_at = snapshot_at
+        self.transactions_since_snapshot = transactions_since_snapshot
+
+    @property
+    def discrepancy(self) -> float:
+        return round((self.account_balance or 0.0) - self.ledger_balance, 6)
+
+    @property
+    def is_consistent(self) -> bool:
+        return abs(self.discrepancy) < BALANCE_TOLERANCE
+
+
+def get_ledger_balance(db: Session, user_id: str) -> LedgerBalance:
+    """
+    Баланс по журналу: последний снимок + транзакции после его водяного знака
+    :return: баланс с балансом пользователя для сверки
+    """
+    snapshot = crud_balance_snapshot.get_latest(db, user_id=user_id)
+    after = (snapshot.last_transaction_at, snapshot.last_transaction_id) if snapshot else None
+    delta, count, _ = crud_transaction.get_balance_delta(db, user_id, after=after)
+    account_balance = db.query(UserDB.balance).filter(UserDB.id == user_id).scalar()
+    return LedgerBalance(
+        user_id=user_id,
+        ledger_balance=round((snapshot.balance if snapshot else 0.0) + delta, 6),
+        account_balance=account_balance,
+        snapshot_at=snapshot.created_at if snapshot else None,
+        transactions_since_snapshot=count
+    )
+
+
+def take_snapshot(db: Session, user_id: str, *, until: datetime) -> Optional[BalanceSnapshotDB]:
+    """
+    Новый снимок: предыдущий снимок + транзакции после него, созданные до until
+    :param until: граница снимка (транзакции не моложе LEDGER_SNAPSHOT_LAG_SECONDS)
+    :return: снимок или None, если новых транзакций нет
+    """
+    previous = crud_balance_snapshot.get_latest(db, user_id=user_id)
+    after = (previous.last_transaction_at, previous.last_transaction_id) if previous else None
+    delta, count, last = crud_transaction.get_balance_delta(db, user_id, after=after, until=until)
+    if not count:
+        return None
+
+    snapshot = BalanceSnapshotDB(
+        user_id=user_id,
+        balance=round((previous.balance if previous else 0.0) + delta, 6),
+        last_transaction_at=last[0],
+        last_transaction_id=last[1],
+        transaction_count=(previous.transaction_count if previous else 0) + count
+    )
+    db.add(snapshot)
+    db.commit()
+    return snapshot
+
+
+def snapshot_all(db: Session, *, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Снимки и сверка по всем пользователям (порциями по id)
+    :return: число пользователей, новых снимков и расхождений с балансом пользователя
+    """
+    batch_size = batch_size or settings.LEDGER_SNAPSHOT_BATCH_SIZE
+    until = datetime.utcnow() - timedelta(seconds=settings.LEDGER_SNAPSHOT_LAG_SECONDS)
+    stats = {"users": 0, "snapshots": 0, "discrepancies": 0}
+
+    last_id = None
+    while True:
+        query = db.query(UserDB.id).order_by(UserDB.id)
+        if last_id is not None:
+            query = query.filter(UserDB.id > last_id)
+        user_ids = [row.id for row in query.limit(batch_size)]
+        if not user_ids:
+            return stats
+
+        for user_id in user_ids:
+            stats["users"] += 1
+            if take_snapshot(db, user_id, until=until) is not None:
+                stats["snapshots"] += 1
+            balance = get_ledger_balance(db, user_id)
+            if not balance.is_consistent:
+                stats["discrepancies"] += 1
+                logger.warning(
+                    "Баланс пользователя %s расходится с журналом: %s против %s",
+                    user_id, balance.account_balance, balance.ledger_balance
+                )
+        last_id = user_ids[-1]
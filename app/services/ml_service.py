@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from app.models.user import User, Admin, UserRole
 from app.models.ml_model import MLModel
 from app.models.transaction import Transaction
@@ -0,0 +1,163 @@
+"""
+Реестр загруженных моделей: артефакт модели читается с локального диска
+при первом обращении и остается в памяти между запросами. При превышении
+бюджета памяти вытесняются давно не использованные модели.
+"""
+
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.models.db.ml_model import MLModelDB
+
+logger = logging.getLogger(__name__)
+
+ArtifactLoader = Callable[[str], Any]
+
+
+def load_pickle(path: str) -> Any:
+    """Загрузка артефакта (каталог артефактов должен быть доверенным)"""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+class _LoadedModel:
+    """Артефакт в памяти и его оценка размера"""
+
+    def __init__(self, version: str, artifact: Any, size_bytes: int):
+        self.version = version
+        self.artifact = artifact
+        self.size_bytes = size_bytes
+
+
+class ModelRegistry:
+    """LRU-реестр артефактов с ограничением по памяти"""
+
+    def __init__(
+        self,
+        artifacts_dir: str,
+        memory_budget_bytes: int,
+        loader: ArtifactLoader = load_pickle
+    ):
+        """
+        :param artifacts_dir: каталог с файлами <model_id>.pkl
+        :param memory_budget_bytes: суммарный размер загруженных артефактов
+            (оценивается по размеру файла)
+        :param loader: функция загрузки артефакта по пути
+        """
+        self._artifacts_dir = artifacts_dir
+        self._budget = memory_budget_bytes
+        self._loader = loader
+        # model_id -> загруженная модель; порядок - от давно использованных к недавним
+        self._models: "OrderedDict[str, _LoadedModel]" = OrderedDict()
+        self._loaded_bytes = 0
+        self._lock = threading.Lock()
+        # Загрузка одной модели не блокирует обращения к другим
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._stats = {"hits": 0, "loads": 0, "evictions": 0, "load_errors": 0}
+
+    def artifact_path(self, model_id: str) -> str:
+        return os.path.join(self._artifacts_dir, f"{model_id}.pkl")
+
+    def get(self, model: MLModelDB) -> Optional[Any]:
+        """
+        Артефакт модели (загружается при первом обращении)
+        :return: артефакт или None, если файла артефакта нет
+        """
+        model_id = str(model.id)
+        version = model.updated_at.isoformat() if model.updated_at else "0"
+
+        loaded = self._lookup(model_id, version)
+        if loaded is not None:
+            return loaded.artifact
+
+        with self._load_lock(model_id):
+            # Пока ждали блокировку, модель мог загрузить другой поток
+            loaded = self._lookup(model_id, version)
+            if loaded is not None:
+                return loaded.artifact
+
+            path = self.artifact_path(model_id)
+            try:
+                size_bytes = os.path.getsize(path)
+            except FileNotFoundError:
+                return None
+            try:
+                artifact = self._loader(path)
+            except Exception:
+                with self._lock:
+                    self._stats["load_errors"] += 1
+                raise
+
+            logger.info("Модель %s загружена (%d байт)", model_id, size_bytes)
+            self._store(model_id, _LoadedModel(version, artifact, size_bytes))
+            return artifact
+
+    def evict(self, model_id: str) -> bool:
+        """Выгрузка модели из памяти"""
+        with self._lock:
+            loaded = self._models.pop(model_id, None)
+            if loaded is None:
+                return False
+            self._loaded_bytes -= loaded.size_bytes
+            self._stats["evictions"] += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "loaded_models": list(self._models),
+                "loaded_bytes": self._loaded_bytes,
+                "memory_budget_bytes": self._budget
+            }
+
+    def _lookup(self, model_id: str, version: str) -> Optional[_LoadedModel]:
+        with self._lock:
+            loaded = self._models.get(model_id)
+            if loaded is None:
+                return None
+            if loaded.version != version:
+                # Модель обновлена - артефакт перечитывается
+                del self._models[model_id]
+                self._loaded_bytes -= loaded.size_bytes
+                return None
+            self._models.move_to_end(model_id)
+            self._stats["hits"] += 1
+            return loaded
+
+    def _store(self, model_id: str, loaded: _LoadedModel) -> None:
+        with self._lock:
+            self._stats["loads"] += 1
+            # Модель больше бюджета все равно загружается, вытесняя все остальные
+            while self._models and self._loaded_bytes + loaded.size_bytes > self._budget:
+                evicted_id, evicted = self._models.popitem(last=False)
+                self._loaded_bytes -= evicted.size_bytes
+                self._stats["evictions"] += 1
+                logger.info("Модель %s выгружена из памяти", evicted_id)
+            self._models[model_id] = loaded
+            self._loaded_bytes += loaded.size_bytes
+
+    def _load_lock(self, model_id: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(model_id, threading.Lock())
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Реестр процесса (создается при первом обращении)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(
+                settings.MODEL_ARTIFACTS_DIR,
+                settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+            )
+        return _registry
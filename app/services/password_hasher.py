@@ -0,0 +1,166 @@
+"""
+Хеширование и проверка паролей (bcrypt) в отдельном пуле процессов.
+bcrypt занимает CPU на сотни миллисекунд: в пуле потоков anyio волна логинов
+забирает все потоки и останавливает остальные синхронные участки API.
+Пул ограничен по процессам (PASSWORD_HASH_WORKERS) и по очереди
+(PASSWORD_HASH_MAX_PENDING): сверх очереди запрос сразу получает 503.
+Хеш со старой стоимостью (BCRYPT_ROUNDS изменен) пересчитывается при входе.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import get_context
+from typing import Any, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Очередь хеширования паролей заполнена"""
+
+    def __init__(self):
+        super().__init__("Too many concurrent logins, retry later")
+
+
+@lru_cache(maxsize=4)
+def password_context(rounds: int) -> CryptContext:
+    """Контекст passlib: bcrypt с заданной стоимостью (хеши с другой стоимостью требуют пересчета)"""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _hash(password: str, rounds: int, submitted_at: float) -> Tuple[str, float]:
+    """В процессе пула: хеш и время ожидания в очереди"""
+    queued = time.time() - submitted_at
+    return password_context(rounds).hash(password), queued
+
+
+def _verify(password: str, password_hash: str, rounds: int, submitted_at: float) -> Tuple[Tuple[bool, Optional[str]], float]:
+    """В процессе пула: (пароль верен, новый хеш или None) и время ожидания в очереди"""
+    queued = time.time() - submitted_at
+    return password_context(rounds).verify_and_update(password, password_hash), queued
+
+
+class PasswordHasher:
+    """Пул процессов bcrypt с ограниченной очередью и метриками ожидания"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 32,
+        rounds: int = 12,
+        executor: Optional[Executor] = None
+    ):
+        """
+        :param workers: процессов пула
+        :param max_pending: операций в работе и в очереди пула, сверх - PasswordHasherBusyError
+        :param rounds: стоимость bcrypt для новых хешей
+        :param executor: готовый пул (тесты); по умолчанию - ProcessPoolExecutor на workers процессов
+        """
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        self._max_pending = max_pending
+        self.rounds = rounds
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {"completed": 0, "rejected": 0, "rehashed": 0}
+        self._queue_seconds_total = 0.0
+        self._queue_seconds_max = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password))
+
+    async def verify(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Проверка пароля
+        :return: (пароль верен, новый хеш - если у сохраненного устаревшая стоимость)
+        :raises PasswordHasherBusyError: если очередь заполнена
+        """
+        return await asyncio.wrap_future(self._submit(_verify, password, password_hash))
+
+    def hash_sync(self, password: str) -> str:
+        """Для синхронного кода (init_db, скрипты): ждет результат в текущем потоке"""
+        return self._submit(_hash, password).result()
+
+    def verify_sync(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        return self._submit(_verify, password, password_hash).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                **self._stats,
+                "pending": self._pending,
+                "max_pending": self._max_pending,
+                "queue_ms_avg": round(self._queue_seconds_total / completed * 1000, 3) if completed else 0.0,
+                "queue_ms_max": round(self._queue_seconds_max * 1000, 3)
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._stats["rejected"] += 1
+                raise PasswordHasherBusyError()
+            self._pending += 1
+        try:
+            inner = self._executor.submit(fn, *args, self.rounds, time.time())
+        except BaseException:
+            self._done()
+            raise
+
+        # Результат без времени ожидания; время ожидания - в метрики
+        outer: Future = Future()
+
+        def on_done(future: Future) -> None:
+            try:
+                value, queued = future.result()
+            except BaseException as e:
+                self._done()
+                outer.set_exception(e)
+                return
+            self._done(queued, rehashed=fn is _verify and value[1] is not None)
+            outer.set_result(value)
+
+        inner.add_done_callback(on_done)
+        return outer
+
+    def _done(self, queued: Optional[float] = None, rehashed: bool = False) -> None:
+        with self._lock:
+            self._pending -= 1
+            if queued is None:
+                return
+            self._stats["completed"] += 1
+            self._stats["rehashed"] += int(rehashed)
+            self._queue_seconds_total += queued
+            self._queue_seconds_max = max(self._queue_seconds_max, queued)
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Пул хеширования процесса (создается при первом обращении)"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher(
+                workers=settings.PASSWORD_HASH_WORKERS,
+                max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+                rounds=settings.BCRYPT_ROUNDS
+            )
+        return _hasher
+
+
+def shutdown_password_hasher() -> None:
+    global _hasher
+    with _hasher_lock:
+        hasher, _hasher = _hasher, None
+    if hasher is not None:
+        hasher.shutdown()
@@ -0,0 +1,274 @@
+"""
+Выполнение задач на предсказание: инференс, списание средств, смена статусов.
+Используется и эндпоинтом (синхронный режим, AsyncSession), и воркером очереди.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.ml_model import crud_ml_model
+from app.crud.prediction import crud_prediction
+from app.crud.transaction import crud_transaction
+from app.crud.user import crud_user
+from app.models.db.ml_model import MLModelDB
+from app.models.db.prediction import PredictionTaskDB
+from app.models.enums import TaskStatus
+from app.models.prediction import ValidationResult
+from app.services.batching import get_batcher
+from app.services.cache import get_result_cache, model_version, row_key
+from app.services.inference_executor import InferenceQueueFullError, get_inference_executor
+from app.services.model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+
+def predict_batch(model: MLModelDB, requests: List[List[Dict[str, Any]]]) -> List[List[Any]]:
+    """
+    Векторизованное предсказание по батчу (строки сгруппированы по запросам).
+    Артефакт модели берется из реестра (метод predict по списку строк); если
+    артефакта нет - имитация: сумма числовых признаков строки. Предсказание
+    строки зависит только от самой строки, поэтому его можно кешировать.
+    """
+    all_rows = [row for rows in requests for row in rows]
+    if settings.INFERENCE_EXECUTOR_ENABLED:
+        # Модель считается в пуле процессов, поток только ждет результат
+        predictions = get_inference_executor().predict(model, all_rows)
+    else:
+        artifact = get_model_registry().get(model)
+        if artifact is None:
+            return [[_predict_row(row) for row in rows] for rows in requests]
+        predictions = list(artifact.predict(all_rows))
+
+    results = []
+    offset = 0
+    for rows in requests:
+        results.append(predictions[offset:offset + len(rows)])
+        offset += len(rows)
+    return results
+
+
+def _predict_row(row: Dict[str, Any]) -> float:
+    return round(sum(
+        value for value in row.values()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    ), 6)
+
+
+def run_inference(model: MLModelDB, rows: List[Dict[str, Any]]) -> List[Any]:
+    """Инференс строк одного запроса (через микробатчер, если он включен)"""
+    if settings.BATCHING_ENABLED:
+        return get_batcher(predict_batch).predict(model, rows)
+    return predict_batch(model, [rows])[0]
+
+
+def infer_and_price(model: MLModelDB, rows: List[Dict[str, Any]]) -> Tuple[List[Any], float]:
+    """
+    Инференс через кеш результатов (если он включен)
+    :return: предсказания и стоимость; строки из кеша оплачиваются по RESULT_CACHE_HIT_PRICE
+    """
+    if not settings.RESULT_CACHE_ENABLED:
+        return run_inference(model, rows), model.calculate_cost(len(rows))
+
+    cache = get_result_cache()
+    version = model_version(model)
+    keys = [row_key(str(model.id), version, row) for row in rows]
+    cached = cache.get_many(keys)
+
+    miss_indices = [i for i, key in enumerate(keys) if key not in cached]
+    if miss_indices:
+        predictions = run_inference(model, [rows[i] for i in miss_indices])
+        fresh = {keys[i]: prediction for i, prediction in zip(miss_indices, predictions)}
+        cache.set_many(fresh)
+        cached = {**cached, **fresh}
+
+    hits = len(rows) - len(miss_indices)
+    cost = model.calculate_cost(len(miss_indices)) + model.calculate_cost(hits) * settings.RESULT_CACHE_HIT_PRICE
+    return [cached[key] for key in keys], cost
+
+
+class InsufficientBalanceError(ValueError):
+    """Недостаточно средств для оплаты предсказания"""
+
+    def __init__(self, required: float, available: float):
+        super().__init__(f"Insufficient balance. Required: {required}, available: {available}")
+        self.required = required
+        self.available = available
+
+
+def _charge_and_complete(
+    db: Session,
+    *,
+    task: PredictionTaskDB,
+    model: MLModelDB,
+    result: List[Any],
+    cost: float
+) -> PredictionTaskDB:
+    """
+    Условное списание, запись транзакции и финальный статус задачи одним commit
+    :raises InsufficientBalanceError: если средств недостаточно (транзакция откатывается)
+    """
+    if crud_user.debit_balance(db, task.user_id, cost) is None:
+        db.rollback()
+        user = crud_user.get(db, id=task.user_id)
+        raise InsufficientBalanceError(cost, user.balance if user else 0.0)
+
+    crud_transaction.add_withdrawal(
+        db,
+        user_id=task.user_id,
+        amount=cost,
+        description=f"ML Prediction using {model.name}",
+        task_id=task.id
+    )
+    task.status = TaskStatus.COMPLETED
+    task.result = result
+    task.total_cost = cost
+    task.completed_at = datetime.utcnow()
+    db.add(task)
+    db.commit()
+    return task
+
+
+def _new_task(
+    user_id: str,
+    model: MLModelDB,
+    input_data: List[Dict[str, Any]],
+    validation: ValidationResult
+) -> PredictionTaskDB:
+    return PredictionTaskDB(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        model_id=model.id,
+        input_data=input_data,
+        valid_count=validation.valid_count,
+        invalid_count=validation.invalid_count,
+        invalid_rows=validation.invalid_rows(),
+        status=TaskStatus.VALIDATION_ERROR
+    )
+
+
+def _save_finished(db: Session, task: PredictionTaskDB, error: Optional[Exception] = None) -> PredictionTaskDB:
+    """Запись задачи без списания: VALIDATION_ERROR или FAILED (если передана ошибка инференса)"""
+    if error is not None:
+        task.status = TaskStatus.FAILED
+        task.error_message = str(error)
+    task.completed_at = datetime.utcnow()
+    db.add(task)
+    db.commit()
+    return task
+
+
+def execute_prediction(
+    db: Session,
+    *,
+    user_id: str,
+    model: MLModelDB,
+    input_data: List[Dict[str, Any]],
+    validation: ValidationResult
+) -> PredictionTaskDB:
+    """
+    Синхронное предсказание как единица работы: инференс выполняется до
+    транзакции, затем задача, списание, транзакция и статус пишутся одним commit.
+    :raises InsufficientBalanceError: если средств недостаточно (ничего не записывается)
+    """
+    task = _new_task(user_id, model, input_data, validation)
+    if not validation.valid_count:
+        return _save_finished(db, task)
+
+    try:
+        result, cost = infer_and_price(model, validation.valid_rows(input_data))
+    except InferenceQueueFullError:
+        # Перегрузка - запрос отклоняется целиком, задача не создается
+        raise
+    except Exception as e:
+        logger.exception("Ошибка инференса модели %s", model.id)
+        return _save_finished(db, task, e)
+
+    db.add(task)
+    return _charge_and_complete(db, task=task, model=model, result=result, cost=cost)
+
+
+async def execute_prediction_async(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    model: MLModelDB,
+    input_data: List[Dict[str, Any]],
+    validation: ValidationResult
+) -> PredictionTaskDB:
+    """
+    execute_prediction для AsyncSession: инференс выполняется в пуле потоков,
+    запись задачи и списание - той же транзакцией через run_sync
+    :raises InsufficientBalanceError: если средств недостаточно (ничего не записывается)
+    """
+    task = _new_task(user_id, model, input_data, validation)
+    if not validation.valid_count:
+        return await db.run_sync(_save_finished, task)
+
+    try:
+        result, cost = await run_in_threadpool(infer_and_price, model, validation.valid_rows(input_data))
+    except InferenceQueueFullError:
+        raise
+    except Exception as e:
+        logger.exception("Ошибка инференса модели %s", model.id)
+        return await db.run_sync(_save_finished, task, e)
+
+    db.add(task)
+    return await db.run_sync(_charge_and_complete, task=task, model=model, result=result, cost=cost)
+
+
+def execute_task(db: Session, *, task: PredictionTaskDB, model: MLModelDB) -> PredictionTaskDB:
+    """
+    Обработка захваченной задачи: инференс -> списание -> COMPLETED/FAILED
+    :param task: задача в статусе PROCESSING (см. crud_prediction.claim_for_processing)
+    :param model: модель задачи
+    :return: задача в финальном статусе
+    """
+    try:
+        result, cost = infer_and_price(model, task.valid_data)
+        return _charge_and_complete(db, task=task, model=model, result=result, cost=cost)
+    except InsufficientBalanceError as e:
+        return crud_prediction.fail(db, db_obj=task, error_message=str(e))
+    except Exception as e:
+        logger.exception("Ошибка выполнения задачи %s", task.id)
+        db.rollback()
+        return crud_prediction.fail(db, db_obj=task, error_message=str(e))
+
+
+def process_prediction_task(db: Session, task_id: str) -> Optional[PredictionTaskDB]:
+    """
+    Обработка задачи из очереди по ID
+    :return: задача или None, если она не найдена или уже захвачена другим воркером
+    """
+    # Повторная доставка и параллельные воркеры не должны списывать средства дважды:
+    # обрабатывает только тот, кто атомарно перевел задачу из PENDING в PROCESSING
+    if not crud_prediction.claim_for_processing(db, task_id=task_id):
+        logger.info("Задача %s не найдена или уже обрабатывается, пропускаем", task_id)
+        return None
+
+    task = crud_prediction.get(db, id=task_id)
+    model = crud_ml_model.get(db, id=task.model_id)
+    if model is None:
+        return crud_prediction.fail(db, db_obj=task, error_message="Model not found")
+
+    return execute_task(db, task=task, model=model)
+
+
+def requeue_stale_tasks(db: Session, publish: Callable[[str], None]) -> List[str]:
+    """
+    Возврат зависших в PROCESSING задач в очередь
+    :param publish: функция публикации ID задачи в брокер
+    :return: ID переотправленных задач
+    """
+    older_than = datetime.utcnow() - timedelta(seconds=settings.PREDICTION_PROCESSING_TIMEOUT_SECONDS)
+    task_ids = crud_prediction.requeue_stale(db, older_than=older_than)
+    for task_id in task_ids:
+        logger.warning("Задача %s зависла в PROCESSING, отправлена повторно", task_id)
+        publish(task_id)
+    return task_ids
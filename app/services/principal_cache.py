@@ -0,0 +1,232 @@
+"""
+Кеш авторизованных пользователей (principal) для deps.get_current_user:
+пользователь из токена берется из памяти процесса, без SELECT на каждый запрос.
+Запись живет PRINCIPAL_CACHE_TTL_SECONDS и удаляется после commit, в котором
+у пользователя изменились баланс, роль или активность. При заданном REDIS_URL
+удаление рассылается всем процессам API через Redis pub/sub. Смена роли,
+деактивация и удаление пользователя также отзывают его токены (token_denylist).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.db.user import UserDB
+from app.services.token_denylist import get_token_denylist
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "principal-invalidations"
+# Поля пользователя, изменение которых сбрасывает запись кеша
+TRACKED_FIELDS = ("balance", "role", "is_active")
+# Поля, от которых зависят выданные токены (роль в claims): их изменение отзывает токены
+TOKEN_FIELDS = ("role", "is_active")
+# Хеш пароля в кеше не нужен и не хранится
+_CACHED_FIELDS = tuple(key for key in inspect(UserDB).column_attrs.keys() if key != "password_hash")
+_CHANGED_KEY = "changed_principals"
+_REVOKED_KEY = "revoked_principals"
+
+
+class PrincipalCache:
+    """In-process кеш пользователей по id с вытеснением по LRU и TTL"""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+        publisher: Optional["RedisPrincipalInvalidations"] = None
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._publisher = publisher
+        # id -> (срок жизни, значения колонок); порядок - от давно использованных к недавним
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Растет при каждом удалении: запись, прочитанная из БД до удаления, не кешируется
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[UserDB]:
+        """
+        Пользователь из кеша
+        :return: новый объект UserDB вне сессии (у каждого запроса свой) или None
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= now:
+                del self._entries[str(user_id)]
+                return None
+            self._entries.move_to_end(str(user_id))
+        return UserDB(**values)
+
+    def version(self) -> int:
+        """Версия кеша, запоминается перед чтением пользователя из БД (см. set)"""
+        with self._lock:
+            return self._version
+
+    def set(self, user: UserDB, *, version: int) -> None:
+        """
+        Сохранить пользователя, прочитанного из БД.
+        Если после version были удаления, запись не сохраняется: прочитанные
+        значения могут быть старше изменения, которое эти удаления отметили
+        """
+        values = {key: getattr(user, key) for key in _CACHED_FIELDS}
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[str(user.id)] = (self._clock() + self._ttl, values)
+            self._entries.move_to_end(str(user.id))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_ids: Iterable[str]) -> None:
+        """Удалить записи в этом процессе"""
+        with self._lock:
+            self._version += 1
+            for user_id in user_ids:
+                self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def invalidate(self, user_ids: Iterable[str]) -> None:
+        """Удалить записи в этом процессе и разослать удаление остальным"""
+        user_ids = [str(user_id) for user_id in user_ids]
+        self.evict(user_ids)
+        if self._publisher is not None:
+            self._publisher.publish_soon(user_ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisPrincipalInvalidations:
+    """
+    Рассылка удалений через Redis pub/sub. Сообщения, потерянные при
+    переподключении, покрывает TTL записей: после переподключения
+    кеш процесса очищается целиком.
+    """
+
+    def __init__(self, url: str):
+        self._url = url
+        self._client = None
+
+    def publish(self, user_ids: Iterable[str]) -> None:
+        try:
+            if self._client is None:
+                import redis
+
+                self._client = redis.Redis.from_url(self._url)
+            self._client.publish(INVALIDATION_CHANNEL, json.dumps(list(user_ids)))
+        except Exception:
+            logger.warning("Не удалось разослать сброс кеша пользователей", exc_info=True)
+
+    def publish_soon(self, user_ids: Iterable[str]) -> None:
+        """Из цикла событий - в пуле потоков (не блокирует цикл), иначе сразу"""
+        user_ids = list(user_ids)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.publish(user_ids)
+        else:
+            loop.run_in_executor(None, self.publish, user_ids)
+
+    async def listen(self, cache: PrincipalCache, *, retry_seconds: float = 1.0) -> None:
+        """Применять удаления других процессов к cache (фоновая задача процесса API)"""
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self._url)
+        while True:
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # Удаления, пропущенные без подписки, неизвестны - сбрасываем все
+                    cache.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            cache.evict(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                await client.aclose()
+                raise
+            except Exception:
+                logger.warning("Подписка на сброс кеша пользователей прервана", exc_info=True)
+                await asyncio.sleep(retry_seconds)
+
+
+def mark_principal_changed(db: Session, user_id: str) -> None:
+    """Отметить изменение пользователя: запись кеша удаляется после commit сессии"""
+    db.info.setdefault(_CHANGED_KEY, set()).add(str(user_id))
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changed_users(session: Session, flush_context, instances) -> None:
+    # Изменения через ORM-объекты; массовые UPDATE отмечаются в crud_user
+    for obj in session.dirty:
+        if not isinstance(obj, UserDB):
+            continue
+        attrs = inspect(obj).attrs
+        if any(attrs[key].history.has_changes() for key in TRACKED_FIELDS):
+            mark_principal_changed(session, obj.id)
+        if any(attrs[key].history.has_changes() for key in TOKEN_FIELDS):
+            session.info.setdefault(_REVOKED_KEY, set()).add(str(obj.id))
+    for obj in session.deleted:
+        if isinstance(obj, UserDB):
+            mark_principal_changed(session, obj.id)
+            session.info.setdefault(_REVOKED_KEY, set()).add(str(obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    # Сначала отзыв токенов: после сброса кеша запрос со старым токеном уже не пройдет
+    for user_id in session.info.pop(_REVOKED_KEY, ()):
+        get_token_denylist().revoke_user(user_id)
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids:
+        get_principal_cache().invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+    session.info.pop(_REVOKED_KEY, None)
+
+
+_cache: Optional[PrincipalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Кеш процесса; при заданном REDIS_URL удаления рассылаются через Redis"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            publisher = RedisPrincipalInvalidations(settings.REDIS_URL) if settings.REDIS_URL else None
+            _cache = PrincipalCache(
+                max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+                publisher=publisher
+            )
+        return _cache
+
+
+async def listen_for_invalidations() -> None:
+    """Фоновая задача API: удаления из других процессов (только при REDIS_URL)"""
+    cache = get_principal_cache()
+    if cache._publisher is not None:
+        await cache._publisher.listen(cache)
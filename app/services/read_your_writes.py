@@ -0,0 +1,103 @@
+"""
+Чтение своих записей при чтении с реплики: после записи пользователь на
+READ_YOUR_WRITES_SECONDS закрепляется за основной БД, пока реплика догоняет.
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PrimaryPins(ABC):
+    """Пользователи, которые читают с основной БД"""
+
+    @abstractmethod
+    async def pin(self, user_id: str) -> None:
+        """Закрепить пользователя за основной БД (вызывается после commit записи)"""
+        pass
+
+    @abstractmethod
+    async def is_pinned(self, user_id: str) -> bool:
+        pass
+
+
+class InMemoryPrimaryPins(PrimaryPins):
+    """Закрепления в памяти процесса"""
+
+    def __init__(self, ttl_seconds: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def pin(self, user_id: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._expires[str(user_id)] = now + self._ttl
+            # Истекшие закрепления удаляются при записи, словарь не растет
+            if len(self._expires) > 1024:
+                self._expires = {key: expires for key, expires in self._expires.items() if expires > now}
+
+    async def is_pinned(self, user_id: str) -> bool:
+        with self._lock:
+            expires = self._expires.get(str(user_id))
+        return expires is not None and expires > self._clock()
+
+
+class RedisPrimaryPins(PrimaryPins):
+    """
+    Закрепления в Redis, общие для всех процессов API.
+    Если Redis недоступен, пользователь читает с основной БД.
+    """
+
+    def __init__(self, client, ttl_seconds: float = 5.0):
+        """
+        :param client: клиент redis.asyncio.Redis
+        :param ttl_seconds: время закрепления
+        """
+        self._client = client
+        self._ttl_ms = int(ttl_seconds * 1000)
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: float = 5.0) -> "RedisPrimaryPins":
+        import redis.asyncio
+
+        return cls(redis.asyncio.Redis.from_url(url), ttl_seconds)
+
+    async def pin(self, user_id: str) -> None:
+        try:
+            await self._client.set(self._key(user_id), 1, px=self._ttl_ms)
+        except Exception:
+            logger.warning("Не удалось закрепить пользователя %s за основной БД", user_id, exc_info=True)
+
+    async def is_pinned(self, user_id: str) -> bool:
+        try:
+            return bool(await self._client.exists(self._key(user_id)))
+        except Exception:
+            logger.warning("Redis недоступен, чтение с основной БД", exc_info=True)
+            return True
+
+    def _key(self, user_id: str) -> str:
+        return f"primary-pin:{user_id}"
+
+
+_pins: Optional[PrimaryPins] = None
+_pins_lock = threading.Lock()
+
+
+def get_primary_pins() -> PrimaryPins:
+    """Закрепления процесса: Redis, если задан REDIS_URL, иначе in-process"""
+    global _pins
+    with _pins_lock:
+        if _pins is None:
+            if settings.REDIS_URL:
+                _pins = RedisPrimaryPins.from_url(settings.REDIS_URL, settings.READ_YOUR_WRITES_SECONDS)
+            else:
+                _pins = InMemoryPrimaryPins(settings.READ_YOUR_WRITES_SECONDS)
+        return _pins
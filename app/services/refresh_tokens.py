@@ -0,0 +1,79 @@
+"""
+Refresh-токены: продление сессии без входа по паролю (bcrypt).
+Токен - "<id семейства>.<секрет>"; в БД одна строка на семейство (вход)
+с SHA-256 текущего секрета. Продление - один UPDATE по первичному ключу,
+который заменяет токен новым (ротация). Предъявление уже замененного
+токена отзывает все семейство: токеном, вероятно, завладел кто-то еще.
+"""
+
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.async_crud import async_crud_refresh_token
+from app.crud.refresh_token import RefreshTokenFamilyCreate
+from app.models.db.types import new_id
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidRefreshTokenError(Exception):
+    """Refresh-токен неизвестен, заменен, отозван или истек"""
+    pass
+
+
+def _hash_secret(secret: str) -> str:
+    # Секрет случайный (256 бит) - медленный хеш вроде bcrypt не нужен
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _parse(token: str) -> Tuple[str, str]:
+    """:return: (id семейства, хеш секрета)"""
+    family_id, _, secret = token.partition(".")
+    if not family_id or not secret:
+        raise InvalidRefreshTokenError()
+    return family_id, _hash_secret(secret)
+
+
+def _expires_at(now: datetime) -> datetime:
+    return now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: str) -> str:
+    """Новое семейство при входе по паролю"""
+    family_id, secret = new_id(), secrets.token_urlsafe(32)
+    await async_crud_refresh_token.start(db, family_id=family_id, obj_in=RefreshTokenFamilyCreate(
+        user_id=user_id,
+        token_hash=_hash_secret(secret),
+        expires_at=_expires_at(datetime.now(timezone.utc))
+    ))
+    return f"{family_id}.{secret}"
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[str, str]:
+    """
+    Обменять refresh-токен на новый того же семейства
+    :return: (id пользователя, новый refresh-токен)
+    :raises InvalidRefreshTokenError: токен не текущий в живом семействе
+    """
+    family_id, token_hash = _parse(token)
+    secret, now = secrets.token_urlsafe(32), datetime.now(timezone.utc)
+    user_id = await async_crud_refresh_token.rotate(
+        db, family_id, token_hash, new_hash=_hash_secret(secret), now=now, expires_at=_expires_at(now)
+    )
+    if user_id is None:
+        if await async_crud_refresh_token.revoke(db, family_id, now=now, unless_hash=token_hash):
+            logger.warning("Повторно предъявлен замененный refresh-токен, семейство %s отозвано", family_id)
+        raise InvalidRefreshTokenError()
+    return user_id, f"{family_id}.{secret}"
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Отозвать семейство токена (выход)"""
+    family_id, _ = _parse(token)
+    await async_crud_refresh_token.revoke(db, family_id, now=datetime.now(timezone.utc))
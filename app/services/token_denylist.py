@@ -0,0 +1,158 @@
+"""
+Отзыв JWT до истечения срока: список отозванных токенов (по jti) и
+пользователей (токены, выданные до момента отзыва). Записи живут не дольше
+самих токенов, поэтому список остается компактным.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenDenylist(ABC):
+    """Отозванные токены и пользователи"""
+
+    @abstractmethod
+    async def revoke_token(self, jti: str, expires_at: float) -> None:
+        """Отозвать один токен (expires_at - его exp, после него запись не нужна)"""
+        pass
+
+    @abstractmethod
+    def revoke_user(self, user_id: str) -> None:
+        """
+        Отозвать все выданные пользователю токены (смена роли, деактивация).
+        Синхронный: вызывается после commit в том числе из воркера
+        """
+        pass
+
+    @abstractmethod
+    async def is_revoked(self, user_id: str, jti: Optional[str], issued_at: Optional[float]) -> bool:
+        """Токен отозван сам или выдан до отзыва пользователя (без iat - считается выданным до)"""
+        pass
+
+
+class InMemoryTokenDenylist(TokenDenylist):
+    """Отзывы в памяти процесса"""
+
+    def __init__(self, user_ttl_seconds: float, clock: Callable[[], float] = time.time):
+        """
+        :param user_ttl_seconds: сколько хранить отзыв пользователя (срок жизни токена)
+        """
+        self._user_ttl = user_ttl_seconds
+        self._clock = clock
+        # jti -> exp токена
+        self._tokens: Dict[str, float] = {}
+        # user_id -> (момент отзыва, срок записи)
+        self._users: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    async def revoke_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._tokens[jti] = expires_at
+            self._prune()
+
+    def revoke_user(self, user_id: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._users[str(user_id)] = (now, now + self._user_ttl)
+            self._prune()
+
+    async def is_revoked(self, user_id: str, jti: Optional[str], issued_at: Optional[float]) -> bool:
+        now = self._clock()
+        with self._lock:
+            expires_at = self._tokens.get(jti) if jti else None
+            user_entry = self._users.get(str(user_id))
+        if expires_at is not None and expires_at > now:
+            return True
+        if user_entry is None or user_entry[1] <= now:
+            return False
+        return issued_at is None or issued_at <= user_entry[0]
+
+    def _prune(self) -> None:
+        # Истекшие записи удаляются при записи, словари не растут
+        if len(self._tokens) + len(self._users) <= 1024:
+            return
+        now = self._clock()
+        self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+        self._users = {key: entry for key, entry in self._users.items() if entry[1] > now}
+
+
+class RedisTokenDenylist(TokenDenylist):
+    """
+    Отзывы в Redis, общие для всех процессов (ключи с TTL до истечения токенов).
+    Если Redis недоступен при проверке, токен считается отозванным.
+    """
+
+    def __init__(self, client, sync_client, user_ttl_seconds: float):
+        """
+        :param client: клиент redis.asyncio.Redis (проверка и отзыв токена)
+        :param sync_client: клиент redis.Redis (отзыв пользователя после commit)
+        """
+        self._client = client
+        self._sync_client = sync_client
+        self._user_ttl_ms = int(user_ttl_seconds * 1000)
+
+    @classmethod
+    def from_url(cls, url: str, user_ttl_seconds: float) -> "RedisTokenDenylist":
+        import redis
+        import redis.asyncio
+
+        return cls(redis.asyncio.Redis.from_url(url), redis.Redis.from_url(url), user_ttl_seconds)
+
+    async def revoke_token(self, jti: str, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms > 0:
+            await self._client.set(f"denied-token:{jti}", 1, px=ttl_ms)
+
+    def revoke_user(self, user_id: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._set_user(user_id, time.time())
+        else:
+            # Из цикла событий - в пуле потоков, не блокируя цикл
+            loop.run_in_executor(None, self._set_user, user_id, time.time())
+
+    def _set_user(self, user_id: str, revoked_at: float) -> None:
+        try:
+            self._sync_client.set(f"denied-user:{user_id}", revoked_at, px=self._user_ttl_ms)
+        except Exception:
+            logger.error("Не удалось отозвать токены пользователя %s", user_id, exc_info=True)
+
+    async def is_revoked(self, user_id: str, jti: Optional[str], issued_at: Optional[float]) -> bool:
+        try:
+            token_denied, user_revoked_at = await self._client.mget(
+                f"denied-token:{jti or ''}", f"denied-user:{user_id}"
+            )
+        except Exception:
+            logger.warning("Redis недоступен, токен не принят", exc_info=True)
+            return True
+        if token_denied is not None:
+            return True
+        if user_revoked_at is None:
+            return False
+        return issued_at is None or issued_at <= float(user_revoked_at)
+
+
+_denylist: Optional[TokenDenylist] = None
+_denylist_lock = threading.Lock()
+
+
+def get_token_denylist() -> TokenDenylist:
+    """Список процесса: Redis, если задан REDIS_URL, иначе in-process"""
+    global _denylist
+    with _denylist_lock:
+        if _denylist is None:
+            user_ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            if settings.REDIS_URL:
+                _denylist = RedisTokenDenylist.from_url(settings.REDIS_URL, user_ttl)
+            else:
+                _denylist = InMemoryTokenDenylist(user_ttl)
+        return _denylist
@@ -0,0 +1,71 @@
+"""
+Воркер очереди предсказаний.
+Запуск: python -m app.worker
+"""
+
+import logging
+import threading
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.broker import RabbitMQBroker, TaskHandler
+from app.services.prediction_processor import process_prediction_task, requeue_stale_tasks
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+def make_handler(session_factory: Callable[[], Session]) -> TaskHandler:
+    """Обработчик сообщения: отдельная сессия БД на каждую задачу"""
+    def handle(task_id: str) -> None:
+        db = session_factory()
+        try:
+            task = process_prediction_task(db, task_id)
+            if task is not None:
+                logger.info("Задача %s: %s", task_id, task.status.value)
+        finally:
+            db.close()
+    return handle
+
+
+def run_reaper(session_factory: Callable[[], Session], stop: threading.Event) -> None:
+    """Периодический возврат зависших в PROCESSING задач в очередь"""
+    # Отдельное соединение: BlockingConnection нельзя делить между потоками
+    broker = RabbitMQBroker(settings.get_rabbitmq_url(), settings.RABBITMQ_PREDICTION_QUEUE)
+    try:
+        while not stop.is_set():
+            db = session_factory()
+            try:
+                requeue_stale_tasks(db, broker.publish)
+            except Exception:
+                logger.exception("Ошибка при возврате зависших задач")
+            finally:
+                db.close()
+            stop.wait(settings.PREDICTION_REAPER_INTERVAL_SECONDS)
+    finally:
+        broker.close()
+
+
+def main() -> None:
+    """Главная функция воркера"""
+    from app.database.database import SessionLocal
+
+    broker = RabbitMQBroker(settings.get_rabbitmq_url(), settings.RABBITMQ_PREDICTION_QUEUE)
+    stop = threading.Event()
+    reaper = threading.Thread(target=run_reaper, args=(SessionLocal, stop), daemon=True)
+    reaper.start()
+
+    logger.info("🚀 Воркер слушает очередь %s", settings.RABBITMQ_PREDICTION_QUEUE)
+    try:
+        broker.consume(make_handler(SessionLocal))
+    except KeyboardInterrupt:
+        logger.info("Воркер остановлен")
+    finally:
+        stop.set()
+        broker.close()
+
+
+if __name__ == "__main__":
+    main()
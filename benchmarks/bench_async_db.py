@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Сравнение синхронного пути (def-эндпоинт: поток из пула anyio на все время
+ожидания БД) и асинхронного (AsyncSession на asyncpg) при N параллельных
+запросах. Каждый запрос - SELECT pg_sleep(latency), имитация ожидания БД.
+Нужен PostgreSQL из .env (POSTGRES_*).
+Запуск: python benchmarks/bench_async_db.py [--requests 400] [--pool-size 100] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+QUERY = text("SELECT pg_sleep(:latency)")
+
+
+async def run_sync_path(n: int, pool_size: int, latency: float) -> float:
+    engine = create_engine(settings.get_database_url(), pool_size=pool_size, max_overflow=0)
+
+    def handler():
+        with engine.connect() as conn:
+            conn.execute(QUERY, {"latency": latency})
+
+    try:
+        # Прогрев пула соединений
+        await asyncio.gather(*(run_in_threadpool(handler) for _ in range(pool_size)))
+        start = time.perf_counter()
+        await asyncio.gather(*(run_in_threadpool(handler) for _ in range(n)))
+        return time.perf_counter() - start
+    finally:
+        engine.dispose()
+
+
+async def run_async_path(n: int, pool_size: int, latency: float) -> float:
+    engine = create_async_engine(settings.get_async_database_url(), pool_size=pool_size, max_overflow=0)
+
+    async def handler():
+        async with engine.connect() as conn:
+            await conn.execute(QUERY, {"latency": latency})
+
+    try:
+        await asyncio.gather(*(handler() for _ in range(pool_size)))
+        start = time.perf_counter()
+        await asyncio.gather(*(handler() for _ in range(n)))
+        return time.perf_counter() - start
+    finally:
+        await engine.dispose()
+
+
+async def run(args) -> None:
+    latency = args.latency_ms / 1000
+    print(f"{args.requests} запросов, пул {args.pool_size}, задержка БД {args.latency_ms} мс")
+    print(f"{'path':>8} {'total, s':>10} {'req/s':>10}")
+    for name, path in (("sync", run_sync_path), ("async", run_async_path)):
+        elapsed = await path(args.requests, args.pool_size, latency)
+        print(f"{name:>8} {elapsed:>10.3f} {args.requests / elapsed:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--pool-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
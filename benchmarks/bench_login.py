@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Пропускная способность входа (проверка bcrypt) при волне параллельных логинов:
+пул потоков anyio (как было) против пула процессов password_hasher.
+Во время волны каждые 10 мс вызывается легкая синхронная функция через
+run_in_threadpool - как синхронные участки остальных эндпоинтов; ее задержка
+показывает, сколько ждут прочие запросы, пока идут логины.
+Запуск: python benchmarks/bench_login.py [--logins 200] [--rounds 12] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusyError, password_context
+
+
+async def probe(stop: asyncio.Event, latencies: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await run_in_threadpool(lambda: None)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def storm(verify, logins: int) -> dict:
+    latencies = []
+    rejected = 0
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, latencies))
+
+    async def login():
+        nonlocal rejected
+        try:
+            await verify()
+        except PasswordHasherBusyError:
+            rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return {
+        "logins_per_s": (logins - rejected) / elapsed,
+        "rejected": rejected,
+        "probe_p50_ms": statistics.median(latencies),
+        "probe_max_ms": max(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    context = password_context(args.rounds)
+    password_hash = context.hash("secret123")
+
+    results = {"threadpool": asyncio.run(storm(
+        lambda: run_in_threadpool(context.verify, "secret123", password_hash), args.logins
+    ))}
+
+    hasher = PasswordHasher(workers=args.workers, max_pending=args.logins, rounds=args.rounds)
+    try:
+        # Запуск процессов пула - до замера
+        asyncio.run(hasher.verify("secret123", password_hash))
+        results["process pool"] = asyncio.run(storm(
+            lambda: hasher.verify("secret123", password_hash), args.logins
+        ))
+        queue = hasher.metrics()
+    finally:
+        hasher.shutdown()
+
+    print(f"{args.logins} логинов, bcrypt rounds={args.rounds}, процессов пула: {args.workers}")
+    print(f"{'':<14}{'логинов/с':>12}{'отказов':>10}{'probe p50, мс':>16}{'probe max, мс':>16}")
+    for name, result in results.items():
+        print(
+            f"{name:<14}{result['logins_per_s']:>12.1f}{result['rejected']:>10}"
+            f"{result['probe_p50_ms']:>16.2f}{result['probe_max_ms']:>16.2f}"
+        )
+    print(f"очередь пула процессов: среднее {queue['queue_ms_avg']} мс, максимум {queue['queue_ms_max']} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Процессорное время на вызов горячих запросов: ORM Query, собираемый на каждом
+вызове (как было), против запроса, построенного один раз (app/crud).
+Запросы выполняются на SQLite в памяти, чтобы время драйвера и сети было
+минимальным и разница приходилась на построение запроса и ключ кеша.
+Запуск: python benchmarks/bench_query_statements.py [--calls 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.crud.ml_model import crud_ml_model
+from app.crud.prediction import crud_prediction
+from app.crud.user import crud_user
+from app.models.db import MLModelDB, PredictionTaskDB, UserDB
+from app.models.db.base import Base
+from app.models.enums import ModelType, UserRole
+
+
+def setup_session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine, expire_on_commit=False)
+    db.add(UserDB(
+        id="u1", username="alice", email="alice@example.com", password_hash="x",
+        role=UserRole.USER, balance=100.0, is_active=True
+    ))
+    db.add(MLModelDB(id="m1", name="model", model_type=ModelType.CLASSIFICATION, cost_per_prediction=1.0))
+    db.add_all([PredictionTaskDB(user_id="u1", model_id="m1", input_data=[]) for _ in range(20)])
+    db.commit()
+    return db
+
+
+def cases(db: Session):
+    """(имя, как было, как стало)"""
+    return [
+        (
+            "get_by_username",
+            lambda: db.query(UserDB).filter(UserDB.username == "alice").first(),
+            lambda: crud_user.get_by_username(db, username="alice"),
+        ),
+        (
+            "crud_ml_model.get",
+            lambda: db.query(MLModelDB).filter(MLModelDB.id == "m1").first(),
+            lambda: crud_ml_model.get(db, id="m1"),
+        ),
+        (
+            "prediction.get_by_user",
+            lambda: (
+                db.query(PredictionTaskDB)
+                .filter(PredictionTaskDB.user_id == "u1")
+                .order_by(PredictionTaskDB.created_at.desc(), PredictionTaskDB.id.desc())
+                .offset(0)
+                .limit(10)
+                .all()
+            ),
+            lambda: crud_prediction.get_by_user(db, "u1", limit=10),
+        ),
+    ]
+
+
+def per_call_us(fn, calls: int) -> float:
+    for _ in range(min(calls, 1000)):
+        fn()
+    start = time.process_time()
+    for _ in range(calls):
+        fn()
+    return (time.process_time() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    db = setup_session()
+    print(f"{args.calls} вызовов, процессорное время на вызов")
+    print(f"{'query':>24} {'query(), us':>12} {'prebuilt, us':>13} {'saved, us':>10}")
+    for name, before, after in cases(db):
+        old = per_call_us(before, args.calls)
+        new = per_call_us(after, args.calls)
+        print(f"{name:>24} {old:>12.1f} {new:>13.1f} {old - new:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
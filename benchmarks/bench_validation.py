@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Сравнение SimpleDataValidator и ColumnarDataValidator на 1k/100k/1M строк.
+Запуск: python benchmarks/bench_validation.py [--sizes 1000 100000 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.prediction import ColumnarDataValidator, FieldSpec, SimpleDataValidator
+
+REQUIRED_FIELDS = ["feature1", "feature2"]
+
+
+def make_rows(n: int, invalid_share: float = 0.1):
+    """Строки как в PredictionRequest.data, часть без feature2"""
+    rng = random.Random(42)
+    rows = []
+    for _ in range(n):
+        row = {"feature1": rng.random(), "feature2": rng.random() * 100}
+        if rng.random() < invalid_share:
+            del row["feature2"]
+        rows.append(row)
+    return rows
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    simple = SimpleDataValidator(required_fields=REQUIRED_FIELDS)
+    columnar = ColumnarDataValidator(required_fields=REQUIRED_FIELDS)
+    typed = ColumnarDataValidator(fields=[
+        FieldSpec("feature1", dtype=float, min_value=0.0, max_value=1.0, nullable=False),
+        FieldSpec("feature2", dtype=float, min_value=0.0, nullable=False),
+    ])
+
+    print(f"{'rows':>10} {'simple, s':>12} {'columnar, s':>12} {'masks only, s':>14} {'typed+ranges, s':>16}")
+    for n in args.sizes:
+        rows = make_rows(n)
+        t_simple = best_of(lambda: simple.validate(rows), args.repeat)
+        t_columnar = best_of(lambda: columnar.validate(rows), args.repeat)
+        t_masks = best_of(lambda: columnar.validate_columns(rows), args.repeat)
+        t_typed = best_of(lambda: typed.validate_columns(rows), args.repeat)
+        print(f"{n:>10} {t_simple:>12.4f} {t_columnar:>12.4f} {t_masks:>14.4f} {t_typed:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
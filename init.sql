@@ -28,32 +28,88 @@ CREATE TABLE IF NOT EXISTS ml_models (
     CONSTRAINT cost_positive CHECK (cost_per_prediction >= 0)
 );
 
--- Таблица транзакций
+-- Таблица транзакций (помесячные секции по created_at, см. app/jobs/partitions.py)
 CREATE TABLE IF NOT EXISTS transactions (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     transaction_type VARCHAR(20) NOT NULL CHECK (transaction_type IN ('deposit', 'withdrawal', 'refund')),
     amount DECIMAL(10, 2) NOT NULL,
     description TEXT,
     task_id UUID,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
--- Таблица задач предсказания
+-- Таблица задач предсказания (помесячные секции по created_at)
 CREATE TABLE IF NOT EXISTS prediction_tasks (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     model_id UUID NOT NULL REFERENCES ml_models(id) ON DELETE CASCADE,
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'completed', 'failed', 'validation_error')),
     input_data JSONB NOT NULL,
-    valid_data JSONB,
-    invalid_data JSONB,
+    valid_count INTEGER NOT NULL DEFAULT 0,
+    invalid_count INTEGER NOT NULL DEFAULT 0,
+    invalid_rows JSONB,
     result JSONB,
     total_cost DECIMAL(10, 2),
     error_message TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    completed_at TIMESTAMP
+    completed_at TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Секции текущего и трех следующих месяцев; дальше их создает app/jobs/partitions.py
+DO $$
+DECLARE
+    parent TEXT;
+    lower_bound DATE;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['transactions', 'prediction_tasks'] LOOP
+        FOR i IN 0..3 LOOP
+            lower_bound := date_trunc('month', CURRENT_DATE)::date + make_interval(months => i);
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                parent || to_char(lower_bound, '"_y"YYYY"m"MM'), parent,
+                lower_bound, (lower_bound + interval '1 month')::date
+            );
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- Снимки баланса по журналу транзакций (водяной знак - последняя учтенная транзакция)
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    balance DECIMAL(10, 2) NOT NULL,
+    last_transaction_at TIMESTAMP NOT NULL,
+    last_transaction_id UUID NOT NULL,
+    transaction_count INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Семейства refresh-токенов: одна строка на вход, хеш текущего токена
+CREATE TABLE IF NOT EXISTS refresh_token_families (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    token_hash VARCHAR(64) NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- API-ключи: только HMAC-SHA256 ключа, поиск по уникальному key_hash
+CREATE TABLE IF NOT EXISTS api_keys (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name VARCHAR(100) NOT NULL,
+    key_hash VARCHAR(64) NOT NULL UNIQUE,
+    prefix VARCHAR(12) NOT NULL,
+    scopes JSONB NOT NULL,
+    expires_at TIMESTAMPTZ,
+    revoked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Индексы для производительности
@@ -64,6 +120,12 @@ CREATE INDEX IF NOT EXISTS idx_transactions_created_at ON transactions(created_a
 CREATE INDEX IF NOT EXISTS idx_prediction_tasks_user_id ON prediction_tasks(user_id);
 CREATE INDEX IF NOT EXISTS idx_prediction_tasks_status ON prediction_tasks(status);
 CREATE INDEX IF NOT EXISTS idx_prediction_tasks_created_at ON prediction_tasks(created_at);
+-- Keyset-пагинация истории по (created_at, id) в пределах пользователя
+CREATE INDEX IF NOT EXISTS idx_transactions_user_created ON transactions(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_prediction_tasks_user_created ON prediction_tasks(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_balance_snapshots_user_watermark ON balance_snapshots(user_id, last_transaction_at, last_transaction_id);
+CREATE INDEX IF NOT EXISTS ix_refresh_token_families_user_id ON refresh_token_families(user_id);
+CREATE INDEX IF NOT EXISTS ix_api_keys_user_id ON api_keys(user_id);
 
 -- Триггер для обновления updated_at
 CREATE OR REPLACE FUNCTION update_updated_at_column()
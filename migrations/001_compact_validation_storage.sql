@@ -0,0 +1,42 @@
+-- Компактное хранение результата валидации задач предсказания.
+-- valid_data/invalid_data (копии строк из input_data) заменяются счетчиками
+-- и списком [индекс строки, код ошибки] для невалидных строк.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/001_compact_validation_storage.sql
+
+BEGIN;
+
+ALTER TABLE prediction_tasks
+    ADD COLUMN IF NOT EXISTS valid_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS invalid_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS invalid_rows JSONB;
+
+UPDATE prediction_tasks t
+SET valid_count = COALESCE(jsonb_array_length(t.valid_data::jsonb), 0),
+    invalid_count = COALESCE(jsonb_array_length(t.invalid_data::jsonb), 0),
+    invalid_rows = '[]'::jsonb;
+
+-- Старый валидатор проверял только присутствие полей: код 2 (MISSING_FIELD).
+-- Невалидные строки разворачиваются один раз и сопоставляются со строками
+-- input_data хеш-соединением по (id задачи, строка), без подзапроса на каждую строку.
+WITH invalid AS (
+    SELECT DISTINCT t.id, e.row
+    FROM prediction_tasks t
+    CROSS JOIN LATERAL jsonb_array_elements(t.invalid_data::jsonb) AS e(row)
+),
+marked AS (
+    SELECT t.id, jsonb_agg(jsonb_build_array(e.ord - 1, 2) ORDER BY e.ord) AS invalid_rows
+    FROM prediction_tasks t
+    CROSS JOIN LATERAL jsonb_array_elements(t.input_data::jsonb) WITH ORDINALITY AS e(row, ord)
+    JOIN invalid i ON i.id = t.id AND i.row = e.row
+    GROUP BY t.id
+)
+UPDATE prediction_tasks t
+SET invalid_rows = m.invalid_rows
+FROM marked m
+WHERE m.id = t.id;
+
+ALTER TABLE prediction_tasks
+    DROP COLUMN IF EXISTS valid_data,
+    DROP COLUMN IF EXISTS invalid_data;
+
+COMMIT;
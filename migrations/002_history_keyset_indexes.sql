@@ -0,0 +1,9 @@
+-- Составные индексы для курсорной пагинации истории по (created_at, id).
+-- CONCURRENTLY не блокирует запись, поэтому выполняется вне транзакции.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/002_history_keyset_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_created
+    ON transactions (user_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prediction_tasks_user_created
+    ON prediction_tasks (user_id, created_at, id);
@@ -0,0 +1,21 @@
+-- Снимки баланса по журналу транзакций: баланс пользователя проверяется по
+-- последнему снимку и транзакциям после его водяного знака, без SUM по всей истории.
+-- Снимки пишет python -m app.jobs.balance_snapshots.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/003_balance_snapshots.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    balance DECIMAL(10, 2) NOT NULL,
+    last_transaction_at TIMESTAMP NOT NULL,
+    last_transaction_id UUID NOT NULL,
+    transaction_count INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_balance_snapshots_user_watermark
+    ON balance_snapshots (user_id, last_transaction_at, last_transaction_id);
+
+COMMIT;
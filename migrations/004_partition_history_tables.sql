@@ -0,0 +1,85 @@
+-- Помесячное секционирование prediction_tasks и transactions по created_at.
+-- Таблицы пересоздаются как секционированные, данные переносятся в секции
+-- по месяцам. Миграция берет эксклюзивные блокировки обеих таблиц - выполнять
+-- при остановленных приложении и воркере.
+-- Дальше секции создает и архивирует python -m app.jobs.partitions.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/004_partition_history_tables.sql
+
+BEGIN;
+
+ALTER TABLE transactions RENAME TO transactions_legacy;
+ALTER TABLE prediction_tasks RENAME TO prediction_tasks_legacy;
+
+DROP TRIGGER IF EXISTS update_prediction_tasks_updated_at ON prediction_tasks_legacy;
+DROP INDEX IF EXISTS
+    idx_transactions_user_id,
+    idx_transactions_created_at,
+    idx_transactions_user_created,
+    idx_prediction_tasks_user_id,
+    idx_prediction_tasks_status,
+    idx_prediction_tasks_created_at,
+    idx_prediction_tasks_user_created;
+
+-- Колонки, значения по умолчанию и CHECK - как у текущих таблиц;
+-- первичный ключ обязан включать ключ секционирования
+CREATE TABLE transactions (LIKE transactions_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    PARTITION BY RANGE (created_at);
+ALTER TABLE transactions
+    ALTER COLUMN created_at SET NOT NULL,
+    ADD PRIMARY KEY (id, created_at),
+    ADD FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE;
+
+CREATE TABLE prediction_tasks (LIKE prediction_tasks_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    PARTITION BY RANGE (created_at);
+ALTER TABLE prediction_tasks
+    ALTER COLUMN created_at SET NOT NULL,
+    ADD PRIMARY KEY (id, created_at),
+    ADD FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    ADD FOREIGN KEY (model_id) REFERENCES ml_models(id) ON DELETE CASCADE;
+
+-- Секции от месяца самой старой строки до трех месяцев вперед
+DO $$
+DECLARE
+    parent TEXT;
+    first_month DATE;
+    lower_bound DATE;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['transactions', 'prediction_tasks'] LOOP
+        EXECUTE format('SELECT date_trunc(''month'', min(created_at))::date FROM %I', parent || '_legacy')
+            INTO first_month;
+        lower_bound := LEAST(COALESCE(first_month, CURRENT_DATE), CURRENT_DATE);
+        lower_bound := date_trunc('month', lower_bound)::date;
+        WHILE lower_bound < date_trunc('month', CURRENT_DATE)::date + interval '4 months' LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                parent || to_char(lower_bound, '"_y"YYYY"m"MM'), parent,
+                lower_bound, (lower_bound + interval '1 month')::date
+            );
+            lower_bound := (lower_bound + interval '1 month')::date;
+        END LOOP;
+    END LOOP;
+END $$;
+
+INSERT INTO transactions SELECT * FROM transactions_legacy;
+INSERT INTO prediction_tasks SELECT * FROM prediction_tasks_legacy;
+
+DROP TABLE transactions_legacy;
+DROP TABLE prediction_tasks_legacy;
+
+-- Индексы на секционированной таблице создаются в каждой секции
+CREATE INDEX idx_transactions_user_id ON transactions(user_id);
+CREATE INDEX idx_transactions_created_at ON transactions(created_at);
+CREATE INDEX idx_transactions_user_created ON transactions(user_id, created_at, id);
+CREATE INDEX idx_prediction_tasks_user_id ON prediction_tasks(user_id);
+CREATE INDEX idx_prediction_tasks_status ON prediction_tasks(status);
+CREATE INDEX idx_prediction_tasks_created_at ON prediction_tasks(created_at);
+CREATE INDEX idx_prediction_tasks_user_created ON prediction_tasks(user_id, created_at, id);
+
+CREATE TRIGGER update_prediction_tasks_updated_at
+    BEFORE UPDATE ON prediction_tasks
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
+
+ANALYZE transactions;
+ANALYZE prediction_tasks;
@@ -0,0 +1,85 @@
+-- Нативные типы колонок для баз, созданных через Base.metadata.create_all
+-- (init_db): VARCHAR(36) -> UUID, JSON -> JSONB, вещественные суммы -> NUMERIC(10, 2).
+-- UUID занимает 16 байт вместо 37, поэтому индексы первичных и внешних ключей
+-- users, transactions и prediction_tasks примерно вдвое меньше.
+-- Колонки с уже нужным типом (база из init.sql) пропускаются.
+-- ALTER ... TYPE переписывает таблицы и индексы под эксклюзивной блокировкой -
+-- выполнять при остановленных приложении и воркере.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/005_native_column_types.sql
+
+BEGIN;
+
+CREATE TEMP TABLE column_types (table_name TEXT, column_name TEXT, target TEXT, using_expr TEXT) ON COMMIT DROP;
+INSERT INTO column_types VALUES
+    ('users', 'id', 'uuid', 'id::uuid'),
+    ('users', 'balance', 'numeric(10,2)', 'round(balance::numeric, 2)'),
+    ('ml_models', 'id', 'uuid', 'id::uuid'),
+    ('ml_models', 'cost_per_prediction', 'numeric(10,2)', 'round(cost_per_prediction::numeric, 2)'),
+    ('transactions', 'id', 'uuid', 'id::uuid'),
+    ('transactions', 'user_id', 'uuid', 'user_id::uuid'),
+    ('transactions', 'task_id', 'uuid', 'NULLIF(task_id, '''')::uuid'),
+    ('transactions', 'amount', 'numeric(10,2)', 'round(amount::numeric, 2)'),
+    ('prediction_tasks', 'id', 'uuid', 'id::uuid'),
+    ('prediction_tasks', 'user_id', 'uuid', 'user_id::uuid'),
+    ('prediction_tasks', 'model_id', 'uuid', 'model_id::uuid'),
+    ('prediction_tasks', 'input_data', 'jsonb', 'input_data::jsonb'),
+    ('prediction_tasks', 'invalid_rows', 'jsonb', 'invalid_rows::jsonb'),
+    ('prediction_tasks', 'result', 'jsonb', 'result::jsonb'),
+    ('prediction_tasks', 'total_cost', 'numeric(10,2)', 'round(total_cost::numeric, 2)'),
+    ('balance_snapshots', 'id', 'uuid', 'id::uuid'),
+    ('balance_snapshots', 'user_id', 'uuid', 'user_id::uuid'),
+    ('balance_snapshots', 'last_transaction_id', 'uuid', 'last_transaction_id::uuid'),
+    ('balance_snapshots', 'balance', 'numeric(10,2)', 'round(balance::numeric, 2)');
+
+-- Только существующие колонки, тип которых отличается от нужного
+DELETE FROM column_types WHERE to_regclass(table_name) IS NULL;
+DELETE FROM column_types t
+USING pg_attribute a
+WHERE a.attrelid = to_regclass(t.table_name)
+  AND a.attname = t.column_name
+  AND format_type(a.atttypid, a.atttypmod) = t.target;
+
+DO $$
+DECLARE
+    fk RECORD;
+    col RECORD;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM column_types) THEN
+        RAISE NOTICE 'Типы колонок уже нативные';
+        RETURN;
+    END IF;
+
+    -- Внешние ключи между меняемыми колонками: типы обеих сторон должны совпадать,
+    -- поэтому ключи снимаются на время смены типов и создаются заново
+    CREATE TEMP TABLE foreign_keys ON COMMIT DROP AS
+    SELECT c.conrelid::regclass::text AS table_name, c.conname, pg_get_constraintdef(c.oid) AS definition
+    FROM pg_constraint c
+    WHERE c.contype = 'f'
+      AND c.conparentid = 0
+      AND (c.conrelid::regclass::text IN (SELECT table_name FROM column_types)
+           OR c.confrelid::regclass::text IN (SELECT table_name FROM column_types));
+
+    FOR fk IN SELECT * FROM foreign_keys LOOP
+        EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', fk.table_name, fk.conname);
+    END LOOP;
+
+    -- Для секционированных таблиц тип меняется во всех секциях
+    FOR col IN SELECT * FROM column_types LOOP
+        EXECUTE format(
+            'ALTER TABLE %I ALTER COLUMN %I TYPE %s USING %s',
+            col.table_name, col.column_name, col.target, col.using_expr
+        );
+    END LOOP;
+
+    FOR fk IN SELECT * FROM foreign_keys LOOP
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', fk.table_name, fk.conname, fk.definition);
+    END LOOP;
+END $$;
+
+COMMIT;
+
+ANALYZE users;
+ANALYZE ml_models;
+ANALYZE transactions;
+ANALYZE prediction_tasks;
+ANALYZE balance_snapshots;
@@ -0,0 +1,21 @@
+-- Семейства refresh-токенов (POST /auth/refresh): одна строка на вход,
+-- при ротации заменяется хеш текущего токена. Продление сессии ищет
+-- семейство по первичному ключу вместо проверки пароля bcrypt.
+-- Истекшие и отозванные семейства удаляет python -m app.jobs.refresh_tokens.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/006_refresh_token_families.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS refresh_token_families (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    token_hash VARCHAR(64) NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_refresh_token_families_user_id ON refresh_token_families (user_id);
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- API-ключи пользователей (заголовок X-API-Key): хранится только HMAC-SHA256
+-- ключа, ключ ищется по уникальному индексу key_hash.
+-- Применение: psql -v ON_ERROR_STOP=1 -f migrations/007_api_keys.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS api_keys (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name VARCHAR(100) NOT NULL,
+    key_hash VARCHAR(64) NOT NULL UNIQUE,
+    prefix VARCHAR(12) NOT NULL,
+    scopes JSONB NOT NULL,
+    expires_at TIMESTAMPTZ,
+    revoked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_api_keys_user_id ON api_keys (user_id);
+
+COMMIT;
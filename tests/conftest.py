@@ -0,0 +1,209 @@
+"""
+Общие фикстуры: SQLite во временном файле вместо PostgreSQL (одна база для
+синхронного движка и aiosqlite) и TestClient без app.main
+(app.main при импорте создает таблицы в основной БД).
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настройки читаются при импорте app.core.config - задаем значения по умолчанию
+for key, value in {
+    "POSTGRES_DB": "ml_service_test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_HOST": "localhost",
+    "RABBITMQ_DEFAULT_USER": "test",
+    "RABBITMQ_DEFAULT_PASS": "test",
+    "SECRET_KEY": "test-secret-key",
+}.items():
+    os.environ.setdefault(key, value)
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.v1.api import api_router
+from app.core.config import settings
+from app.database.database import get_async_db, get_async_read_db, get_db
+from app.models.db import MLModelDB, UserDB
+from app.models.db.base import Base
+from app.models.enums import ModelType, UserRole
+from app.services import principal_cache as principal_cache_module
+from app.services.principal_cache import PrincipalCache
+from app.services import api_keys as api_keys_module
+from app.services.api_keys import ApiKeyCache
+from app.services import password_hasher as password_hasher_module
+from app.services.password_hasher import PasswordHasher
+from app.services import token_denylist as token_denylist_module
+from app.services.token_denylist import InMemoryTokenDenylist
+
+
+@pytest.fixture(autouse=True)
+def principal_cache(monkeypatch):
+    """
+    Свой кеш пользователей на тест. По умолчанию кеш выключен: тесты считают
+    запросы, и SELECT пользователя при авторизации - часть ожидаемой картины
+    """
+    cache = PrincipalCache()
+    monkeypatch.setattr(principal_cache_module, "_cache", cache)
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_ENABLED", False)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def token_denylist(monkeypatch):
+    """Свой список отозванных токенов на тест"""
+    denylist = InMemoryTokenDenylist(user_ttl_seconds=300)
+    monkeypatch.setattr(token_denylist_module, "_denylist", denylist)
+    return denylist
+
+
+@pytest.fixture(autouse=True)
+def api_key_cache(monkeypatch):
+    """Свой кеш API-ключей на тест"""
+    cache = ApiKeyCache()
+    monkeypatch.setattr(api_keys_module, "_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def password_hasher(monkeypatch):
+    """bcrypt с минимальной стоимостью в пуле потоков (без запуска процессов на тест)"""
+    hasher = PasswordHasher(max_pending=8, rounds=4, executor=ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(password_hasher_module, "_hasher", hasher)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def engine(database_path):
+    engine = create_engine(
+        f"sqlite:///{database_path}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_engine(engine, database_path):
+    """Движок эндпоинтов; NullPool - TestClient может открывать новый цикл событий на запрос"""
+    return create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+
+
+@pytest.fixture
+def replica_engine(engine, database_path):
+    """Движок "реплики" - та же база, отдельный движок (для проверки маршрутизации чтений)"""
+    return create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def app(session_factory, async_engine, replica_engine):
+    test_app = FastAPI()
+    test_app.include_router(api_router, prefix=settings.API_V1_STR)
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    replica_session_factory = async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    async def override_get_async_read_db():
+        async with replica_session_factory() as session:
+            yield session
+
+    test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
+    test_app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    return test_app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+@pytest.fixture
+def user(db):
+    user = UserDB(
+        username="alice",
+        email="alice@example.com",
+        password_hash="not-used",
+        role=UserRole.USER,
+        balance=100.0,
+        is_active=True
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def ml_model(db):
+    model = MLModelDB(
+        name="Test model",
+        model_type=ModelType.CLASSIFICATION,
+        cost_per_prediction=1.0
+    )
+    db.add(model)
+    db.commit()
+    db.refresh(model)
+    return model
+
+
+def make_token(user: UserDB) -> str:
+    """JWT в том же формате, что выдает /auth/login"""
+    return jwt.encode(
+        {
+            "sub": user.username,
+            "user_id": str(user.id),
+            "role": user.role.value,
+            "exp": datetime.utcnow() + timedelta(minutes=5)
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {make_token(user)}"}
@@ -0,0 +1,63 @@
+"""
+Тесты контроля допуска запросов на предсказание
+"""
+
+import pytest
+
+from app.models.db import UserDB
+from app.models.enums import UserRole
+from app.services import admission as admission_module
+from app.services.admission import AdmissionController, AdmissionRejectedError
+from tests.conftest import make_token
+
+
+def test_limits_per_model_and_global():
+    controller = AdmissionController(max_in_flight=2, max_in_flight_per_model=1)
+
+    controller.acquire("a")
+    with pytest.raises(AdmissionRejectedError) as e:
+        controller.acquire("a")
+    assert e.value.status_code == 429
+
+    controller.acquire("b")
+    with pytest.raises(AdmissionRejectedError) as e:
+        controller.acquire("c")
+    assert e.value.status_code == 503
+
+    controller.release("a")
+    controller.release("b")
+    metrics = controller.metrics()
+    assert metrics["in_flight"] == 0
+    assert metrics["in_flight_per_model"] == {}
+    assert (metrics["admitted"], metrics["rejected_model"], metrics["rejected_global"]) == (2, 1, 1)
+
+
+def test_endpoint_rejects_over_limit_with_retry_after(client, auth_headers, ml_model, monkeypatch):
+    """Сверх лимита запрос отклоняется сразу, слот освобождается после ответа"""
+    controller = AdmissionController(max_in_flight=10, max_in_flight_per_model=1, retry_after=3)
+    monkeypatch.setattr(admission_module, "_controller", controller)
+    body = {"model_id": ml_model.id, "data": [{"feature1": 1, "feature2": 2}]}
+
+    controller.acquire(ml_model.id)
+    response = client.post("/api/v1/predict/", headers=auth_headers, json=body)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+
+    controller.release(ml_model.id)
+    assert client.post("/api/v1/predict/", headers=auth_headers, json=body).status_code == 200
+    assert controller.metrics()["in_flight"] == 0
+
+
+def test_metrics_endpoint_is_admin_only(client, db, auth_headers, monkeypatch):
+    monkeypatch.setattr(admission_module, "_controller", AdmissionController(5, 2))
+    assert client.get("/api/v1/metrics/", headers=auth_headers).status_code == 403
+
+    admin = UserDB(
+        username="admin", email="admin@example.com", password_hash="not-used",
+        role=UserRole.ADMIN, balance=0.0, is_active=True
+    )
+    db.add(admin)
+    db.commit()
+    response = client.get("/api/v1/metrics/", headers={"Authorization": f"Bearer {make_token(admin)}"})
+    assert response.status_code == 200
+    assert response.json()["admission"]["max_in_flight"] == 5
@@ -0,0 +1,94 @@
+"""
+Тесты API-ключей: выпуск, поиск по HMAC и кеш, области, отзыв,
+деактивация владельца и истечение срока
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.crud.user import crud_user
+from app.models.db import ApiKeyDB
+from app.services.api_keys import hash_api_key
+
+
+def _create_key(client, auth_headers, **body):
+    response = client.post("/api/v1/api-keys/", headers=auth_headers, json={"name": "batch", **body})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _count_key_lookups(async_engine):
+    lookups = []
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute",
+        lambda *args: lookups.append(1) if "FROM api_keys" in args[2] else None
+    )
+    return lookups
+
+
+def test_key_is_stored_as_hmac_and_resolved_from_cache(client, db, async_engine, api_key_cache, auth_headers):
+    created = _create_key(client, auth_headers)
+    headers = {"X-API-Key": created["key"]}
+
+    stored = db.query(ApiKeyDB).one()
+    assert stored.key_hash == hash_api_key(created["key"]) and created["key"] not in stored.key_hash
+    assert created["key"].startswith(stored.prefix)
+    assert "key" not in client.get("/api/v1/api-keys/", headers=auth_headers).json()[0]
+
+    lookups = _count_key_lookups(async_engine)
+    for _ in range(3):
+        assert client.get("/api/v1/models/", headers=headers).status_code == 200
+    assert len(lookups) == 1
+    assert len(api_key_cache) == 1
+    assert client.get("/api/v1/auth/me", headers=headers).json()["username"] == "alice"
+
+
+def test_scopes_limit_routes(client, ml_model, auth_headers):
+    read_key = {"X-API-Key": _create_key(client, auth_headers)["key"]}
+    predict_key = {"X-API-Key": _create_key(client, auth_headers, scopes=["read", "predict"])["key"]}
+
+    assert client.get("/api/v1/balance/", headers=read_key).status_code == 200
+    assert client.post("/api/v1/balance/deposit", headers=read_key, json={"amount": 1.0}).status_code == 403
+    assert client.post("/api/v1/predict/", headers=read_key, json={}).status_code == 403
+    assert client.post("/api/v1/predict/", headers=predict_key, json={}).status_code == 422
+    assert client.get("/api/v1/metrics/", headers=predict_key).status_code == 403
+    # JWT пользователя областями не ограничен
+    assert client.post("/api/v1/balance/deposit", headers=auth_headers, json={"amount": 1.0}).status_code == 200
+
+
+def test_api_key_cannot_manage_keys(client, auth_headers):
+    headers = {"X-API-Key": _create_key(client, auth_headers)["key"]}
+
+    assert client.post("/api/v1/api-keys/", headers=headers, json={"name": "more"}).status_code == 403
+
+
+def test_revoked_key_is_rejected(client, auth_headers):
+    created = _create_key(client, auth_headers)
+    headers = {"X-API-Key": created["key"]}
+    assert client.get("/api/v1/models/", headers=headers).status_code == 200
+
+    assert client.delete(f"/api/v1/api-keys/{created['id']}", headers=auth_headers).status_code == 204
+
+    assert client.get("/api/v1/models/", headers=headers).status_code == 401
+    assert client.delete(f"/api/v1/api-keys/{created['id']}", headers=auth_headers).status_code == 404
+
+
+def test_owner_changes_reach_cached_keys(client, db, user, auth_headers):
+    headers = {"X-API-Key": _create_key(client, auth_headers)["key"]}
+    assert client.get("/api/v1/models/", headers=headers).status_code == 200
+
+    crud_user.update(db, db_obj=user, obj_in={"is_active": False})
+
+    assert client.get("/api/v1/models/", headers=headers).status_code == 401
+
+
+def test_expired_unknown_and_missing_credentials(client, db, auth_headers):
+    headers = {"X-API-Key": _create_key(client, auth_headers, expires_in_days=1)["key"]}
+    key = db.query(ApiKeyDB).one()
+    key.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+
+    assert client.get("/api/v1/models/", headers=headers).status_code == 401
+    assert client.get("/api/v1/models/", headers={"X-API-Key": "mlk_unknown"}).status_code == 401
+    assert client.get("/api/v1/models/").status_code == 401
@@ -0,0 +1,53 @@
+"""
+Тесты асинхронного стека: эндпоинты на AsyncSession, bcrypt вне цикла событий
+"""
+
+import asyncio
+
+from app.services import password_hasher as password_hasher_module
+
+
+def test_register_login_and_me(client, monkeypatch):
+    in_event_loop = []
+    original_verify = password_hasher_module._verify
+
+    def recording_verify(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            in_event_loop.append(True)
+        except RuntimeError:
+            in_event_loop.append(False)
+        return original_verify(*args, **kwargs)
+
+    monkeypatch.setattr(password_hasher_module, "_verify", recording_verify)
+
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"username": "bob", "email": "bob@example.com", "password": "secret123"}
+    )
+    assert response.status_code == 200
+    assert client.post(
+        "/api/v1/auth/register",
+        json={"username": "bob", "email": "other@example.com", "password": "secret123"}
+    ).status_code == 400
+
+    response = client.post("/api/v1/auth/login", data={"username": "bob", "password": "secret123"})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert client.post("/api/v1/auth/login", data={"username": "bob", "password": "wrong"}).status_code == 401
+
+    response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "bob"
+    # Проверка пароля выполняется в пуле, а не в потоке цикла событий
+    assert in_event_loop and not any(in_event_loop)
+
+
+def test_models_and_balance(client, ml_model, auth_headers):
+    response = client.get("/api/v1/models/", headers=auth_headers)
+    assert response.status_code == 200
+    assert [model["name"] for model in response.json()] == ["Test model"]
+
+    assert client.get(f"/api/v1/models/{ml_model.id}", headers=auth_headers).json()["name"] == "Test model"
+    assert client.get("/api/v1/models/missing", headers=auth_headers).status_code == 404
+    assert client.get("/api/v1/balance/", headers=auth_headers).json()["balance"] == 100.0
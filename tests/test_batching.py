@@ -0,0 +1,116 @@
+"""
+Тесты микробатчера инференса
+"""
+
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.models.db import MLModelDB
+from app.services.batching import MicroBatcher, close_batchers, get_batcher
+from app.services.prediction_processor import predict_batch, run_inference
+
+
+def _model(model_id: str) -> MLModelDB:
+    return MLModelDB(id=model_id, name=model_id, cost_per_prediction=1.0)
+
+
+def _echo_infer(calls):
+    def infer(model, requests):
+        calls.append((model.id, sum(map(len, requests))))
+        return [[row["x"] * 10 for row in rows] for rows in requests]
+    return infer
+
+
+def test_concurrent_requests_share_one_call():
+    """Параллельные запросы к одной модели объединяются в один вызов"""
+    calls = []
+    batcher = MicroBatcher(_echo_infer(calls), max_batch_size=100, max_wait_ms=200)
+    model = _model("m1")
+    results = {}
+    start = threading.Barrier(3)
+
+    def client(n):
+        start.wait()
+        results[n] = batcher.predict(model, [{"x": n}, {"x": n + 1}])
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in (1, 10, 100)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert calls == [("m1", 6)]
+    assert results == {1: [10, 20], 10: [100, 110], 100: [1000, 1010]}
+    assert batcher.stats() == {"requests": 3, "rows": 6, "batches": 1}
+
+
+def test_batch_flushes_at_max_size_and_per_model():
+    """Батч отправляется при достижении max_batch_size, модели не смешиваются"""
+    calls = []
+    batcher = MicroBatcher(_echo_infer(calls), max_batch_size=2, max_wait_ms=10_000)
+
+    first = batcher.submit(_model("a"), [{"x": 1}, {"x": 2}])
+    other = batcher.submit(_model("b"), [{"x": 3}, {"x": 4}])
+
+    assert first.result(timeout=5) == [10, 20]
+    assert other.result(timeout=5) == [30, 40]
+    batcher.close()
+    assert sorted(calls) == [("a", 2), ("b", 2)]
+
+
+def test_inference_error_is_propagated():
+    """Ошибка инференса доходит до всех запросов батча"""
+    def broken(model, requests):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(broken, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.predict(_model("m"), [{"x": 1}])
+    batcher.close()
+
+
+def test_run_inference_does_not_depend_on_batching(monkeypatch):
+    """Через батчер каждый запрос получает те же результаты, что и без него"""
+    monkeypatch.setattr(settings, "BATCHING_ENABLED", True)
+    monkeypatch.setattr(settings, "BATCH_MAX_WAIT_MS", 200)
+    model = _model("m")
+    sizes = (1, 2, 3)
+    results = {}
+    start = threading.Barrier(len(sizes))
+
+    def client(n):
+        start.wait()
+        results[n] = run_inference(model, [{"x": i} for i in range(n)])
+
+    try:
+        threads = [threading.Thread(target=client, args=(n,)) for n in sizes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = get_batcher(predict_batch).stats()
+    finally:
+        close_batchers()
+
+    assert stats["requests"] == 3
+    assert stats["batches"] < 3
+    monkeypatch.setattr(settings, "BATCHING_ENABLED", False)
+    for n in sizes:
+        assert results[n] == run_inference(model, [{"x": i} for i in range(n)])
+        assert results[n] == list(range(n))
+
+
+def test_batcher_is_created_per_inference_fn():
+    """get_batcher не подменяет функцию инференса, переданную позже"""
+    def other(model, requests):
+        return [["other"] * len(rows) for rows in requests]
+
+    try:
+        assert get_batcher(predict_batch) is get_batcher(predict_batch)
+        assert get_batcher(other) is not get_batcher(predict_batch)
+        assert get_batcher(other).predict(_model("m"), [{"x": 1}]) == ["other"]
+    finally:
+        close_batchers()
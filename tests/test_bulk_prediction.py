@@ -0,0 +1,91 @@
+"""
+Тесты потокового NDJSON эндпоинта
+"""
+
+import json
+
+from app.core.config import settings
+from app.models.db import PredictionTaskDB, UserDB
+
+
+def _ndjson(rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+def test_bulk_streams_one_line_per_chunk(client, db, user, ml_model, auth_headers, monkeypatch):
+    """Каждая порция оплачивается и возвращается отдельной строкой"""
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 2)
+    body = _ndjson([
+        {"feature1": 1, "feature2": 2},
+        {"feature1": 3, "feature2": 4},
+        {"feature1": 5},
+    ]) + b"\nnot json\n"
+
+    response = client.post(
+        f"/api/v1/predict/bulk?model_id={ml_model.id}",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        content=body
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["chunk"] for line in lines] == [0, 1]
+    assert lines[0]["status"] == "COMPLETED"
+    assert lines[0]["result"] == [3, 7]
+    assert lines[0]["cost"] == 2.0
+    assert lines[1]["status"] == "VALIDATION_ERROR"
+    assert lines[1]["invalid_data_count"] == 2
+
+    assert db.query(PredictionTaskDB).count() == 2
+    db.expire_all()
+    assert db.get(UserDB, user.id).balance == 98.0
+
+
+def test_bulk_stops_when_balance_runs_out(client, db, user, ml_model, auth_headers, monkeypatch):
+    """Порции после нехватки средств не обрабатываются и не оплачиваются"""
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 60)
+    body = _ndjson([{"feature1": i, "feature2": i} for i in range(180)])
+
+    response = client.post(
+        f"/api/v1/predict/bulk?model_id={ml_model.id}",
+        headers=auth_headers,
+        content=body
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["status"] for line in lines] == ["COMPLETED", "REJECTED"]
+    assert "Insufficient balance" in lines[1]["error_message"]
+    db.expire_all()
+    assert db.get(UserDB, user.id).balance == 40.0
+
+
+def test_bulk_rejects_too_long_line(client, ml_model, auth_headers, monkeypatch):
+    """Строка длиннее BULK_MAX_LINE_BYTES не накапливается в памяти"""
+    monkeypatch.setattr(settings, "BULK_MAX_LINE_BYTES", 64)
+
+    response = client.post(
+        f"/api/v1/predict/bulk?model_id={ml_model.id}",
+        headers=auth_headers,
+        content=b'{"feature1": "' + b"x" * 1000
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"chunk": 0, "status": "REJECTED", "error_message": "NDJSON line exceeds 64 bytes"}]
+
+
+def test_bulk_reports_unexpected_chunk_error(client, ml_model, auth_headers, monkeypatch):
+    """Любая ошибка порции завершает поток строкой с ошибкой"""
+    async def broken(*args, **kwargs):
+        raise RuntimeError("db is down")
+
+    monkeypatch.setattr("app.api.v1.endpoints.predict.execute_prediction_async", broken)
+
+    response = client.post(
+        f"/api/v1/predict/bulk?model_id={ml_model.id}",
+        headers=auth_headers,
+        content=_ndjson([{"feature1": 1, "feature2": 2}])
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["status"] == "REJECTED"
+    assert "db is down" in lines[-1]["error_message"]
@@ -0,0 +1,36 @@
+"""
+Тесты типов колонок: UUID/JSONB/NUMERIC в PostgreSQL, прежние значения в Python
+"""
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.crud.prediction import crud_prediction
+from app.models.db import PredictionTaskDB, TransactionDB, UserDB
+from app.models.db.types import is_guid
+
+
+def test_postgresql_ddl_uses_native_types():
+    ddl = str(CreateTable(PredictionTaskDB.__table__).compile(dialect=postgresql.dialect()))
+
+    for column in ("id UUID", "user_id UUID", "model_id UUID", "input_data JSONB", "total_cost NUMERIC(10, 2)"):
+        assert column in ddl
+    assert "amount NUMERIC(10, 2)" in str(CreateTable(TransactionDB.__table__).compile(dialect=postgresql.dialect()))
+    assert "balance NUMERIC(10, 2)" in str(CreateTable(UserDB.__table__).compile(dialect=postgresql.dialect()))
+
+
+def test_values_keep_python_types(db, user):
+    db.expire_all()
+    user = db.get(UserDB, user.id)
+
+    assert isinstance(user.id, str) and is_guid(user.id)
+    assert isinstance(user.balance, float)
+
+
+def test_non_uuid_ids_are_not_found(client, db, auth_headers):
+    assert crud_prediction.get_with_model_name(db, id="1; DROP TABLE users") is None
+    assert client.get("/api/v1/predict/not-a-uuid", headers=auth_headers).status_code == 404
+    response = client.post(
+        "/api/v1/predict/", headers=auth_headers, json={"model_id": "m1", "data": [{"feature1": 1, "feature2": 2}]}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,59 @@
+"""
+Тесты пакетных операций CRUDBase
+"""
+
+from sqlalchemy import event
+
+from app.crud.ml_model import crud_ml_model
+from app.crud.transaction import TransactionCreate, crud_transaction
+from app.models.db import MLModelDB, TransactionDB
+from app.models.enums import ModelType, TransactionType
+
+
+def _record_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_create_many_uses_one_insert_returning(engine, db, user):
+    user_id = user.id
+    statements = _record_statements(engine)
+
+    created = crud_transaction.create_many(db, objs_in=[
+        TransactionCreate(user_id=user_id, transaction_type=TransactionType.DEPOSIT, amount=float(i))
+        for i in range(5)
+    ])
+
+    assert statements[0].startswith("INSERT") and "RETURNING" in statements[0]
+    assert [t.amount for t in created] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert all(t.id and t.created_at for t in created)
+    assert len(statements) == 1, "атрибуты доступны без повторного SELECT"
+
+
+def test_update_many_by_primary_key(db, user):
+    created = crud_transaction.create_many(db, objs_in=[
+        {"user_id": user.id, "transaction_type": TransactionType.DEPOSIT, "amount": 1.0},
+        {"user_id": user.id, "transaction_type": TransactionType.DEPOSIT, "amount": 2.0},
+    ])
+
+    crud_transaction.update_many(db, objs_in=[
+        {"id": created[0].id, "description": "first"},
+        {"id": created[1].id, "description": "second"},
+    ])
+
+    db.expire_all()
+    descriptions = {t.id: t.description for t in db.query(TransactionDB)}
+    assert descriptions == {created[0].id: "first", created[1].id: "second"}
+
+
+def test_upsert_many_inserts_and_updates(db, ml_model):
+    upserted = crud_ml_model.upsert_many(db, objs_in=[
+        {"id": ml_model.id, "name": "Renamed", "model_type": ModelType.CLASSIFICATION, "cost_per_prediction": 2.0},
+        {"id": "new-model", "name": "New", "model_type": ModelType.REGRESSION, "cost_per_prediction": 3.0},
+    ])
+
+    assert {m.id: m.name for m in upserted} == {ml_model.id: "Renamed", "new-model": "New"}
+    db.expire_all()
+    assert db.get(MLModelDB, ml_model.id).cost_per_prediction == 2.0
+    assert db.query(MLModelDB).count() == 2
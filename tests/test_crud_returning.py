@@ -0,0 +1,48 @@
+"""
+Тесты пути записи через RETURNING: без SELECT после commit
+"""
+
+from sqlalchemy import event
+
+from app.crud.prediction import PredictionTaskCreate, crud_prediction
+from app.models.enums import TaskStatus
+from app.models.prediction import ColumnarDataValidator
+
+validator = ColumnarDataValidator(required_fields=["feature1", "feature2"])
+
+
+def _record_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2].split()[0]))
+    return statements
+
+
+def test_deposit_endpoint_reads_server_values_from_returning(async_engine, client, auth_headers):
+    statements = _record_statements(async_engine.sync_engine)
+
+    response = client.post("/api/v1/balance/deposit", headers=auth_headers, json={"amount": 25.0})
+
+    assert response.status_code == 200
+    assert response.json()["new_balance"] == 125.0
+    assert response.json()["created_at"] is not None
+    # SELECT пользователя при авторизации, затем только UPDATE и INSERT с RETURNING
+    assert statements == ["SELECT", "UPDATE", "INSERT"]
+
+
+def test_task_status_helpers_do_not_refresh(engine, db, user, ml_model):
+    rows = [{"feature1": 1, "feature2": 2}]
+    task = crud_prediction.create_with_validation(
+        db,
+        obj_in=PredictionTaskCreate(user_id=user.id, model_id=ml_model.id, input_data=rows),
+        validation=validator.validate_columns(rows)
+    )
+    created_at = task.created_at
+    statements = _record_statements(engine)
+
+    task = crud_prediction.start_processing(db, db_obj=task)
+    task = crud_prediction.fail(db, db_obj=task, error_message="boom")
+
+    assert statements == ["UPDATE", "UPDATE"]
+    assert task.status == TaskStatus.FAILED
+    assert task.created_at == created_at
+    assert task.updated_at is not None
@@ -0,0 +1,57 @@
+"""
+Тесты запросов горячих путей, построенных один раз: кеш компиляции и параметры
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+
+from app.crud.ml_model import crud_ml_model
+from app.crud.prediction import crud_prediction
+from app.crud.user import crud_user
+from app.models.db import PredictionTaskDB
+from app.models.db.types import new_id
+
+
+def _record_cache_hits(engine):
+    hits = []
+
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        hits.append(context.cache_hit == CacheStats.CACHE_HIT)
+
+    event.listen(engine, "after_cursor_execute", after_execute)
+    return hits
+
+
+def test_hot_lookups_reuse_compiled_statements(engine, db, user, ml_model):
+    crud_user.get_by_username(db, username=user.username)
+    crud_ml_model.get(db, id=ml_model.id)
+    hits = _record_cache_hits(engine)
+
+    assert crud_user.get_by_username(db, username=user.username).id == user.id
+    assert crud_user.get_by_username(db, username="nobody") is None
+    assert crud_ml_model.get(db, id=ml_model.id).name == ml_model.name
+    assert crud_ml_model.get(db, id=new_id()) is None
+
+    # Другие значения - те же скомпилированные запросы
+    assert hits == [True, True, True, True]
+
+
+def test_user_tasks_pages_by_offset_and_cursor(db, user, ml_model):
+    start = datetime(2024, 1, 1)
+    db.add_all([
+        PredictionTaskDB(
+            id=f"p{i}", user_id=user.id, model_id=ml_model.id, input_data=[], created_at=start + timedelta(minutes=i)
+        )
+        for i in range(5)
+    ])
+    db.commit()
+
+    first = crud_prediction.get_by_user(db, user.id, skip=1, limit=2)
+    after = crud_prediction.get_by_user(db, user.id, limit=10, cursor=(first[-1].created_at, first[-1].id))
+    history = crud_prediction.get_history_by_user(db, user.id, limit=1)
+
+    assert [task.id for task in first] == ["p3", "p2"]
+    assert [task.id for task in after] == ["p1", "p0"]
+    assert (history[0].id, history[0].model_name) == ("p4", ml_model.name)
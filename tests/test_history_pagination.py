@@ -0,0 +1,72 @@
+"""
+Тесты курсорной пагинации истории
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.crud.pagination import encode_cursor
+from app.models.db import TransactionDB
+from app.models.enums import TransactionType
+
+
+def _id(i):
+    return f"00000000-0000-0000-0000-{i:012d}"
+
+
+def _add_transactions(db, user, count):
+    start = datetime(2024, 1, 1)
+    # Пары с одинаковым created_at проверяют упорядочивание по id
+    db.add_all([
+        TransactionDB(
+            id=_id(i),
+            user_id=user.id,
+            transaction_type=TransactionType.DEPOSIT,
+            amount=float(i),
+            created_at=start + timedelta(minutes=i // 2)
+        )
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def test_cursor_walks_all_pages(replica_engine, client, db, user, auth_headers):
+    _add_transactions(db, user, 7)
+    statements = []
+    event.listen(replica_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/history/transactions", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [_id(i) for i in reversed(range(7))]
+    # Страницы после первой ищутся по (created_at, id) из курсора
+    assert sum("(transactions.created_at, transactions.id) <" in s for s in statements) == 2
+
+
+def test_offset_mode_is_kept(client, db, user, auth_headers):
+    _add_transactions(db, user, 4)
+
+    response = client.get("/api/v1/history/transactions", headers=auth_headers, params={"skip": 1, "limit": 2})
+
+    assert [item["id"] for item in response.json()] == [_id(2), _id(1)]
+
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    response = client.get("/api/v1/history/predictions", headers=auth_headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+    # id из курсора сравнивается с колонкой UUID - не UUID отклоняется до запроса
+    cursor = encode_cursor(datetime(2024, 1, 1), "t001")
+    response = client.get("/api/v1/history/predictions", headers=auth_headers, params={"cursor": cursor})
+    assert response.status_code == 400
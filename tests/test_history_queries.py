@@ -0,0 +1,62 @@
+"""
+Регрессионные тесты числа запросов истории и карточки задачи (без N+1)
+"""
+
+from sqlalchemy import event
+
+from app.models.db import MLModelDB, PredictionTaskDB
+from app.models.enums import ModelType, TaskStatus
+
+
+def _add_tasks(db, user, models, count):
+    tasks = [
+        PredictionTaskDB(
+            user_id=user.id,
+            model_id=models[i % len(models)].id,
+            input_data=[{"feature1": i, "feature2": i}],
+            valid_count=1,
+            status=TaskStatus.COMPLETED
+        )
+        for i in range(count)
+    ]
+    db.add_all(tasks)
+    db.commit()
+    return tasks
+
+
+def _selects(*engines):
+    statements = []
+    for engine in engines:
+        event.listen(
+            engine, "before_cursor_execute",
+            lambda *args: statements.append(args[2]) if args[2].lstrip().startswith("SELECT") else None
+        )
+    return statements
+
+
+def test_history_page_uses_one_query(async_engine, replica_engine, client, db, user, ml_model, auth_headers):
+    other = MLModelDB(name="Other", model_type=ModelType.REGRESSION, cost_per_prediction=2.0)
+    db.add(other)
+    db.commit()
+    _add_tasks(db, user, [ml_model, other], 20)
+    statements = _selects(async_engine.sync_engine, replica_engine.sync_engine)
+
+    response = client.get("/api/v1/history/predictions", headers=auth_headers, params={"limit": 20})
+
+    assert response.status_code == 200
+    assert {item["model_name"] for item in response.json()} == {"Test model", "Other"}
+    # SELECT пользователя при авторизации + одна выборка страницы
+    assert len(statements) == 2
+    assert "input_data" not in statements[1]
+
+
+def test_prediction_detail_uses_one_query(async_engine, replica_engine, client, db, user, ml_model, auth_headers):
+    task = _add_tasks(db, user, [ml_model], 1)[0]
+    statements = _selects(async_engine.sync_engine, replica_engine.sync_engine)
+
+    response = client.get(f"/api/v1/predict/{task.id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["model_name"] == "Test model"
+    # Владелец проверяется по claims токена - пользователь не читается
+    assert len(statements) == 1
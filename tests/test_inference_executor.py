@@ -0,0 +1,51 @@
+"""
+Тесты пула процессов для инференса
+"""
+
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.models.db import MLModelDB
+from app.services import inference_executor as executor_module
+from app.services.inference_executor import InferenceExecutor, InferenceQueueFullError, encode_rows
+from app.services.prediction_processor import predict_batch
+
+
+def _model(model_id="m"):
+    return MLModelDB(id=model_id, name=model_id, cost_per_prediction=1.0)
+
+
+def test_encode_rows_builds_numeric_matrix():
+    matrix, columns = encode_rows([{"b": 2, "a": 1.5}, {"a": "x", "c": True}, {"b": 10 ** 400}])
+
+    assert columns == ["a", "b"]
+    assert np.array_equal(matrix, np.array([[1.5, 2.0], [np.nan, np.nan], [np.nan, np.nan]]), equal_nan=True)
+
+
+def test_process_pool_matches_in_process_inference(monkeypatch):
+    """Результат из пула процессов совпадает с инференсом в процессе API"""
+    executor = InferenceExecutor(default_workers=1)
+    monkeypatch.setattr(executor_module, "_executor", executor)
+    requests = [[{"feature1": 1, "feature2": 2}], [{"feature1": 0.5, "feature2": -3, "note": "x"}]]
+
+    expected = predict_batch(_model(), requests)
+    monkeypatch.setattr(settings, "INFERENCE_EXECUTOR_ENABLED", True)
+    try:
+        assert predict_batch(_model(), requests) == expected
+    finally:
+        executor.shutdown()
+
+
+def test_full_queue_fails_fast():
+    """Сверх max_pending задачи не ставятся в очередь"""
+    executor = InferenceExecutor(default_workers=1, max_pending=1, queue_timeout=0.01)
+    _, slots = executor._get_pool("m")
+    slots.acquire()
+    try:
+        with pytest.raises(InferenceQueueFullError):
+            executor.predict(_model(), [{"feature1": 1}])
+    finally:
+        slots.release()
+        executor.shutdown()
@@ -0,0 +1,80 @@
+"""
+Тесты журнала транзакций: снимки баланса, прирост после снимка, сверка
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.crud.transaction import crud_transaction
+from app.models.db import BalanceSnapshotDB, TransactionDB
+from app.models.enums import TransactionType
+from app.services.ledger import get_ledger_balance, snapshot_all, take_snapshot
+
+
+def _add(db, user, transaction_type, amount, created_at):
+    db.add(TransactionDB(user_id=user.id, transaction_type=transaction_type, amount=amount, created_at=created_at))
+    db.commit()
+
+
+def test_user_balance_by_all_transactions(db, user):
+    start = datetime(2024, 1, 1)
+    _add(db, user, TransactionType.DEPOSIT, 100.0, start)
+    _add(db, user, TransactionType.WITHDRAWAL, 30.0, start + timedelta(minutes=1))
+    _add(db, user, TransactionType.REFUND, 5.0, start + timedelta(minutes=2))
+
+    assert crud_transaction.get_user_balance(db, user.id) == 75.0
+
+
+def test_balance_is_snapshot_plus_delta(engine, db, user):
+    start = datetime(2024, 1, 1)
+    _add(db, user, TransactionType.DEPOSIT, 100.0, start)
+    _add(db, user, TransactionType.WITHDRAWAL, 30.0, start + timedelta(minutes=1))
+
+    snapshot = take_snapshot(db, user.id, until=start + timedelta(hours=1))
+    assert (snapshot.balance, snapshot.transaction_count) == (70.0, 2)
+    # Новых транзакций нет - новый снимок не пишется
+    assert take_snapshot(db, user.id, until=start + timedelta(hours=1)) is None
+
+    _add(db, user, TransactionType.WITHDRAWAL, 20.0, start + timedelta(hours=2))
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    balance = get_ledger_balance(db, user.id)
+
+    assert balance.ledger_balance == 50.0
+    assert balance.transactions_since_snapshot == 1
+    # Прирост читается только после водяного знака снимка
+    assert any("(transactions.created_at, transactions.id) >" in sql for sql in statements)
+
+    snapshot = take_snapshot(db, user.id, until=start + timedelta(hours=3))
+    assert (snapshot.balance, snapshot.transaction_count) == (50.0, 3)
+
+
+def test_snapshot_job_skips_recent_transactions_and_reports_discrepancy(db, user, monkeypatch):
+    monkeypatch.setattr(settings, "LEDGER_SNAPSHOT_LAG_SECONDS", 60)
+    _add(db, user, TransactionType.DEPOSIT, 100.0, datetime.utcnow() - timedelta(hours=1))
+    _add(db, user, TransactionType.DEPOSIT, 5.0, datetime.utcnow())
+
+    stats = snapshot_all(db, batch_size=1)
+
+    assert stats == {"users": 1, "snapshots": 1, "discrepancies": 1}
+    assert db.query(BalanceSnapshotDB).one().balance == 100.0
+    balance = get_ledger_balance(db, user.id)
+    assert balance.ledger_balance == 105.0
+    # У пользователя из фикстуры баланс 100 без транзакций пополнения
+    assert balance.discrepancy == -5.0
+    assert not balance.is_consistent
+
+
+def test_audit_endpoint(client, auth_headers):
+    client.post("/api/v1/balance/deposit", headers=auth_headers, json={"amount": 25.0})
+
+    response = client.get("/api/v1/balance/audit", headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["balance"], body["ledger_balance"], body["discrepancy"]) == (125.0, 25.0, 100.0)
+    assert body["transactions_since_snapshot"] == 1
+    assert body["snapshot_at"] is None
@@ -0,0 +1,85 @@
+"""
+Тесты реестра загруженных моделей
+"""
+
+import pickle
+from datetime import datetime
+
+from app.models.db import MLModelDB
+from app.services import model_registry as registry_module
+from app.services.model_registry import ModelRegistry
+from app.services.prediction_processor import predict_batch
+
+
+class ScaleModel:
+    """Артефакт для тестов: умножает feature1 на коэффициент"""
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def predict(self, rows):
+        return [row["feature1"] * self.factor for row in rows]
+
+
+def _model(model_id, updated_at=datetime(2024, 1, 1)):
+    return MLModelDB(id=model_id, name=model_id, cost_per_prediction=1.0, updated_at=updated_at)
+
+
+def _save(tmp_path, model_id, artifact, size=0):
+    path = tmp_path / f"{model_id}.pkl"
+    path.write_bytes(pickle.dumps(artifact) + b"\0" * size)
+
+
+def _counting_loader(loads):
+    def load(path):
+        loads.append(path)
+        return registry_module.load_pickle(path)
+    return load
+
+
+def test_model_is_loaded_once_and_kept_warm(tmp_path):
+    _save(tmp_path, "m1", ScaleModel(2))
+    loads = []
+    registry = ModelRegistry(str(tmp_path), memory_budget_bytes=10_000, loader=_counting_loader(loads))
+
+    assert registry.get(_model("m1")).factor == 2
+    assert registry.get(_model("m1")).factor == 2
+    assert len(loads) == 1
+    assert registry.get(_model("missing")) is None
+    stats = registry.stats()
+    assert (stats["loads"], stats["hits"], stats["loaded_models"]) == (1, 1, ["m1"])
+
+
+def test_least_recently_used_model_is_evicted(tmp_path):
+    for model_id in ("a", "b", "c"):
+        _save(tmp_path, model_id, ScaleModel(1), size=400)
+    registry = ModelRegistry(str(tmp_path), memory_budget_bytes=1_000)
+
+    registry.get(_model("a"))
+    registry.get(_model("b"))
+    registry.get(_model("a"))
+    registry.get(_model("c"))
+
+    stats = registry.stats()
+    assert stats["loaded_models"] == ["a", "c"]
+    assert stats["evictions"] == 1
+    assert stats["loaded_bytes"] <= 1_000
+
+
+def test_updated_model_is_reloaded(tmp_path):
+    _save(tmp_path, "m", ScaleModel(2))
+    registry = ModelRegistry(str(tmp_path), memory_budget_bytes=10_000)
+    assert registry.get(_model("m")).factor == 2
+
+    _save(tmp_path, "m", ScaleModel(3))
+    assert registry.get(_model("m")).factor == 2
+    assert registry.get(_model("m", updated_at=datetime(2024, 2, 1))).factor == 3
+
+
+def test_predict_batch_uses_loaded_artifact(tmp_path, monkeypatch):
+    _save(tmp_path, "m", ScaleModel(10))
+    monkeypatch.setattr(registry_module, "_registry", ModelRegistry(str(tmp_path), memory_budget_bytes=10_000))
+
+    requests = [[{"feature1": 1}], [{"feature1": 2}, {"feature1": 3}]]
+    assert predict_batch(_model("m"), requests) == [[10], [20, 30]]
+    assert predict_batch(_model("stub"), [[{"feature1": 1, "feature2": 2}]]) == [[3]]
@@ -0,0 +1,96 @@
+"""
+Тесты хеширования паролей: пул процессов, ограничение очереди, метрики,
+пересчет хеша при входе после смены стоимости bcrypt, демо-данные init_db
+"""
+
+import asyncio
+from concurrent.futures import Executor, Future
+
+import pytest
+
+from app.crud.user import UserCreate, crud_user
+from app.database.init_db import init_demo_data
+from app.models.db import UserDB
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusyError
+
+
+class StuckExecutor(Executor):
+    """Пул, задачи которого не завершаются (очередь хеширования занята)"""
+
+    def submit(self, fn, *args, **kwargs):
+        return Future()
+
+
+def test_process_pool_hashes_and_verifies():
+    hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+    try:
+        password_hash = asyncio.run(hasher.hash("secret123"))
+
+        assert password_hash.startswith("$2b$04$")
+        assert asyncio.run(hasher.verify("secret123", password_hash)) == (True, None)
+        assert asyncio.run(hasher.verify("wrong", password_hash)) == (False, None)
+    finally:
+        hasher.shutdown()
+
+    metrics = hasher.metrics()
+    assert metrics["completed"] == 3
+    assert metrics["pending"] == 0
+    assert metrics["queue_ms_max"] >= metrics["queue_ms_avg"] >= 0
+
+
+def test_full_queue_rejects_without_waiting():
+    hasher = PasswordHasher(max_pending=1, rounds=4, executor=StuckExecutor())
+    hasher._submit(lambda *args: None)
+
+    with pytest.raises(PasswordHasherBusyError):
+        hasher.hash_sync("secret123")
+
+    assert hasher.metrics()["rejected"] == 1
+
+
+def test_login_returns_503_when_hasher_is_busy(client, db, monkeypatch):
+    crud_user.create(db, obj_in=UserCreate(username="bob", email="bob@example.com", password="secret123"))
+    monkeypatch.setattr(
+        "app.services.password_hasher._hasher",
+        PasswordHasher(max_pending=0, rounds=4, executor=StuckExecutor())
+    )
+
+    response = client.post("/api/v1/auth/login", data={"username": "bob", "password": "secret123"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_password_after_cost_change(client, db, password_hasher):
+    user = crud_user.create(db, obj_in=UserCreate(username="bob", email="bob@example.com", password="secret123"))
+    old_hash = user.password_hash
+
+    password_hasher.rounds = 5
+    assert client.post("/api/v1/auth/login", data={"username": "bob", "password": "secret123"}).status_code == 200
+
+    db.expire_all()
+    new_hash = db.get(UserDB, user.id).password_hash
+    assert old_hash.startswith("$2b$04$") and new_hash.startswith("$2b$05$")
+    assert password_hasher.metrics()["rehashed"] == 1
+    # Новый хеш принимается, повторного пересчета нет
+    assert client.post("/api/v1/auth/login", data={"username": "bob", "password": "secret123"}).status_code == 200
+    assert password_hasher.metrics()["rehashed"] == 1
+
+
+def test_sync_authenticate_rehashes(db, password_hasher):
+    crud_user.create(db, obj_in=UserCreate(username="bob", email="bob@example.com", password="secret123"))
+    password_hasher.rounds = 5
+
+    user = crud_user.authenticate(db, "bob", "secret123")
+
+    db.refresh(user)
+    assert user.password_hash.startswith("$2b$05$")
+    assert crud_user.authenticate(db, "bob", "wrong") is None
+
+
+def test_init_demo_data_hashes_through_hasher(db, password_hasher):
+    init_demo_data(db)
+
+    assert crud_user.authenticate(db, "demo_user", "demo123") is not None
+    assert crud_user.authenticate(db, "admin", "admin123") is not None
+    assert password_hasher.metrics()["completed"] == 4
@@ -0,0 +1,124 @@
+"""
+Тесты атомарного синхронного предсказания
+"""
+
+from sqlalchemy import event
+
+from app.crud.user import crud_user
+from app.models.db import PredictionTaskDB, TransactionDB, UserDB
+from app.models.enums import TaskStatus, TransactionType, ValidationErrorCode
+from app.models.prediction import ColumnarDataValidator
+from app.services.prediction_processor import InsufficientBalanceError, execute_prediction
+
+ROWS = [{"feature1": 1, "feature2": 2}, {"feature1": 3, "feature2": 4}]
+validator = ColumnarDataValidator(required_fields=["feature1", "feature2"])
+
+
+def test_predict_writes_everything_in_one_commit(engine, db, user, ml_model):
+    """Задача, списание и транзакция фиксируются одним commit"""
+    user_id, _ = user.id, ml_model.name  # загрузка фикстур вне подсчета
+    statements = []
+    commits = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    event.listen(engine, "commit", lambda conn: commits.append(conn))
+
+    task = execute_prediction(
+        db, user_id=user_id, model=ml_model, input_data=ROWS, validation=validator.validate_columns(ROWS)
+    )
+
+    assert len(commits) == 1
+    assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT", "INSERT"]
+    assert "RETURNING" in statements[0]
+
+    db.expire_all()
+    assert task.status == TaskStatus.COMPLETED
+    assert task.total_cost == 2.0
+    assert db.get(UserDB, user.id).balance == 98.0
+    withdrawal = db.query(TransactionDB).one()
+    assert withdrawal.transaction_type == TransactionType.WITHDRAWAL
+    assert withdrawal.task_id == task.id
+
+
+def test_insufficient_balance_writes_nothing(db, user, ml_model):
+    """При нехватке средств не создаются ни задача, ни транзакция"""
+    rows = ROWS * 60
+
+    try:
+        execute_prediction(
+            db, user_id=user.id, model=ml_model, input_data=rows, validation=validator.validate_columns(rows)
+        )
+        assert False, "ожидалась InsufficientBalanceError"
+    except InsufficientBalanceError as e:
+        assert e.required == 120.0
+        assert e.available == 100.0
+
+    assert db.query(PredictionTaskDB).count() == 0
+    assert db.query(TransactionDB).count() == 0
+    assert db.get(UserDB, user.id).balance == 100.0
+
+
+def test_conditional_debit_never_goes_negative(db, user):
+    """Условный UPDATE не списывает больше, чем есть на балансе"""
+    assert crud_user.debit_balance(db, user.id, 60.0) == 40.0
+    assert crud_user.debit_balance(db, user.id, 60.0) is None
+    db.commit()
+    assert db.get(UserDB, user.id).balance == 40.0
+
+
+def test_endpoint_maps_insufficient_balance_to_400(client, auth_headers, ml_model):
+    response = client.post(
+        "/api/v1/predict/",
+        headers=auth_headers,
+        json={"model_id": ml_model.id, "data": ROWS * 60}
+    )
+    assert response.status_code == 400
+    assert "Insufficient balance" in response.json()["detail"]
+
+
+def test_endpoint_completes_prediction(client, auth_headers, ml_model):
+    response = client.post(
+        "/api/v1/predict/",
+        headers=auth_headers,
+        json={"model_id": ml_model.id, "data": ROWS + [{"feature1": 5}]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == TaskStatus.COMPLETED.value
+    assert data["result"] == [3, 7]
+    assert data["valid_data_count"] == 2
+    assert data["invalid_data_count"] == 1
+    assert data["cost"] == 2.0
+
+
+def test_validation_outcome_is_stored_compactly(db, user, ml_model):
+    """Строки хранятся один раз, для невалидных - только индекс и код ошибки"""
+    rows = [{"feature1": 1}, {"feature1": 1, "feature2": 2}, {"feature2": 3}]
+
+    task = execute_prediction(
+        db, user_id=user.id, model=ml_model, input_data=rows, validation=validator.validate_columns(rows)
+    )
+
+    db.expire_all()
+    assert task.valid_count == 1
+    assert task.invalid_count == 2
+    assert task.invalid_rows == [[0, ValidationErrorCode.MISSING_FIELD], [2, ValidationErrorCode.MISSING_FIELD]]
+    assert task.valid_data == [rows[1]]
+    assert task.invalid_data == [rows[0], rows[2]]
+
+
+def test_endpoint_builds_response_without_selects_after_commit(async_engine, client, auth_headers, ml_model):
+    """После commit ответ строится из объектов сессии, без повторного чтения задачи и модели"""
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    event.listen(async_engine.sync_engine, "commit", lambda conn: statements.append("COMMIT"))
+
+    response = client.post(
+        "/api/v1/predict/",
+        headers=auth_headers,
+        json={"model_id": ml_model.id, "data": ROWS}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["created_at"] is not None
+    assert statements.count("COMMIT") == 1
+    assert statements[statements.index("COMMIT") + 1:] == []
@@ -0,0 +1,141 @@
+"""
+Тесты режима очереди: POST /predict/ возвращает PENDING, воркер завершает задачу
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from app.core.config import settings
+from app.crud.prediction import PredictionTaskCreate, crud_prediction
+from app.models.db import PredictionTaskDB, UserDB
+from app.models.enums import TaskStatus
+from app.models.prediction import ColumnarDataValidator
+from app.services.broker import InMemoryBroker, RabbitMQBroker, get_broker
+from app.services.prediction_processor import process_prediction_task, requeue_stale_tasks
+from app.worker import make_handler
+
+validator = ColumnarDataValidator(required_fields=["feature1", "feature2"])
+
+
+def test_queue_mode_defers_processing(app, client, db, session_factory, user, ml_model, auth_headers, monkeypatch):
+    """Задача ставится в очередь и обрабатывается воркером"""
+    monkeypatch.setattr(settings, "PREDICTION_MODE", "queue")
+    broker = InMemoryBroker()
+    app.dependency_overrides[get_broker] = lambda: broker
+
+    response = client.post(
+        "/api/v1/predict/",
+        headers=auth_headers,
+        json={
+            "model_id": ml_model.id,
+            "data": [{"feature1": 1, "feature2": 2}, {"feature1": 3}]
+        }
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == TaskStatus.PENDING.value
+    assert data["result"] is None
+    assert broker.pending() == 1
+
+    # Средства до обработки не списываются
+    db.refresh(user)
+    assert user.balance == 100.0
+
+    broker.consume(make_handler(session_factory))
+    assert broker.pending() == 0
+
+    db.expire_all()
+    task = db.get(PredictionTaskDB, data["task_id"])
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == [3]
+    assert task.total_cost == 1.0
+    assert db.get(UserDB, user.id).balance == 99.0
+
+    # Повторная доставка не списывает средства второй раз
+    broker.publish(task.id)
+    broker.consume(make_handler(session_factory))
+    db.expire_all()
+    assert db.get(UserDB, user.id).balance == 99.0
+
+
+def test_worker_fails_task_on_insufficient_balance(app, client, db, session_factory, user, ml_model, auth_headers, monkeypatch):
+    """Если баланс закончился до обработки - задача переходит в FAILED"""
+    monkeypatch.setattr(settings, "PREDICTION_MODE", "queue")
+    broker = InMemoryBroker()
+    app.dependency_overrides[get_broker] = lambda: broker
+
+    response = client.post(
+        "/api/v1/predict/",
+        headers=auth_headers,
+        json={"model_id": ml_model.id, "data": [{"feature1": 1, "feature2": 2}]}
+    )
+    task_id = response.json()["task_id"]
+
+    user.balance = 0.0
+    db.commit()
+
+    broker.consume(make_handler(session_factory))
+
+    db.expire_all()
+    task = db.get(PredictionTaskDB, task_id)
+    assert task.status == TaskStatus.FAILED
+    assert "Insufficient balance" in task.error_message
+
+
+def test_task_is_claimed_only_once(db, user, ml_model):
+    """Второй захват той же задачи не проходит, и воркер ее пропускает"""
+    task = _pending_task(db, user, ml_model)
+
+    assert crud_prediction.claim_for_processing(db, task_id=task.id) is True
+    assert crud_prediction.claim_for_processing(db, task_id=task.id) is False
+    assert process_prediction_task(db, task.id) is None
+
+    db.expire_all()
+    assert db.get(PredictionTaskDB, task.id).status == TaskStatus.PROCESSING
+    assert db.get(UserDB, user.id).balance == 100.0
+
+
+def test_stale_processing_task_is_requeued(db, session_factory, user, ml_model):
+    """Задача, зависшая в PROCESSING, возвращается в очередь и обрабатывается"""
+    task = _pending_task(db, user, ml_model)
+    crud_prediction.claim_for_processing(db, task_id=task.id)
+    broker = InMemoryBroker()
+
+    # Свежую задачу не трогаем
+    assert requeue_stale_tasks(db, broker.publish) == []
+
+    db.query(PredictionTaskDB).update({"updated_at": datetime.utcnow() - timedelta(hours=1)})
+    db.commit()
+    assert requeue_stale_tasks(db, broker.publish) == [task.id]
+    assert broker.pending() == 1
+
+    broker.consume(make_handler(session_factory))
+    db.expire_all()
+    assert db.get(PredictionTaskDB, task.id).status == TaskStatus.COMPLETED
+    assert db.get(UserDB, user.id).balance == 99.0
+
+
+def test_failed_message_is_not_acked():
+    """Сообщение, обработчик которого упал, отправляется в nack с возвратом в очередь"""
+    broker = RabbitMQBroker("amqp://localhost", "test")
+    broker._connection = MagicMock(is_closed=False)
+    broker._channel = channel = MagicMock()
+
+    def handler(task_id):
+        raise RuntimeError("db is down")
+
+    broker.consume(handler)
+    on_message = channel.basic_consume.call_args.kwargs["on_message_callback"]
+    on_message(channel, MagicMock(delivery_tag=7), None, b"task-1")
+
+    channel.basic_nack.assert_called_once_with(delivery_tag=7, requeue=True)
+    channel.basic_ack.assert_not_called()
+
+
+def _pending_task(db, user, ml_model):
+    rows = [{"feature1": 1, "feature2": 2}]
+    return crud_prediction.create_with_validation(
+        db,
+        obj_in=PredictionTaskCreate(user_id=user.id, model_id=ml_model.id, input_data=rows),
+        validation=validator.validate_columns(rows)
+    )
@@ -0,0 +1,121 @@
+"""
+Тесты кеша авторизованных пользователей: без SELECT на повторный запрос,
+сброс после изменения баланса/роли/активности, рассылка сброса
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.crud.user import crud_user
+from app.models.db import UserDB
+from app.services import principal_cache as principal_cache_module
+from app.services.principal_cache import PrincipalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePublisher:
+    def __init__(self):
+        self.published = []
+
+    def publish_soon(self, user_ids):
+        self.published.append(sorted(user_ids))
+
+
+@pytest.fixture
+def enabled_cache(principal_cache, monkeypatch):
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_ENABLED", True)
+    return principal_cache
+
+
+def _count_user_selects(async_engine):
+    selects = []
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute",
+        lambda *args: selects.append(1) if "FROM users" in args[2] else None
+    )
+    return selects
+
+
+def test_repeated_requests_skip_user_select(enabled_cache, async_engine, client, auth_headers):
+    selects = _count_user_selects(async_engine)
+
+    for _ in range(3):
+        assert client.get("/api/v1/history/transactions", headers=auth_headers).status_code == 200
+
+    assert len(selects) == 1
+    assert len(enabled_cache) == 1
+
+
+def test_balance_change_evicts_user(enabled_cache, client, auth_headers):
+    client.get("/api/v1/auth/me", headers=auth_headers)
+
+    client.post("/api/v1/balance/deposit", headers=auth_headers, json={"amount": 10.0})
+
+    assert len(enabled_cache) == 0
+    assert client.get("/api/v1/auth/me", headers=auth_headers).json()["balance"] == 110.0
+
+
+def test_fresh_balance_bypasses_cache(enabled_cache, async_engine, client, auth_headers):
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    selects = _count_user_selects(async_engine)
+
+    response = client.get("/api/v1/balance/", headers=auth_headers)
+
+    assert response.json()["balance"] == 100.0
+    assert len(selects) == 1
+
+
+def test_deactivation_in_another_session_evicts_user(enabled_cache, client, db, user, auth_headers):
+    assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 200
+
+    crud_user.update(db, db_obj=user, obj_in={"is_active": False})
+
+    # Деактивация отзывает токены пользователя
+    assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 401
+
+
+def test_only_committed_tracked_changes_are_published(db, user, monkeypatch):
+    publisher = FakePublisher()
+    monkeypatch.setattr(principal_cache_module, "_cache", PrincipalCache(publisher=publisher))
+
+    user.email = "other@example.com"
+    db.commit()
+    crud_user.debit_balance(db, user.id, 1.0)
+    db.rollback()
+    assert publisher.published == []
+
+    crud_user.debit_balance(db, user.id, 1.0)
+    db.commit()
+    assert publisher.published == [[user.id]]
+
+
+def test_ttl_lru_and_stale_reads():
+    clock = FakeClock()
+    publisher = FakePublisher()
+    cache = PrincipalCache(max_entries=2, ttl_seconds=10, clock=clock, publisher=publisher)
+    users = [UserDB(id=f"u{i}", username=f"user{i}", balance=1.0) for i in range(3)]
+
+    for user in users:
+        cache.set(user, version=cache.version())
+    assert cache.get("u0") is None
+    assert cache.get("u2").username == "user2"
+    # Каждый запрос получает свой объект
+    assert cache.get("u2") is not cache.get("u2")
+
+    # Чтение из БД до удаления не кешируется после него
+    version = cache.version()
+    cache.invalidate(["u1"])
+    cache.set(users[1], version=version)
+    assert cache.get("u1") is None
+    assert publisher.published == [["u1"]]
+
+    clock.now = 11
+    assert cache.get("u2") is None
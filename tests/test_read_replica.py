@@ -0,0 +1,82 @@
+"""
+Тесты маршрутизации чтений на реплику и закрепления за основной БД после записи
+"""
+
+import asyncio
+
+from sqlalchemy import event
+
+from app.services import read_your_writes
+from app.services.read_your_writes import InMemoryPrimaryPins, RedisPrimaryPins
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAsyncRedis:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    async def set(self, key, value, px=None):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        self.data[key] = px
+
+    async def exists(self, key):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        return int(key in self.data)
+
+
+def _count_selects(engine, counter, name):
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda *args: counter.append(name) if args[2].lstrip().startswith("SELECT") else None
+    )
+
+
+def test_reads_go_to_replica_until_user_writes(async_engine, replica_engine, client, auth_headers, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(read_your_writes, "_pins", InMemoryPrimaryPins(ttl_seconds=5, clock=clock))
+    selects = []
+    _count_selects(async_engine, selects, "primary")
+    _count_selects(replica_engine, selects, "replica")
+
+    client.get("/api/v1/history/transactions", headers=auth_headers)
+    # Пользователь для авторизации - с основной БД, страница истории - с реплики
+    assert selects == ["primary", "replica"]
+
+    client.post("/api/v1/balance/deposit", headers=auth_headers, json={"amount": 10.0})
+    selects.clear()
+    response = client.get("/api/v1/history/transactions", headers=auth_headers)
+    assert len(response.json()) == 1
+    assert selects == ["primary", "primary"]
+
+    clock.now = 6
+    selects.clear()
+    client.get("/api/v1/history/transactions", headers=auth_headers)
+    assert selects == ["primary", "replica"]
+    # /models авторизуется по claims токена: только чтение с реплики
+    selects.clear()
+    client.get("/api/v1/models/", headers=auth_headers)
+    assert selects == ["replica"]
+
+
+def test_redis_pins_are_shared_and_fail_to_primary():
+    client = FakeAsyncRedis()
+    pins = RedisPrimaryPins(client, ttl_seconds=2.5)
+
+    asyncio.run(pins.pin("u1"))
+    assert client.data == {"primary-pin:u1": 2500}
+    assert asyncio.run(pins.is_pinned("u1"))
+    assert not asyncio.run(pins.is_pinned("u2"))
+
+    broken = RedisPrimaryPins(FakeAsyncRedis(fail=True))
+    asyncio.run(broken.pin("u1"))
+    assert asyncio.run(broken.is_pinned("u1"))
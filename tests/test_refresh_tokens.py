@@ -0,0 +1,87 @@
+"""
+Тесты refresh-токенов: ротация без bcrypt, отзыв семейства при повторном
+предъявлении, выход, неактивный пользователь, истекшие семейства
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.crud.refresh_token import crud_refresh_token
+from app.crud.user import UserCreate, crud_user
+from app.models.db import RefreshTokenFamilyDB
+
+
+def _login(client, db):
+    crud_user.create(db, obj_in=UserCreate(username="bob", email="bob@example.com", password="secret123"))
+    response = client.post("/api/v1/auth/login", data={"username": "bob", "password": "secret123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _refresh(client, refresh_token):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_without_password_check(client, db, async_engine, password_hasher):
+    tokens = _login(client, db)
+    hashed = password_hasher.metrics()["completed"]
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    response = _refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+    renewed = response.json()
+    assert renewed["refresh_token"] != tokens["refresh_token"]
+    assert renewed["refresh_token"].split(".")[0] == tokens["refresh_token"].split(".")[0]
+    # Одно обновление семейства по первичному ключу и пользователь по первичному ключу
+    assert [sql.split()[0] for sql in statements] == ["UPDATE", "SELECT"]
+    assert password_hasher.metrics()["completed"] == hashed
+    headers = {"Authorization": f"Bearer {renewed['access_token']}"}
+    assert client.get("/api/v1/auth/me", headers=headers).json()["username"] == "bob"
+
+    db.expire_all()
+    assert db.query(RefreshTokenFamilyDB).one().generation == 1
+
+
+def test_reused_refresh_token_revokes_family(client, db):
+    tokens = _login(client, db)
+    renewed = _refresh(client, tokens["refresh_token"]).json()
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    # Семейство отозвано: токен, выданный при ротации, тоже не принимается
+    assert _refresh(client, renewed["refresh_token"]).status_code == 401
+
+
+def test_logout_revokes_refresh_family(client, db):
+    tokens = _login(client, db)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = client.post("/api/v1/auth/logout", headers=headers, json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 204
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_inactive_user_cannot_refresh(client, db):
+    tokens = _login(client, db)
+    crud_user.update(db, db_obj=crud_user.get_by_username(db, "bob"), obj_in={"is_active": False})
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 400
+    db.expire_all()
+    assert db.query(RefreshTokenFamilyDB).one().revoked_at is not None
+
+
+def test_expired_and_malformed_tokens_are_rejected(client, db):
+    tokens = _login(client, db)
+    family = db.query(RefreshTokenFamilyDB).one()
+    family.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    assert _refresh(client, "not-a-token").status_code == 401
+    assert _refresh(client, "not-a-uuid.secret").status_code == 401
+
+    assert crud_refresh_token.delete_stale(db, now=datetime.now(timezone.utc)) == 1
+    assert db.query(RefreshTokenFamilyDB).count() == 0
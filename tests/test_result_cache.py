@@ -0,0 +1,120 @@
+"""
+Тесты кеша результатов предсказаний
+"""
+
+from app.core.config import settings
+from app.models.db import UserDB
+from app.models.prediction import ColumnarDataValidator
+from app.services import cache as cache_module
+from app.services import prediction_processor
+from app.services.cache import InMemoryResultCache, RedisResultCache, row_key
+from app.services.prediction_processor import execute_prediction
+
+validator = ColumnarDataValidator(required_fields=["feature1", "feature2"])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Минимальный клиент Redis: mget и pipeline с set"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def set(self, key, value, ex=None):
+        self._commands.append((key, value.encode(), ex))
+
+    def execute(self):
+        for key, value, ex in self._commands:
+            self._client.data[key] = value
+            self._client.ttl[key] = ex
+
+
+def test_row_key_is_canonical():
+    """Порядок полей не влияет на ключ, модель и версия - влияют"""
+    assert row_key("m", "v1", {"a": 1, "b": 2}) == row_key("m", "v1", {"b": 2, "a": 1})
+    assert row_key("m", "v1", {"a": 1}) != row_key("m", "v2", {"a": 1})
+    assert row_key("m", "v1", {"a": 1}) != row_key("other", "v1", {"a": 1})
+
+
+def test_lru_and_ttl_eviction():
+    clock = FakeClock()
+    cache = InMemoryResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+
+    cache.set_many({"a": 1, "b": 2})
+    assert cache.get_many(["a"]) == {"a": 1}
+    cache.set_many({"c": 3})
+    # b давно не использовался и вытесняется первым
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+    clock.now = 11
+    assert cache.get_many(["a", "c"]) == {}
+    assert cache.stats() == {"hits": 3, "misses": 3, "evictions": 1, "size": 0}
+
+
+def test_redis_backend_round_trip():
+    client = FakeRedis()
+    cache = RedisResultCache(client, ttl_seconds=60)
+
+    cache.set_many({"k1": [1.5], "k2": None})
+    assert cache.get_many(["k1", "k2", "k3"]) == {"k1": [1.5], "k2": None}
+    assert client.ttl == {"k1": 60, "k2": 60}
+    assert cache.stats() == {"hits": 2, "misses": 1, "errors": 0}
+
+
+def test_repeated_rows_are_served_from_cache(db, user, ml_model, monkeypatch):
+    """Повторные строки не попадают в модель и оплачиваются по RESULT_CACHE_HIT_PRICE"""
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "RESULT_CACHE_HIT_PRICE", 0.5)
+    result_cache = InMemoryResultCache()
+    monkeypatch.setattr(cache_module, "_result_cache", result_cache)
+
+    inferred = []
+    original = prediction_processor.run_inference
+
+    def counting_inference(model, rows):
+        inferred.extend(rows)
+        return original(model, rows)
+
+    monkeypatch.setattr(prediction_processor, "run_inference", counting_inference)
+
+    first_rows = [{"feature1": 1, "feature2": 2}, {"feature1": 3, "feature2": 4}]
+    second_rows = [{"feature2": 4, "feature1": 3}, {"feature1": 5, "feature2": 6}]
+
+    first = execute_prediction(
+        db, user_id=user.id, model=ml_model, input_data=first_rows,
+        validation=validator.validate_columns(first_rows)
+    )
+    second = execute_prediction(
+        db, user_id=user.id, model=ml_model, input_data=second_rows,
+        validation=validator.validate_columns(second_rows)
+    )
+
+    assert first.result == [3, 7]
+    assert second.result == [7, 11]
+    assert inferred == first_rows + [second_rows[1]]
+    assert first.total_cost == 2.0
+    assert second.total_cost == 1.5
+    assert result_cache.stats()["hits"] == 1
+    assert result_cache.stats()["misses"] == 3
+    db.expire_all()
+    assert db.get(UserDB, user.id).balance == 96.5
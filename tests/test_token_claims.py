@@ -0,0 +1,117 @@
+"""
+Тесты авторизации по claims: пользователь по первичному ключу, эндпоинты
+без чтения пользователя, отзыв токенов (jti и пользователь целиком)
+"""
+
+import asyncio
+
+from sqlalchemy import event
+
+from app.crud.user import UserCreate, crud_user
+from app.models.db import PredictionTaskDB, UserDB
+from app.models.enums import UserRole
+from app.services.token_denylist import InMemoryTokenDenylist, RedisTokenDenylist
+from tests.conftest import make_token
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+
+class FakeRedis:
+    def __init__(self, data):
+        self.data = data
+
+    def set(self, key, value, px=None):
+        self.data[key] = str(value)
+
+
+def _login(client):
+    response = client.post("/api/v1/auth/login", data={"username": "bob", "password": "secret123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_user_is_loaded_by_primary_key(async_engine, client, auth_headers):
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 200
+
+    assert "WHERE users.id = ?" in statements[0]
+
+
+def test_logout_revokes_only_that_token(client, db):
+    crud_user.create(db, obj_in=UserCreate(username="bob", email="bob@example.com", password="secret123"))
+    headers = _login(client)
+    other_headers = _login(client)
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 204
+
+    assert client.get("/api/v1/models/", headers=headers).status_code == 401
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+    assert client.get("/api/v1/models/", headers=other_headers).status_code == 200
+
+
+def test_role_change_revokes_claims_only_access(client, db, user, auth_headers):
+    assert client.get("/api/v1/models/", headers=auth_headers).status_code == 200
+
+    crud_user.update(db, db_obj=user, obj_in={"role": UserRole.ADMIN})
+
+    assert client.get("/api/v1/models/", headers=auth_headers).status_code == 401
+
+
+def test_admin_reads_other_users_task(client, db, user, ml_model, auth_headers):
+    task = PredictionTaskDB(user_id=user.id, model_id=ml_model.id, input_data=[])
+    admin = UserDB(username="root", email="root@example.com", password_hash="x", role=UserRole.ADMIN, balance=0.0)
+    db.add_all([task, admin])
+    db.commit()
+
+    response = client.get(f"/api/v1/predict/{task.id}", headers={"Authorization": f"Bearer {make_token(admin)}"})
+
+    assert response.status_code == 200
+
+
+def test_in_memory_denylist_entries_expire():
+    clock = FakeClock()
+    denylist = InMemoryTokenDenylist(user_ttl_seconds=60, clock=clock)
+
+    asyncio.run(denylist.revoke_token("j1", expires_at=1010))
+    denylist.revoke_user("u1")
+
+    assert asyncio.run(denylist.is_revoked("u2", "j1", 900))
+    # Выданные до отзыва пользователя - отозваны, после - нет
+    assert asyncio.run(denylist.is_revoked("u1", "j2", 999))
+    assert asyncio.run(denylist.is_revoked("u1", "j2", None))
+    assert not asyncio.run(denylist.is_revoked("u1", "j2", 1001))
+
+    clock.now = 1061
+    assert not asyncio.run(denylist.is_revoked("u2", "j1", 900))
+    assert not asyncio.run(denylist.is_revoked("u1", "j2", 999))
+
+
+def test_redis_denylist_checks_token_and_user_in_one_call():
+    client = FakeAsyncRedis()
+    denylist = RedisTokenDenylist(client, FakeRedis(client.data), user_ttl_seconds=60)
+
+    asyncio.run(denylist.revoke_token("j1", expires_at=2 ** 40))
+    denylist.revoke_user("u1")
+
+    assert asyncio.run(denylist.is_revoked("u2", "j1", 0))
+    assert asyncio.run(denylist.is_revoked("u1", None, 0))
+    assert not asyncio.run(denylist.is_revoked("u1", "j3", 2 ** 40))
+    assert not asyncio.run(denylist.is_revoked("u2", "j2", 0))
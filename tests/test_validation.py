@@ -0,0 +1,104 @@
+"""
+Тесты колоночного валидатора
+"""
+
+import math
+
+from app.models.enums import ModelType, TaskStatus, ValidationErrorCode
+from app.models.ml_model import MLModel
+from app.models.prediction import ColumnarDataValidator, FieldSpec, SimpleDataValidator
+from app.services.ml_service import MLService
+
+
+def test_matches_simple_validator_on_required_fields():
+    """Для обязательных полей результат совпадает с SimpleDataValidator"""
+    rows = [
+        {"feature1": 1, "feature2": 2},
+        {"feature1": 1},
+        {"feature2": None, "feature1": "x"},
+        {},
+    ]
+    fields = ["feature1", "feature2"]
+
+    assert ColumnarDataValidator(required_fields=fields).validate(rows) == \
+        SimpleDataValidator(required_fields=fields).validate(rows)
+
+
+def test_error_codes_and_masks():
+    """Проверка null, типов и диапазонов возвращает коды без копирования строк"""
+    validator = ColumnarDataValidator(fields=[
+        FieldSpec("age", dtype=int, min_value=0, max_value=150, nullable=False),
+        FieldSpec("score", dtype=float, min_value=0.0),
+        FieldSpec("name", dtype=str),
+    ])
+    rows = [
+        {"age": 30, "score": 0.5, "name": "a"},
+        {"age": 200, "score": 1.0, "name": "b"},
+        {"age": None, "score": 1.0, "name": "c"},
+        {"age": "30", "score": 1.0, "name": "d"},
+        {"age": 1, "score": math.nan, "name": "e"},
+        {"age": 1, "score": -1, "name": "f"},
+        {"age": 1, "score": 2, "name": 3},
+        {"age": True, "score": 2, "name": "g"},
+        {"score": 2, "name": "h"},
+        "not a row",
+    ]
+
+    result = validator.validate_columns(rows)
+
+    assert result.error_codes.tolist() == [
+        ValidationErrorCode.OK,
+        ValidationErrorCode.OUT_OF_RANGE,
+        ValidationErrorCode.NULL_VALUE,
+        ValidationErrorCode.WRONG_TYPE,
+        ValidationErrorCode.OK,
+        ValidationErrorCode.OUT_OF_RANGE,
+        ValidationErrorCode.WRONG_TYPE,
+        ValidationErrorCode.WRONG_TYPE,
+        ValidationErrorCode.MISSING_FIELD,
+        ValidationErrorCode.NOT_AN_OBJECT,
+    ]
+    assert result.valid_indices().tolist() == [0, 4]
+    assert result.valid_count == 2
+    assert result.invalid_count == 8
+
+
+def test_huge_int_is_out_of_range():
+    """int, не помещающийся в float64, отмечается как OUT_OF_RANGE, а не роняет валидацию"""
+    validator = ColumnarDataValidator(fields=[FieldSpec("a", dtype=int, max_value=5)])
+    rows = [{"a": 10 ** 400}, {"a": 3}, {"a": -10 ** 400}, {"a": "x"}, "row"]
+
+    result = validator.validate_columns(rows)
+
+    assert result.error_codes.tolist() == [
+        ValidationErrorCode.OUT_OF_RANGE,
+        ValidationErrorCode.OK,
+        ValidationErrorCode.OUT_OF_RANGE,
+        ValidationErrorCode.WRONG_TYPE,
+        ValidationErrorCode.NOT_AN_OBJECT,
+    ]
+
+
+def test_ml_service_accepts_columnar_validator():
+    """MLService.create_prediction_task работает через интерфейс DataValidator"""
+    service = MLService()
+    user = service.register_user("bob", "bob@example.com", "hash")
+    service.deposit_funds(user.id, 10.0)
+    model = MLModel("m", "d", ModelType.REGRESSION, cost_per_prediction=1.0)
+    service.add_model(model)
+
+    task = service.create_prediction_task(
+        user.id,
+        model.id,
+        [{"feature1": 1}, {"feature2": 2}, {"feature1": 3}],
+        validator=ColumnarDataValidator(required_fields=["feature1"])
+    )
+
+    assert task.status == TaskStatus.PROCESSING
+    assert len(task.valid_data) == 2
+    assert service.get_user_balance(user.id) == 8.0
+
+    empty = service.create_prediction_task(
+        user.id, model.id, [{}], validator=ColumnarDataValidator(required_fields=["feature1"])
+    )
+    assert empty.status == TaskStatus.VALIDATION_ERROR